@@ -1,6 +1,5 @@
 import QtQuick 2.13
 import QtQuick.Controls 2.13
-import QtQuick.XmlListModel 2.13
 
 import easyApp.Gui.Globals 1.0 as EaGlobals
 import easyApp.Gui.Style 1.0 as EaStyle
@@ -16,20 +15,7 @@ EaComponents.TableView  {
 
     // Table model
 
-    model: XmlListModel {
-        xml: ExGlobals.Constants.proxy.parameter.constraintsAsXml
-
-        query: "/root/item"
-
-        XmlRole { name: "number"; query: "number/number()" }
-        XmlRole { name: "index"; query: "index/number()" }
-        XmlRole { name: "dependentName"; query: "dependentName/string()" }
-        XmlRole { name: "relationalOperator"; query: "relationalOperator/string()" }
-        XmlRole { name: "value"; query: "value/number()" }
-        XmlRole { name: "arithmeticOperator"; query: "arithmeticOperator/string()" }
-        XmlRole { name: "independentName"; query: "independentName/string()" }
-        XmlRole { name: "enabled"; query: "enabled/number()" }
-    }
+    model: ExGlobals.Constants.proxy.parameter.constraintsModel
 
     // Table rows
 
@@ -1,6 +1,5 @@
 import QtQuick 2.13
 import QtQuick.Controls 2.13
-import QtQuick.XmlListModel 2.13
 
 import easyApp.Gui.Globals 1.0 as EaGlobals
 import easyApp.Gui.Style 1.0 as EaStyle
@@ -19,29 +18,12 @@ EaComponents.TableView {
 
     // Table model
 
-    model: XmlListModel {
-        id: fitablesModel
+    model: ExGlobals.Constants.proxy.parameter.parametersModel
 
-        //xml: ExGlobals.Constants.proxy.fitablesListAsXml
-        xml: ExGlobals.Constants.proxy.parameter.parametersAsXml
-
-        query: "/root/item"
-
-        XmlRole { name: "id"; query: "id/string()" }
-        XmlRole { name: "number"; query: "number/number()" }
-        XmlRole { name: "label"; query: "label/string()" }
-        XmlRole { name: "value"; query: "value/number()" }
-        XmlRole { name: "unit"; query: "unit/string()" }
-        XmlRole { name: "error"; query: "error/number()" }
-        XmlRole { name: "fit"; query: "fit/number()" }
-        XmlRole { name: "min"; query: "min/string()" }
-        XmlRole { name: "max"; query: "max/string()" }
-
-        onStatusChanged: {
-            if (status === XmlListModel.Ready) {
-                storeCurrentParameter()
-            }
-        }
+    Connections {
+        target: table.model
+        onDataChanged: storeCurrentParameter()
+        onCountChanged: storeCurrentParameter()
     }
 
     // Table rows
@@ -7,6 +7,7 @@ import easyApp.Gui.Elements 1.0 as EaElements
 import easyApp.Gui.Logic 1.0 as EaLogic
 import easyApp.Gui.Charts 1.0 as EaCharts
 
+import Gui.Globals 1.0 as ExGlobals
 import Gui.Components 1.0 as ExComponents
 import Gui.Logic 1.0 as ExLogic
 
@@ -54,7 +55,17 @@ ExComponents.BasePlot {
         'fontPixelSize': plot.fontPixelSize
     }
 
-    property string html: ExLogic.Plotting.bokehHtml(chartData, chartSpecs)
+    // Rebuilt once per event loop pass however many of the chart data
+    // and specs properties changed in it
+    property string html: ''
+
+    function updateHtml() {
+        html = ExLogic.Plotting.bokehHtml(chartData, chartSpecs)
+    }
+
+    onChartDataChanged: Qt.callLater(updateHtml)
+    onChartSpecsChanged: Qt.callLater(updateHtml)
+    Component.onCompleted: updateHtml()
 
     WebEngineView {
         id: chartView
@@ -64,9 +75,25 @@ ExComponents.BasePlot {
         anchors.topMargin: plot.paddings - 0.25 * plot.fontPixelSize
         backgroundColor: plot.chartBackgroundColor
 
+        property double loadStartTime: 0
+
         onContextMenuRequested: {
             request.accepted = true
         }
+
+        onJavaScriptConsoleMessage: {
+            if (message.startsWith('plotViewRange:')) {
+                const range = message.split(':')[1].split(',')
+                ExGlobals.Constants.proxy.plotting1d.setPlotViewRange(parseFloat(range[0]), parseFloat(range[1]))
+            }
+        }
+
+        onLoadingChanged: {
+            if (loadRequest.status === WebEngineView.LoadSucceededStatus && loadStartTime) {
+                console.debug(`Bokeh chart: ${plot.html.length} bytes loaded in ${Date.now() - loadStartTime} ms`)
+                loadStartTime = 0
+            }
+        }
     }
 
     /////////////////////
@@ -125,8 +152,11 @@ ExComponents.BasePlot {
     }
     */
 
+    onChartWidthChanged: ExGlobals.Constants.proxy.plotting1d.setPlotPixelWidth(chartWidth)
+
     onHtmlChanged: {
         //print(html)
+        chartView.loadStartTime = Date.now()
         chartView.loadHtml(html)
     }
 }
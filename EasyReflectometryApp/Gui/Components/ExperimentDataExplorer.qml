@@ -1,6 +1,5 @@
 import QtQuick 2.13
 import QtQuick.Controls 2.13
-import QtQuick.XmlListModel 2.13
 
 import easyApp.Gui.Globals 1.0 as EaGlobals
 import easyApp.Gui.Style 1.0 as EaStyle
@@ -17,14 +16,7 @@ EaComponents.TableView {
 
     // Table model
 
-    model: XmlListModel {
-        xml: ExGlobals.Constants.proxy.data.experimentDataAsXml
-        query: "/root/item"
-
-        XmlRole { name: "label"; query: "name/string()" }
-        XmlRole { name: "color"; query: "color/string()" }
-        XmlRole { name: "model_index"; query: "model_index/number()" }
-    }
+    model: ExGlobals.Constants.proxy.data.experimentDataModel
 
     // Table rows
 
@@ -53,6 +45,8 @@ EaComponents.TableView {
             width: EaStyle.Sizes.sideBarContentWidth - (noLabel.width + deleteRowColumn.width + colorLabel.width + labelLabel.width + 5 * EaStyle.Sizes.tableColumnSpacing)
             headerText: "Model"
             model: ExGlobals.Constants.proxy.model.modelList
+            property int modelIndex: dataModel.model_index
+            onModelIndexChanged: currentIndex = modelIndex
             onActivated: {
                 ExGlobals.Constants.proxy.data.setCurrentExperimentDatasetModel(currentIndex)
             }
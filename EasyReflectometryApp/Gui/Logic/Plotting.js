@@ -103,6 +103,9 @@ function bokehChart(data, specs) {
     // List of strings to be filled below
     let chart = []
 
+    // Binary data decoding
+    chart.push(...bokehAddArrayDecoder())
+
     // Tooltips
     chart.push(bokehAddMainTooltip(data, specs))
     chart.push(bokehAddSldTooltip(data, specs))
@@ -124,6 +127,7 @@ function bokehChart(data, specs) {
     chart.push(...bokehAddMainTools('main_chart'))
     chart.push(...bokehAddVisibleXAxis('main_chart', specs))
     chart.push(...bokehAddVisibleYAxis('main_chart', specs))
+    chart.push(...bokehAddViewRangeReporter('main_chart'))
     //if (data.hasMeasured) {
     if (hasMeasured) {
         chart.push(...bokehAddMeasuredDataToMainChart(data, specs))
@@ -169,8 +173,10 @@ function bokehCreateMainChart(data, specs) {
             `   width: ${specs.chartWidth},`,
 
             `   x_range: new Bokeh.Range1d({`,
-            `       start: ${data.ranges.min_x},`,
-            `       end: ${data.ranges.max_x}`,
+            `       start: ${bokehViewStart(data.ranges)},`,
+            `       end: ${bokehViewEnd(data.ranges)},`,
+            `       reset_start: ${data.ranges.min_x},`,
+            `       reset_end: ${data.ranges.max_x}`,
             `   }),`,
 
             `   y_axis_type: "log",`,
@@ -214,6 +220,28 @@ function bokehCreateSldChart(data, specs) {
             `})`]
 }
 
+// Zoomed in view, if any, see Plotting1dProxy.setPlotViewRange
+
+function bokehViewStart(ranges) {
+    return typeof ranges.view_min_x !== 'undefined' ? ranges.view_min_x : ranges.min_x
+}
+
+function bokehViewEnd(ranges) {
+    return typeof ranges.view_max_x !== 'undefined' ? ranges.view_max_x : ranges.max_x
+}
+
+// Reports the visible x range after zooming or panning as a console
+// message, which BaseBokeh passes on to the proxy
+function bokehAddViewRangeReporter(chart) {
+    return [`let ${chart}_view_timeout = null`,
+            `${chart}.x_range.connect(${chart}.x_range.change, () => {`,
+            `    clearTimeout(${chart}_view_timeout)`,
+            `    ${chart}_view_timeout = setTimeout(() => {`,
+            `        console.info("plotViewRange:" + ${chart}.x_range.start + "," + ${chart}.x_range.end)`,
+            `    }, 300)`,
+            `})`]
+}
+
 // Bokeh tools
 
 function bokehAddMainTools(chart) {
@@ -275,12 +303,33 @@ function bokehAddVisibleYAxis(chart, specs) {
 
 // Bokeh data
 
+// Arrays come from the proxy as base64 encoded little-endian float64
+// buffers, which are decoded straight into typed arrays on the page.
+// Plain lists (e.g. from the design mode proxy) are written out as is.
+function bokehArray(array) {
+    if (typeof array === 'string') {
+        return `decodeArray("${array}")`
+    }
+    return `[${array}]`
+}
+
+function bokehAddArrayDecoder() {
+    return ['function decodeArray(b64) {',
+            '    const chars = atob(b64)',
+            '    const bytes = new Uint8Array(chars.length)',
+            '    for (let i = 0; i < chars.length; i++) {',
+            '        bytes[i] = chars.charCodeAt(i)',
+            '    }',
+            '    return new Float64Array(bytes.buffer)',
+            '}']
+}
+
 function bokehAddMeasuredDataToMainChart(data, specs) {
-    return [`main_source.data.x_meas = [${data.measured.x}]`,
-            `main_source.data.y_meas = [${data.measured.y}]`,
-            `main_source.data.sy_meas = [${data.measured.sy}]`,
-            `main_source.data.y_meas_upper = [${data.measured.y_upper}]`,
-            `main_source.data.y_meas_lower = [${data.measured.y_lower}]`,
+    return [`main_source.data.x_meas = ${bokehArray(data.measured.x)}`,
+            `main_source.data.y_meas = ${bokehArray(data.measured.y)}`,
+            `main_source.data.sy_meas = ${bokehArray(data.measured.sy)}`,
+            `main_source.data.y_meas_upper = ${bokehArray(data.measured.y_upper)}`,
+            `main_source.data.y_meas_lower = ${bokehArray(data.measured.y_lower)}`,
 
             `const measLineTop = new Bokeh.Line({`,
             `    x: { field: "x_meas" },`,
@@ -310,8 +359,8 @@ function bokehAddMeasuredDataToMainChart(data, specs) {
 }
 
 function bokehAddCalculatedDataToMainChart(data, specs) {
-    return [`main_source.data.x_calc = [${data.calculated.x}]`,
-            `main_source.data.y_calc = [${data.calculated.y}]`,
+    return [`main_source.data.x_calc = ${bokehArray(data.calculated.x)}`,
+            `main_source.data.y_calc = ${bokehArray(data.calculated.y)}`,
 
             'const calcLine = new Bokeh.Line({',
             '    x: { field: "x_calc" },',
@@ -324,8 +373,8 @@ function bokehAddCalculatedDataToMainChart(data, specs) {
 }
 
 function bokehAddDataToSldChart(data, specs) {
-    return [`sld_source.data.x = [${data.sld.x}]`,
-            `sld_source.data.y = [${data.sld.y}]`,
+    return [`sld_source.data.x = ${bokehArray(data.sld.x)}`,
+            `sld_source.data.y = ${bokehArray(data.sld.y)}`,
 
             'const sldLine = new Bokeh.Line({',
             '    x: { field: "x" },',
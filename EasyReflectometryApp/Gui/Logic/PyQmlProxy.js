@@ -1,4 +1,6 @@
 class Plotting1d {
+    setPlotPixelWidth(width) {}
+    setPlotViewRange(minX, maxX) {}
     get libs() {
         return ['qtcharts', 'bokeh']
     }
@@ -102,9 +104,9 @@ class PyQmlProxy {
     get projectInfoAsCif() { return "_name 'Example Project'\n_location 'Example Project'" }
     get projectExamplesAsXml() { return "<item><name>PbSO4</name><path>../Resources/Examples/PbSO4/project.json</path></item></root>" }
 
-    get materialsAsXml() { return "<root><item><name>Si02</name><color>darkolivegreen</color><sld><value>4.186</value></sld><isld><value>0.000</value></isld></item><item><name>Si</name><color>skyblue</color><sld><value>2.074</value></sld><isld><value>0.000</value></isld></item></root>"}
-    get itemsAsXml() { return "<root><item><name>Superphase</name><type>Multi-layer</type></item></root>"}
-    get layersAsXml() { return "<root><item><layers><item></item></layers></item></root>"}
+    get materialsModel() { return [{'color': 'darkolivegreen', 'label': 'Si02', 'sld': 4.186, 'isld': 0.0}, {'color': 'skyblue', 'label': 'Si', 'sld': 2.074, 'isld': 0.0}] }
+    get itemsModel() { return [{'label': 'Superphase', 'type': 'Multi-layer'}] }
+    get layersModel() { return [] }
     get materialsName() { return ['SiO2', 'Si'] }
 
     get simulationParametersAsObj() { return {"x_min":0.0,"x_max":180.0,"x_step":0.1} }
@@ -114,10 +116,10 @@ class PyQmlProxy {
     get instrumentParametersAsXml() { return '<root><item><key name="@module">EasyReflectometryLib.Elements.Experiments.Instrument</key><key name="@class">Pars1D</key><key name="@version">0.0.1</key><u_resolution><key name="@module">easyCore.Objects.Base</key><key name="@class">Parameter</key><key name="@version">0.0.1</key><name>u_resolution</name><value>0.4</value><error>0.0</error><min>-inf</min><max>inf</max><fixed>True</fixed><units>dimensionless</units><key name="@id">312322313537709477997004899613590636884</key><enabled>True</enabled></u_resolution><v_resolution><key name="@module">easyCore.Objects.Base</key><key name="@class">Parameter</key><key name="@version">0.0.1</key><name>v_resolution</name><value>-0.5</value><error>0.0</error><min>-inf</min><max>inf</max><fixed>True</fixed><units>dimensionless</units><key name="@id">220595112252802717438017278456713837342</key><enabled>True</enabled></v_resolution><w_resolution><key name="@module">easyCore.Objects.Base</key><key name="@class">Parameter</key><key name="@version">0.0.1</key><name>w_resolution</name><value>0.9</value><error>0.0</error><min>-inf</min><max>inf</max><fixed>True</fixed><units>dimensionless</units><key name="@id">309956937743928332407241175311265873557</key><enabled>True</enabled></w_resolution><x_resolution><key name="@module">easyCore.Objects.Base</key><key name="@class">Parameter</key><key name="@version">0.0.1</key><name>x_resolution</name><value>0.0</value><error>0.0</error><min>-inf</min><max>inf</max><fixed>True</fixed><units>dimensionless</units><key name="@id">234578176552449284759584024822421612517</key><enabled>True</enabled></x_resolution><wavelength><key name="@module">easyCore.Objects.Base</key><key name="@class">Parameter</key><key name="@version">0.0.1</key><name>wavelength</name><value>1.54056</value><error>0.0</error><min>-inf</min><max>inf</max><fixed>True</fixed><units>angstrom</units><key name="@id">169780687797892758527734945250252699192</key><enabled>True</enabled></wavelength><interface></interface><key name="@id">227239201627625589021374889924472937495</key></item></root>' }
 
     get experimentDataAsObj() { return [{"name": "D1A@ILL"}]}
-    get experimentDataAsXml() { return '<root><item type="dict"><name type="str">D1A@ILL</name></item></root>'}
+    get experimentDataModel() { return [{'label': 'D1A@ILL'}] }
 
     get parametersAsObj() { return [{"error":"","fit":0,"id":"76125422371550751838932952523205268042","label":"Phases.PbSO4.lattice.length_a","number":1,"unit":"Å","value":8.48},{"error":"","fit":0,"id":"90454834307343824540949403622222880474","label":"Phases.PbSO4.lattice.length_b","number":2,"unit":"Å","value":5.398},{"error":"","fit":0,"id":"74362655779732760789420329798872964427","label":"Phases.PbSO4.lattice.length_c","number":3,"unit":"Å","value":6.958},{"error":"","fit":0,"id":"22048046294443526769144050778451069238","label":"Phases.PbSO4.atoms.Pb.occupancy","number":7,"unit":"","value":1},{"error":"","fit":0,"id":"302456405621173502066952664792028795104","label":"Phases.PbSO4.atoms.Pb.fract_x","number":8,"unit":"","value":0.1882},{"error":"","fit":0,"id":"330991203340213151017226400228696812054","label":"Phases.PbSO4.atoms.Pb.fract_y","number":9,"unit":"","value":0.25},{"error":"","fit":0,"id":"327281342816078551359690310631531109766","label":"Phases.PbSO4.atoms.Pb.fract_z","number":10,"unit":"","value":0.167},{"error":"","fit":0,"id":"175020970618545896340107154594843746056","label":"Phases.PbSO4.atoms.Pb.adp.Uiso.Uiso","number":11,"unit":"Å²","value":0.01},{"error":"","fit":0,"id":"75905111031158516367102784904754973498","label":"Phases.PbSO4.atoms.S.occupancy","number":12,"unit":"","value":1},{"error":"","fit":0,"id":"264487383941998696741148014352498401215","label":"Phases.PbSO4.atoms.S.fract_x","number":13,"unit":"","value":0.063},{"error":"","fit":0,"id":"81490918821424872052289524783555721463","label":"Phases.PbSO4.atoms.S.fract_y","number":14,"unit":"","value":0.25},{"error":"","fit":0,"id":"93657672090607471289702541973298167786","label":"Phases.PbSO4.atoms.S.fract_z","number":15,"unit":"","value":0.686},{"error":"","fit":0,"id":"328544279289427037535404774781218670372","label":"Phases.PbSO4.atoms.S.adp.Uiso.Uiso","number":16,"unit":"Å²","value":0.01},{"error":"","fit":0,"id":"77230137650127717145020391912777986173","label":"Phases.PbSO4.atoms.O1.occupancy","number":17,"unit":"","value":1},{"error":"","fit":0,"id":"86297985122926341277421520528729147373","label":"Phases.PbSO4.atoms.O1.fract_x","number":18,"unit":"","value":-0.095},{"error":"","fit":0,"id":"71897764798856053858628374805663346348","label":"Phases.PbSO4.atoms.O1.fract_y","number":19,"unit":"","value":0.25},{"error":"","fit":0,"id":"153503480934511583529674576977906966864","label":"Phases.PbSO4.atoms.O1.fract_z","number":20,"unit":"","value":0.6},{"error":"","fit":0,"id":"105883301669403584818251252456772918537","label":"Phases.PbSO4.atoms.O1.adp.Uiso.Uiso","number":21,"unit":"Å²","value":0.01},{"error":"","fit":0,"id":"81879417235741161301344628203762837454","label":"Phases.PbSO4.atoms.O2.occupancy","number":22,"unit":"","value":1},{"error":"","fit":0,"id":"20733192488382760121081742050748973192","label":"Phases.PbSO4.atoms.O2.fract_x","number":23,"unit":"","value":0.181},{"error":"","fit":0,"id":"266839609771373147997918927961660891954","label":"Phases.PbSO4.atoms.O2.fract_y","number":24,"unit":"","value":0.25},{"error":"","fit":0,"id":"136026766876835012842696967351576505712","label":"Phases.PbSO4.atoms.O2.fract_z","number":25,"unit":"","value":0.543},{"error":"","fit":0,"id":"82897099668680227377317380100881436306","label":"Phases.PbSO4.atoms.O2.adp.Uiso.Uiso","number":26,"unit":"Å²","value":0.01},{"error":"","fit":0,"id":"52530023128513215507266262487840347468","label":"Phases.PbSO4.atoms.O3.occupancy","number":27,"unit":"","value":1},{"error":"","fit":0,"id":"74312938057090450104769605875220909099","label":"Phases.PbSO4.atoms.O3.fract_x","number":28,"unit":"","value":0.085},{"error":"","fit":0,"id":"291584460619972836241577751733987630310","label":"Phases.PbSO4.atoms.O3.fract_y","number":29,"unit":"","value":0.026},{"error":"","fit":0,"id":"184177024747355046670360930948108748181","label":"Phases.PbSO4.atoms.O3.fract_z","number":30,"unit":"","value":0.806},{"error":"","fit":0,"id":"6331965894977405482409668240777466316","label":"Phases.PbSO4.atoms.O3.adp.Uiso.Uiso","number":31,"unit":"Å²","value":0.01},{"error":"","fit":0,"id":"317492978838357827842679407824875212658","label":"Instrument.wavelength","number":32,"unit":"Å","value":1.912},{"error":"","fit":0,"id":"156100446680199011739510994527479435124","label":"Instrument.resolution_u","number":33,"unit":"","value":0.14},{"error":"","fit":0,"id":"201269552242503067654825819258839357671","label":"Instrument.resolution_v","number":34,"unit":"","value":-0.42},{"error":"","fit":0,"id":"157141303929062304930649271479149784624","label":"Instrument.resolution_w","number":35,"unit":"","value":0.38},{"error":"","fit":0,"id":"7867774072403175019651862535650800906","label":"Instrument.resolution_x","number":36,"unit":"","value":0},{"error":"","fit":0,"id":"78469350370270266786097294103217831189","label":"Instrument.resolution_y","number":37,"unit":"","value":0},{"error":"","fit":0,"id":"339775777492351171466584335452985747636","label":"Instrument.zero_shift","number":38,"unit":"deg","value":0},{"error":"","fit":0,"id":"64139544655561094139940188836925273480","label":"Instrument.scale","number":39,"unit":"","value":1},{"error":"","fit":0,"id":"186286817442791463165010935914942053716","label":"Instrument.background.point_background.0,0_deg.intensity","number":40,"unit":"","value":200},{"error":"","fit":0,"id":"234267982023401942486718085477695204923","label":"Instrument.background.point_background.140,0_deg.intensity","number":41,"unit":"","value":200}] }
-    get parametersAsXml() { return "<root><item><id>158360137990540488038891173676122385073</id><number>1</number><label>Phases.Dichlorine.cell.length_a</label><value>8.56</value><unit>Å</unit><error>0.0</error><fit>0</fit></item><item><id>283216083413242490636533173050739405208</id><number>3</number><label>Phases.Dichlorine.cell.length_c</label><value>6.12</value><unit>Å</unit><error>0.0</error><fit>0</fit></item><item><id>337471415220984686916952831002040420740</id><number>7</number><label>Phases.Dichlorine.atoms.Cl1.occupancy</label><value>1.0</value><unit></unit><error>0.0</error><fit>0</fit></item><item><id>146409450034596321910624052910896844832</id><number>8</number><label>Phases.Dichlorine.atoms.Cl1.fract_x</label><value>0.125</value><unit></unit><error>0.0</error><fit>0</fit></item><item><id>47533500537766397962048891338832096294</id><number>9</number><label>Phases.Dichlorine.atoms.Cl1.fract_y</label><value>0.167</value><unit></unit><error>0.0</error><fit>0</fit></item><item><id>149777602679563407975140340330854068565</id><number>10</number><label>Phases.Dichlorine.atoms.Cl1.fract_z</label><value>0.107</value><unit></unit><error>0.0</error><fit>0</fit></item><item><id>6083892595458615760556868500726856296</id><number>11</number><label>Phases.Dichlorine.atoms.Cl1.adp.Uiso.Uiso</label><value>0.0</value><unit>Å²</unit><error>0.0</error><fit>0</fit></item><item><id>36404488086395798041587546603097174542</id><number>12</number><label>Instrument.u_resolution</label><value>0.4</value><unit></unit><error>0.0</error><fit>0</fit></item><item><id>273642904209567193195209812492926745675</id><number>13</number><label>Instrument.v_resolution</label><value>-0.5</value><unit></unit><error>0.0</error><fit>0</fit></item><item><id>285131512434517312505245772373508445823</id><number>14</number><label>Instrument.w_resolution</label><value>0.9</value><unit></unit><error>0.0</error><fit>0</fit></item><item><id>12863474859136840551926993865779295321</id><number>15</number><label>Instrument.x_resolution</label><value>0.0</value><unit></unit><error>0.0</error><fit>0</fit></item><item><id>308805485907805970173258212776667043199</id><number>16</number><label>Instrument.wavelength</label><value>1.54056</value><unit>Å</unit><error>0.0</error><fit>0</fit></item></root>" }
+    get parametersModel() { return [{'id': '158360137990540488038891173676122385073', 'number': 1, 'label': 'Phases.Dichlorine.cell.length_a', 'value': 8.56, 'unit': 'Å', 'error': 0.0, 'fit': 0}, {'id': '283216083413242490636533173050739405208', 'number': 3, 'label': 'Phases.Dichlorine.cell.length_c', 'value': 6.12, 'unit': 'Å', 'error': 0.0, 'fit': 0}, {'id': '337471415220984686916952831002040420740', 'number': 7, 'label': 'Phases.Dichlorine.atoms.Cl1.occupancy', 'value': 1.0, 'unit': '', 'error': 0.0, 'fit': 0}, {'id': '146409450034596321910624052910896844832', 'number': 8, 'label': 'Phases.Dichlorine.atoms.Cl1.fract_x', 'value': 0.125, 'unit': '', 'error': 0.0, 'fit': 0}, {'id': '47533500537766397962048891338832096294', 'number': 9, 'label': 'Phases.Dichlorine.atoms.Cl1.fract_y', 'value': 0.167, 'unit': '', 'error': 0.0, 'fit': 0}, {'id': '149777602679563407975140340330854068565', 'number': 10, 'label': 'Phases.Dichlorine.atoms.Cl1.fract_z', 'value': 0.107, 'unit': '', 'error': 0.0, 'fit': 0}, {'id': '6083892595458615760556868500726856296', 'number': 11, 'label': 'Phases.Dichlorine.atoms.Cl1.adp.Uiso.Uiso', 'value': 0.0, 'unit': 'Å²', 'error': 0.0, 'fit': 0}, {'id': '36404488086395798041587546603097174542', 'number': 12, 'label': 'Instrument.u_resolution', 'value': 0.4, 'unit': '', 'error': 0.0, 'fit': 0}, {'id': '273642904209567193195209812492926745675', 'number': 13, 'label': 'Instrument.v_resolution', 'value': -0.5, 'unit': '', 'error': 0.0, 'fit': 0}, {'id': '285131512434517312505245772373508445823', 'number': 14, 'label': 'Instrument.w_resolution', 'value': 0.9, 'unit': '', 'error': 0.0, 'fit': 0}, {'id': '12863474859136840551926993865779295321', 'number': 15, 'label': 'Instrument.x_resolution', 'value': 0.0, 'unit': '', 'error': 0.0, 'fit': 0}, {'id': '308805485907805970173258212776667043199', 'number': 16, 'label': 'Instrument.wavelength', 'value': 1.54056, 'unit': 'Å', 'error': 0.0, 'fit': 0}] }
 
     get plotting3dLibs() { return ['qtdatavisualization', 'chemdoodle'] }
     get current3dPlottingLib() { return 'chemdoodle' }
@@ -1,6 +1,5 @@
 import QtQuick 2.14
 import QtQuick.Controls 2.14
-import QtQuick.XmlListModel 2.14
 
 import easyApp.Gui.Globals 1.0 as EaGlobals
 import easyApp.Gui.Style 1.0 as EaStyle
@@ -25,14 +24,7 @@ EaComponents.SideBarColumn {
 
             // Table model
 
-            model: XmlListModel {
-                xml: ExGlobals.Constants.proxy.data.experimentDataAsXml
-                query: "/root/item"
-
-                XmlRole { name: "label"; query: "name/string()" }
-                XmlRole { name: "color"; query: "color/string()" }
-                XmlRole { name: "model_name"; query: "model_name/string()"}
-            }
+            model: ExGlobals.Constants.proxy.data.experimentDataModel
 
             // Table rows
 
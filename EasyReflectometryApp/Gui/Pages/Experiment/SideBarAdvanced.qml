@@ -10,6 +10,56 @@ import Gui.Globals 1.0 as ExGlobals
 
 EaComponents.SideBarColumn {
 
+    EaElements.GroupBox {
+        title: qsTr("Rebinning")
+        collapsed: false
+
+        Column {
+            spacing: EaStyle.Sizes.fontPixelSize * 0.5
+
+            Row {
+                spacing: EaStyle.Sizes.fontPixelSize
+
+                EaComponents.TableViewLabel{
+                    horizontalAlignment: Text.AlignRight
+                    width: (EaStyle.Sizes.sideBarContentWidth - 3 * EaStyle.Sizes.fontPixelSize) / 4
+                    text: qsTr("dq/q:")
+                }
+                EaElements.Parameter {
+                    width: (EaStyle.Sizes.sideBarContentWidth - 3 * EaStyle.Sizes.fontPixelSize) / 4
+                    units: "%"
+                    text: ExGlobals.Constants.proxy.data.rebinning.toFixed(2)
+                    onEditingFinished: ExGlobals.Constants.proxy.data.rebinning = text
+                }
+
+                EaElements.CheckBox {
+                    topPadding: 0
+                    checked: ExGlobals.Constants.proxy.data.rebinOnImport
+                    text: qsTr("Rebin on import")
+                    onToggled: ExGlobals.Constants.proxy.data.rebinOnImport = checked
+                }
+            }
+
+            Row {
+                spacing: EaStyle.Sizes.fontPixelSize
+
+                EaElements.SideBarButton {
+                    enabled: ExGlobals.Constants.proxy.data.experimentLoaded
+                    fontIcon: "compress-alt"
+                    text: qsTr("Rebin current dataset")
+                    onClicked: ExGlobals.Constants.proxy.data.rebinExperiment()
+                }
+
+                EaElements.SideBarButton {
+                    enabled: ExGlobals.Constants.proxy.data.currentDataRebinned
+                    fontIcon: "undo"
+                    text: qsTr("Restore original data")
+                    onClicked: ExGlobals.Constants.proxy.data.restoreExperiment()
+                }
+            }
+        }
+    }
+
     EaElements.GroupBox {
         title: qsTr("Plot")
         //enabled: true
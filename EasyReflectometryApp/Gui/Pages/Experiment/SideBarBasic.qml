@@ -48,6 +48,56 @@ EaComponents.SideBarColumn {
         Component.onCompleted: ExGlobals.Variables.experimentalDataGroup = this
     }
 
+    EaElements.GroupBox {
+        title: qsTr("Watch folder")
+        enabled: ExGlobals.Constants.proxy.fitter.isFitFinished
+
+        Column {
+            spacing: EaStyle.Sizes.fontPixelSize * 0.5
+
+            EaElements.Label {
+                text: ExGlobals.Constants.proxy.data.watchFolder === "" ?
+                          qsTr("Not watching") :
+                          ExGlobals.Constants.proxy.data.watchFolder
+            }
+
+            Row {
+                spacing: EaStyle.Sizes.fontPixelSize
+
+                EaElements.ComboBox {
+                    width: (EaStyle.Sizes.sideBarContentWidth - EaStyle.Sizes.fontPixelSize) / 2
+                    model: ExGlobals.Constants.proxy.model.modelList
+                    currentIndex: ExGlobals.Constants.proxy.data.watchModelIndex
+                    onActivated: ExGlobals.Constants.proxy.data.watchModelIndex = currentIndex
+                }
+
+                EaElements.CheckBox {
+                    topPadding: 0
+                    checked: ExGlobals.Constants.proxy.data.watchAutoFit
+                    text: qsTr("Fit new data")
+                    onToggled: ExGlobals.Constants.proxy.data.watchAutoFit = checked
+                }
+            }
+
+            Row {
+                spacing: EaStyle.Sizes.fontPixelSize
+
+                EaElements.SideBarButton {
+                    fontIcon: "folder-open"
+                    text: qsTr("Watch folder")
+                    onClicked: watchFolderDialog.open()
+                }
+
+                EaElements.SideBarButton {
+                    enabled: ExGlobals.Constants.proxy.data.watchFolder !== ""
+                    fontIcon: "stop-circle"
+                    text: qsTr("Stop watching")
+                    onClicked: ExGlobals.Constants.proxy.data.stopWatching()
+                }
+            }
+        }
+    }
+
     // EaElements.GroupBox {
     //     title: qsTr("Instrument and experiment type")
     //     enabled: ExGlobals.Constants.proxy.data.experimentLoaded ||
@@ -174,5 +224,13 @@ EaComponents.SideBarColumn {
         onAccepted: ExGlobals.Constants.proxy.data.addExperimentDataFromOrt(fileUrl)
     }
 
+    Dialogs1.FileDialog{
+        id: watchFolderDialog
+
+        selectFolder: true
+
+        onAccepted: ExGlobals.Constants.proxy.data.startWatching(fileUrl)
+    }
+
 }
 
@@ -25,7 +25,10 @@ EaComponents.SideBarColumn {
                 fontIcon: "plus-circle"
                 text: qsTr("Create a new project")
 
-                onClicked: EaGlobals.Variables.showProjectDescriptionDialog = true
+                onClicked: {
+                    ExGlobals.Constants.proxy.project.discardAutosave()
+                    EaGlobals.Variables.showProjectDescriptionDialog = true
+                }
                 Component.onCompleted: {
                     ExGlobals.Variables.createProjectButton = this
                     ExGlobals.Constants.proxy.undoredo.resetUndoRedoStack()
@@ -36,7 +39,10 @@ EaComponents.SideBarColumn {
                 fontIcon: "arrow-circle-right"
                 text: qsTr("Continue without a project")
 
-                onClicked: ExGlobals.Variables.samplePageEnabled = true
+                onClicked: {
+                    ExGlobals.Constants.proxy.project.discardAutosave()
+                    ExGlobals.Variables.samplePageEnabled = true
+                }
                 Component.onCompleted: {
                     ExGlobals.Variables.continueWithoutProjectButton = this
                     ExGlobals.Constants.proxy.undoredo.resetUndoRedoStack()
@@ -57,6 +63,19 @@ EaComponents.SideBarColumn {
                 fontIcon: "download"
                 text: qsTr("Save project as...")
             }
+
+            EaElements.SideBarButton {
+                visible: ExGlobals.Constants.proxy.project.autosaveAvailable
+
+                fontIcon: "history"
+                text: qsTr("Recover unsaved project")
+                onClicked: {
+                    ExGlobals.Constants.proxy.project.recoverAutosave()
+
+                    ExGlobals.Variables.samplePageEnabled = true
+                    ExGlobals.Variables.experimentPageEnabled = true
+                }
+            }
         }
     }
 
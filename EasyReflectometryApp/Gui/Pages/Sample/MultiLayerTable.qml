@@ -1,6 +1,5 @@
 import QtQuick 2.14
 import QtQuick.Controls 2.14
-import QtQuick.XmlListModel 2.13
 
 import easyApp.Gui.Components 1.0 as EaComponents
 import easyApp.Gui.Style 1.0 as EaStyle
@@ -13,18 +12,8 @@ EaComponents.TableView {
 
     // Table model
 
-    model: XmlListModel {
-        property int layersIndex: ExGlobals.Constants.proxy.model.currentLayersIndex + 1
-
-        xml: ExGlobals.Constants.proxy.model.layersAsXml
-        query: `/root/item[${itemsTable.currentIndex + 1}]/layers/item`
-
-        XmlRole { name: "thick"; query: "thickness/value/number()" }
-        XmlRole { name: "rough"; query: "roughness/value/number()" }
-        XmlRole { name: "materialid"; query: "material/name/string()"}
-        XmlRole { name: "thick_enabled"; query: "thickness/enabled/string()" }
-        XmlRole { name: "rough_enabled"; query: "roughness/enabled/string()" }
-    }
+    // Layers of the selected item
+    model: ExGlobals.Constants.proxy.model.layersModel
 
     // Table rows
 
@@ -46,6 +35,10 @@ EaComponents.TableView {
                 ExGlobals.Constants.proxy.model.setCurrentLayersMaterial(currentIndex)
             }
             model: ExGlobals.Constants.proxy.material.materialsName
+            property string materialid: layersModel.materialid
+            onMaterialidChanged: {
+                currentIndex = indexOfValue(materialid)
+            }
             onModelChanged: {
                 currentIndex = indexOfValue(layersModel.materialid)
             }
@@ -59,7 +52,7 @@ EaComponents.TableView {
             horizontalAlignment: Text.AlignHCenter
             width: EaStyle.Sizes.fontPixelSize * 10.0
             headerText: "Thickness/Å"
-            enabled: model.thick_enabled == "True"
+            enabled: model.thick_enabled
             text: (isNaN(layersModel.thick)) ? '--' : layersModel.thick.toFixed(2)
             onEditingFinished: ExGlobals.Constants.proxy.model.setCurrentLayersThickness(text)
         }
@@ -69,7 +62,7 @@ EaComponents.TableView {
             horizontalAlignment: Text.AlignHCenter
             width: EaStyle.Sizes.fontPixelSize * 10.0
             headerText: "Upper Roughness/Å"
-            enabled: model.rough_enabled == "True"
+            enabled: model.rough_enabled
             text: (isNaN(layersModel.rough)) ? '--' : layersModel.rough.toFixed(2)
             onEditingFinished: ExGlobals.Constants.proxy.model.setCurrentLayersRoughness(text)
         } 
@@ -121,16 +121,13 @@ EaComponents.SideBarColumn {
                         // textFormat: ExGlobals.Variables.iconifiedNames ? Text.RichText : Text.PlainText
                         // elide: Text.ElideMiddle
                         textRole: ExGlobals.Variables.iconifiedNames ? "iconified_label" : "label"
-                        model: XmlListModel {
-                            xml: ExGlobals.Constants.proxy.parameter.parametersAsXml
-                            query: "/root/item"
-                            XmlRole { name: "label"; query: "label/string()" }
-                            onXmlChanged: dependentParCurrentIndex = dependentPar.currentIndex
-                        }
+                        model: ExGlobals.Constants.proxy.parameter.parametersModel
                         onCurrentIndexChanged: {
                             //print(currentText)
                             if (dependentPar.currentIndex === -1 && model.count > 0)
                                 dependentPar.currentIndex = dependentParCurrentIndex
+                            else
+                                dependentParCurrentIndex = dependentPar.currentIndex
                         }
                     }
 
@@ -158,16 +155,12 @@ EaComponents.SideBarColumn {
                         // textFormat: ExGlobals.Variables.iconifiedNames ? Text.RichText : Text.PlainText
                         // elide: Text.ElideMiddle
                         textRole: ExGlobals.Variables.iconifiedNames ? "iconified_label" : "label"
-                        model: XmlListModel {
-                            xml: ExGlobals.Constants.proxy.parameter.parametersAsXml
-                            query: "/root/item"
-                            XmlRole { name: "label"; query: "label/string()" }
-                            // XmlRole { name: "iconified_label"; query: "iconified_label_with_index/string()" }
-                            onXmlChanged: independentParCurrentIndex = independentPar.currentIndex
-                        }
+                        model: ExGlobals.Constants.proxy.parameter.parametersModel
                         onCurrentIndexChanged: {
                             if (independentPar.currentIndex === -1 && model.count > 0)
                                 independentPar.currentIndex = independentParCurrentIndex
+                            else
+                                independentParCurrentIndex = independentPar.currentIndex
                         }
                     }
 
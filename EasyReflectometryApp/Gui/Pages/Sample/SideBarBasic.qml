@@ -1,7 +1,6 @@
 import QtQuick 2.14
 import QtQuick.Controls 2.14
 import QtQuick.Dialogs 1.3 as Dialogs1
-import QtQuick.XmlListModel 2.13
 
 import easyApp.Gui.Globals 1.0 as EaGlobals
 import easyApp.Gui.Style 1.0 as EaStyle
@@ -30,17 +29,7 @@ EaComponents.SideBarColumn {
 
             // Table model
 
-            model: XmlListModel {
-                property int materialsIndex: ExGlobals.Constants.proxy.material.currentMaterialsIndex + 1
-
-                xml: ExGlobals.Constants.proxy.material.materialsAsXml
-                query: "/root/item"
-
-                XmlRole { name: "color"; query: "color/string()" }
-                XmlRole { name: "label"; query: "name/string()" }
-                XmlRole { name: "sld"; query: "sld/value/number()" }
-                XmlRole { name: "isld"; query: "isld/value/number()" }
-            }
+            model: ExGlobals.Constants.proxy.material.materialsModel
 
             // Table rows
 
@@ -172,15 +161,7 @@ EaComponents.SideBarColumn {
             defaultInfoText: qsTr("No Models Present")
 
             // Table model
-            model: XmlListModel {
-                // property int itemsIndex: ExGlobals.Constants.proxy.model.currentItemsIndex + 1
-
-                xml: ExGlobals.Constants.proxy.model.modelsAsXml
-                query: "/root/item"
-
-                XmlRole { name: "color"; query: "color/string()" }
-                XmlRole { name: "label"; query: "name/string()" }
-            }
+            model: ExGlobals.Constants.proxy.model.modelsModel
             // Table rows
 
             delegate: EaComponents.TableViewDelegate {
@@ -288,15 +269,7 @@ EaComponents.SideBarColumn {
 
             // Table model
 
-            model: XmlListModel {
-                property int itemsIndex: ExGlobals.Constants.proxy.model.currentItemsIndex + 1
-
-                xml: ExGlobals.Constants.proxy.model.itemsAsXml
-                query: "/root/item"
-
-                XmlRole { name: "label"; query: "name/string()" }
-                XmlRole { name: "type"; query: "type/string()" }
-            }
+            model: ExGlobals.Constants.proxy.model.itemsModel
 
             // Table rows
 
@@ -324,6 +297,8 @@ EaComponents.SideBarColumn {
                     width: EaStyle.Sizes.fontPixelSize * 13.8
                     headerText: "Type"
                     model: ["Multi-layer", "Repeating Multi-layer", "Surfactant Layer"]
+                    property string itemType: itemsModel.type
+                    onItemTypeChanged: currentIndex = indexOfValue(itemType)
                     onActivated: {
                         ExGlobals.Constants.proxy.model.currentItemsType = currentValue
                         currentItemsType = ExGlobals.Constants.proxy.model.currentItemsType
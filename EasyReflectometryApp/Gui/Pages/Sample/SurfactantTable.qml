@@ -1,6 +1,5 @@
 import QtQuick 2.14
 import QtQuick.Controls 2.14
-import QtQuick.XmlListModel 2.13
 
 import easyApp.Gui.Components 1.0 as EaComponents
 import easyApp.Gui.Style 1.0 as EaStyle
@@ -12,23 +11,8 @@ EaComponents.TableView {
 
     // Table model
 
-    model: XmlListModel {
-        property int layersIndex: ExGlobals.Constants.proxy.model.currentLayersIndex + 1
-
-        xml: ExGlobals.Constants.proxy.model.layersAsXml
-        query: `/root/item[${itemsTable.currentIndex + 1}]/layers/item`
-
-        XmlRole { name: "formula"; query: "chemical_structure/string()" }
-        XmlRole { name: "thick"; query: "thickness/value/number()" }
-        XmlRole { name: "thick_enabled"; query: "thickness/enabled/string()" }
-        XmlRole { name: "rough"; query: "roughness/value/number()" }
-        XmlRole { name: "rough_enabled"; query: "roughness/enabled/string()" }
-        XmlRole { name: "apm"; query: "area_per_molecule/value/number()" }
-        XmlRole { name: "apm_enabled"; query: "area_per_molecule/enabled/string()" }
-        XmlRole { name: "solvation"; query: "solvation/value/number()" }
-        XmlRole { name: "solvation_enabled"; query: "solvation/enabled/string()" }
-        XmlRole { name: "solvent"; query: "solvent/name/string()"}
-    }
+    // Layers of the selected item
+    model: ExGlobals.Constants.proxy.model.layersModel
 
     // Table rows
 
@@ -48,7 +32,7 @@ EaComponents.TableView {
             horizontalAlignment: Text.AlignHCenter
             width: EaStyle.Sizes.fontPixelSize * 5.5
             headerText: "Thickness/Å"
-            enabled: model.thick_enabled == "True"
+            enabled: model.thick_enabled
             text: (isNaN(surfactantModel.thick)) ? '--' : surfactantModel.thick.toFixed(2)
             onEditingFinished: ExGlobals.Constants.proxy.model.setCurrentLayersThickness(text)
         }
@@ -58,7 +42,7 @@ EaComponents.TableView {
             horizontalAlignment: Text.AlignHCenter
             width: EaStyle.Sizes.fontPixelSize * 6.0
             headerText: "Roughness/Å"
-            enabled: model.rough_enabled == "True"
+            enabled: model.rough_enabled
             text: (isNaN(surfactantModel.rough)) ? '--' : surfactantModel.rough.toFixed(2)
             onEditingFinished: ExGlobals.Constants.proxy.model.setCurrentLayersRoughness(text)
         }
@@ -68,7 +52,7 @@ EaComponents.TableView {
             horizontalAlignment: Text.AlignHCenter
             width: EaStyle.Sizes.fontPixelSize * 4.5
             headerText: "Solvation"
-            enabled: model.solvation_enabled == "True"
+            enabled: model.solvation_enabled
             text: (isNaN(surfactantModel.solvation)) ? '--' : surfactantModel.solvation.toFixed(2)
             onEditingFinished: ExGlobals.Constants.proxy.model.setCurrentLayersSolvation(text)
         }
@@ -78,7 +62,7 @@ EaComponents.TableView {
             horizontalAlignment: Text.AlignHCenter
             width: EaStyle.Sizes.fontPixelSize * 4.0
             headerText: "APM/Å<sup>2</sup>"
-            enabled: model.apm_enabled == "True"
+            enabled: model.apm_enabled
             text: (isNaN(surfactantModel.apm)) ? '--' : surfactantModel.apm.toFixed(2)
             onEditingFinished: ExGlobals.Constants.proxy.model.setCurrentItemApm(text)
         }
@@ -92,6 +76,10 @@ EaComponents.TableView {
                 ExGlobals.Constants.proxy.model.setCurrentLayersSolvent(currentIndex)
             }
             model: ExGlobals.Constants.proxy.material.materialsName
+            property string solvent: surfactantModel.solvent
+            onSolventChanged: {
+                currentIndex = indexOfValue(solvent)
+            }
             onModelChanged: {
                 currentIndex = indexOfValue(surfactantModel.solvent)
             }
@@ -130,7 +130,6 @@ EaComponents.SideBarColumn {
     EaElements.GroupBox {
         title: qsTr("Export plots")
         collapsible: false
-        last: true
         ToolTip.text: qsTr("Output the plots as a pdf or png image")
         ToolTip.visible: hovered
         ToolTip.delay: 500
@@ -288,6 +287,113 @@ EaComponents.SideBarColumn {
         }
     }
 
+    EaElements.GroupBox {
+        title: qsTr("Export results")
+        collapsible: false
+        last: true
+        ToolTip.text: qsTr("Output the calculated curves, residuals and SLD profiles of every dataset")
+        ToolTip.visible: hovered
+        ToolTip.delay: 500
+
+        // Name-Format
+        Row {
+            spacing: EaStyle.Sizes.fontPixelSize * 1.5
+
+            Row {
+                spacing: EaStyle.Sizes.fontPixelSize * 0.5
+
+                EaElements.Label {
+                    enabled: false
+                    width: locationLabel3.width
+                    anchors.verticalCenter: parent.verticalCenter
+                    horizontalAlignment: TextInput.AlignRight
+                    text: qsTr("Name")
+                }
+
+                EaElements.TextField {
+                    id: reportNameField3
+
+                    width: EaStyle.Sizes.sideBarContentWidth - locationLabel3.width - formatLabel3.width - reportFormatField3.width - EaStyle.Sizes.fontPixelSize * 2.5
+                    horizontalAlignment: TextInput.AlignLeft
+                    placeholderText: qsTr("Enter results file name here")
+
+                    Component.onCompleted: text = 'Results'
+                }
+            }
+
+            Row {
+                spacing: EaStyle.Sizes.fontPixelSize * 0.5
+
+                EaElements.Label {
+                    id: formatLabel3
+                    enabled: false
+                    anchors.verticalCenter: parent.verticalCenter
+                    text: qsTr("Format")
+                }
+
+                EaElements.ComboBox {
+                    id: reportFormatField3
+
+                    topInset: 0
+                    bottomInset: 0
+                    width: EaStyle.Sizes.fontPixelSize * 10
+
+                    textRole: "text"
+                    valueRole: "value"
+                    model: [
+                        { value: 'ort', text: qsTr("ORSO text") },
+                        { value: 'dat', text: qsTr("Columns text") },
+                        { value: 'npz', text: qsTr("NumPy binary") }
+                         ]
+                }
+            }
+
+        }
+        // Location
+        Row {
+            spacing: EaStyle.Sizes.fontPixelSize * 0.5
+
+            EaElements.Label {
+                id: locationLabel3
+
+                enabled: false
+                anchors.verticalCenter: parent.verticalCenter
+                text: qsTr("Location")
+            }
+
+            EaElements.TextField {
+                id: reportLocationField3
+
+                width: EaStyle.Sizes.sideBarContentWidth - locationLabel3.width - EaStyle.Sizes.fontPixelSize * 0.5
+                rightPadding: chooseButton3.width
+                horizontalAlignment: TextInput.AlignLeft
+
+                placeholderText: qsTr("Enter output location here")
+                text: EaLogic.Utils.urlToLocalFile(reportParentDirDialog3.folder + '/' + reportNameField3.text + '.' + reportFormatField3.currentValue)
+
+                EaElements.ToolButton {
+                    id: chooseButton3
+
+                    anchors.right: parent.right
+
+                    showBackground: false
+                    fontIcon: "folder-open"
+                    ToolTip.text: qsTr("Choose results parent directory")
+
+                    onClicked: reportParentDirDialog3.open()
+                }
+            }
+        }
+
+        EaElements.SideBarButton {
+            wide: true
+            fontIcon: "file-export"
+            text: qsTr("Export results")
+
+            onClicked: ExGlobals.Constants.proxy.project.exportResults(reportLocationField3.text)
+        }
+    }
+
     // Directory dialog
     QtQuickDialogs1.FileDialog {
         id: reportParentDirDialog
@@ -310,4 +416,15 @@ EaComponents.SideBarColumn {
         folder: ExGlobals.Constants.proxy.project.currentProjectPath
     }
 
+    // Directory dialog
+    QtQuickDialogs1.FileDialog {
+        id: reportParentDirDialog3
+
+        title: qsTr("Choose results output parent directory")
+        selectFolder: true
+        selectMultiple: false
+
+        folder: ExGlobals.Constants.proxy.project.currentProjectPath
+    }
+
 }
@@ -0,0 +1,215 @@
+__author__ = 'github.com/arm61'
+
+import functools
+from contextlib import contextmanager
+from typing import Callable
+
+from easyCore import np
+from easyCore.Fitting.Constraints import ObjConstraint, NumericConstraint
+
+# `dependent = coefficient <op> independent`, as ObjConstraint evaluates
+# an operator such as '2.0*'
+ARITHMETIC = {
+    '': lambda coefficient, value: value.copy(),
+    '*': np.multiply,
+    '/': np.divide,
+    '+': np.add,
+    '-': np.subtract
+}
+
+# NumericConstraint keeps the value where `value <op> limit`, and sets it
+# to the limit otherwise
+RELATIONAL = {
+    '==': np.equal,
+    '<': np.less,
+    '>': np.greater,
+    '<=': np.less_equal,
+    '>=': np.greater_equal
+}
+
+
+class ConstraintCycleError(ValueError):
+    pass
+
+
+class ConstraintPlan:
+    """
+    The user constraints on a list of parameters, compiled into steps
+    applied to an array of parameter values. Each step evaluates, with
+    array operations, all the dependent parameters whose independent
+    parameters are already known, so a whole chain of constraints is
+    applied in one pass instead of through one callback per write.
+    """
+
+    def __init__(self, parameters: list, constraints: list):
+        """
+        :param parameters: Parameters the value arrays refer to, e.g.
+            `ParameterVector.parameters`
+        :param constraints: ObjConstraint and NumericConstraint to compile
+        :raises ValueError: If a constraint can not be compiled or a parameter
+            is set by more than one constraint
+        :raises ConstraintCycleError: If the constraints form a cycle
+        """
+        self._parameters = parameters
+        self._constraints = constraints
+        index = {id(par): i for i, par in enumerate(parameters)}
+
+        assignments = {}
+        clamps = {}
+        for constraint in constraints:
+            if not constraint.enabled:
+                continue
+            dependent = index.get(id(constraint.get_obj(constraint.dependent_obj_ids)))
+            if dependent is None:
+                raise ValueError(f'{constraint} acts on a parameter outside the plan')
+            if type(constraint) is ObjConstraint:
+                independent = index.get(id(constraint.get_obj(constraint.independent_obj_ids)))
+                if independent is None:
+                    raise ValueError(f'{constraint} acts on a parameter outside the plan')
+                if dependent in assignments:
+                    raise ValueError(f'{parameters[dependent].name} is set by more than one constraint')
+                assignments[dependent] = (independent,) + self._parseOperator(constraint.operator)
+            elif type(constraint) is NumericConstraint:
+                if constraint.operator not in RELATIONAL:
+                    raise ValueError(f'Unsupported operator in {constraint}')
+                clamps.setdefault(dependent, []).append((constraint.operator, float(constraint.value)))
+            else:
+                raise ValueError(f'Unsupported constraint {type(constraint).__name__}')
+
+        self._steps = self._compile(assignments, clamps)
+        self._dependents = np.array(sorted(assignments.keys() | clamps.keys()), dtype=int)
+        self._sources = np.array(sorted({i for i, *_ in assignments.values()} | clamps.keys()), dtype=int)
+
+    @staticmethod
+    def _parseOperator(operator: str) -> tuple:
+        if operator == '':
+            return '', 0.
+        arithmetic_operator = operator[-1]
+        try:
+            coefficient = float(operator[:-1])
+        except ValueError:
+            arithmetic_operator = None
+        if arithmetic_operator not in ARITHMETIC:
+            raise ValueError(f'Unsupported constraint operator `{operator}`')
+        return arithmetic_operator, coefficient
+
+    def _compile(self, assignments: dict, clamps: dict) -> list:
+        """
+        Order the assignments by depth in the constraint graph (Kahn's
+        algorithm), grouping each depth by arithmetic operator.
+
+        :return: List of steps, each a list of (function, dependent indices,
+            independent indices, coefficients) and a list of (function,
+            indices, limits)
+        """
+        waiting = dict(assignments)
+        known = set(range(len(self._parameters))) - waiting.keys()
+        level = sorted(i for i in clamps if i in known)
+        steps = [([], self._compileClamps(level, clamps))]
+        while waiting:
+            level = sorted(i for i, (independent, *_) in waiting.items() if independent in known)
+            if not level:
+                names = ', '.join(self._parameters[i].name for i in sorted(waiting))
+                raise ConstraintCycleError(f'Constraints form a cycle through {names}')
+            groups = {}
+            for i in level:
+                independent, arithmetic_operator, coefficient = waiting.pop(i)
+                group = groups.setdefault(arithmetic_operator, ([], [], []))
+                group[0].append(i)
+                group[1].append(independent)
+                group[2].append(coefficient)
+            assign = [(ARITHMETIC[arithmetic_operator],
+                       np.array(dependents, dtype=int),
+                       np.array(independents, dtype=int),
+                       np.array(coefficients, dtype=float))
+                      for arithmetic_operator, (dependents, independents, coefficients) in groups.items()]
+            steps.append((assign, self._compileClamps([i for i in level if i in clamps], clamps)))
+            known.update(level)
+        return steps
+
+    @staticmethod
+    def _compileClamps(level: list, clamps: dict) -> list:
+        groups = {}
+        for i in level:
+            for relational_operator, limit in clamps[i]:
+                group = groups.setdefault(relational_operator, ([], []))
+                group[0].append(i)
+                group[1].append(limit)
+        return [(RELATIONAL[relational_operator], np.array(indices, dtype=int), np.array(limits, dtype=float))
+                for relational_operator, (indices, limits) in groups.items()]
+
+    @property
+    def parameters(self) -> list:
+        return self._parameters
+
+    def __len__(self) -> int:
+        return len(self._dependents)
+
+    # # #
+    # Evaluation
+    # # #
+
+    def apply(self, values: np.ndarray) -> np.ndarray:
+        """
+        :param values: Values of all the parameters of the plan
+        :return: Copy of `values` with the constraints applied
+        """
+        values = np.array(values, dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for assign, clamp in self._steps:
+                for function, dependents, independents, coefficients in assign:
+                    values[dependents] = function(coefficients, values[independents])
+                for function, indices, limits in clamp:
+                    current = values[indices]
+                    values[indices] = np.where(function(current, limits), current, limits)
+        return values
+
+    def update(self):
+        """
+        Apply the constraints to the parameters themselves, writing only
+        the dependent parameters whose value changes.
+        """
+        if not len(self):
+            return
+        values = np.zeros(len(self._parameters))
+        involved = np.union1d(self._sources, self._dependents)
+        for i in involved:
+            values[i] = self._parameters[i].raw_value
+        constrained = self.apply(values)
+        for i in self._dependents[constrained[self._dependents] != values[self._dependents]]:
+            par = self._parameters[i]
+            enabled = par.enabled
+            if not enabled:
+                par.enabled = True
+            par.value = constrained[i].item()
+            if not enabled:
+                par.enabled = False
+
+    def wrap(self, fit_func: Callable) -> Callable:
+        """
+        :return: `fit_func`, applying the constraints before each evaluation
+        """
+        @functools.wraps(fit_func)
+        def constrained_fit_func(*args, **kwargs):
+            self.update()
+            return fit_func(*args, **kwargs)
+        return constrained_fit_func
+
+    @contextmanager
+    def detached(self):
+        """
+        Take the user constraints off the parameters for the duration of
+        the block, so parameter writes do not trigger them one by one
+        while the plan applies them, and put them back afterwards.
+        """
+        stashed = []
+        for par in self._parameters:
+            if par.user_constraints:
+                stashed.append((par, par.user_constraints))
+                par.user_constraints = {}
+        try:
+            yield self
+        finally:
+            for par, user_constraints in stashed:
+                par.user_constraints = user_constraints
+            self.update()
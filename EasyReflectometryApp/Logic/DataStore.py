@@ -1,7 +1,8 @@
 __author__ = 'github.com/wardsimon'
 
+import base64
 from abc import abstractmethod
-from typing import Union, overload, TypeVar
+from typing import Union, overload, TypeVar, Callable
 
 from easyCore import np
 from easyCore.Utils.json import MSONable, MontyDecoder
@@ -11,6 +12,73 @@ from EasyReflectometry.experiment.model import Model
 
 T = TypeVar('T')
 
+COLUMNS = ('x', 'y', 'ye', 'xe')
+
+
+def encode_array(array: np.ndarray) -> dict:
+    """
+    Encode an array as its raw little-endian buffer in base64, which
+    round-trips exactly and is far more compact than a list of numbers.
+
+    :param array: Array to encode
+    :return: JSON serialisable description of the array
+    """
+    array = np.asarray(array)
+    dtype = array.dtype.newbyteorder('<')
+    buffer = np.ascontiguousarray(array, dtype=dtype)
+    return {'@ndarray': dtype.str,
+            'shape': list(array.shape),
+            'data': base64.b64encode(buffer.tobytes()).decode('ascii')}
+
+
+def decode_array(obj: Union[dict, list]) -> np.ndarray:
+    """
+    Decode an array written by `encode_array`. Plain lists, as written by
+    older versions of the project file, are converted as they are.
+
+    :param obj: Encoded array or list of numbers
+    :return: Decoded array
+    """
+    if isinstance(obj, dict) and '@ndarray' in obj:
+        array = np.frombuffer(base64.b64decode(obj['data']), dtype=np.dtype(obj['@ndarray']))
+        return array.reshape(obj['shape'])
+    return np.array(obj)
+
+
+def validate(x: np.ndarray, y: np.ndarray, ye: np.ndarray):
+    """
+    Find the points which can be used in a fit: finite values, positive
+    uncertainties and q increasing along the dataset.
+
+    :return: Mask of the usable points and the number of points failing
+        each of the checks
+    """
+    finite = np.isfinite(x) & np.isfinite(y) & np.isfinite(ye)
+    positive_error = ye > 0
+    previous = np.maximum.accumulate(np.where(np.isfinite(x), x, -np.inf))
+    monotonic = np.ones_like(finite)
+    monotonic[1:] = x[1:] > previous[:-1]
+    counts = {'non_finite': int(np.count_nonzero(~finite)),
+              'non_positive_error': int(np.count_nonzero(~positive_error & finite)),
+              'non_monotonic': int(np.count_nonzero(~monotonic & finite))}
+    return finite & positive_error & monotonic, counts
+
+
+class EncodedColumns:
+    """
+    Loader for a dataset stored as a list of arrays encoded by `encode_array`.
+    The encoded form is kept, so it can be written out again without decoding.
+    """
+
+    def __init__(self, columns: list):
+        self.columns = columns
+
+    def __call__(self) -> list:
+        arrays = [decode_array(column) for column in self.columns]
+        if len(arrays) == 3:
+            arrays.append(np.zeros_like(arrays[2]))
+        return arrays
+
 
 class ProjectData(MSONable):
     def __init__(self, name='DataStore', exp_data=None, sim_data=None):
@@ -24,12 +92,31 @@ class ProjectData(MSONable):
 
 
 class DataStore(Sequence, MSONable):
+    """
+    Columnar store of 1D datasets. The x, y, ye and xe values of all the
+    datasets are kept in shared contiguous columns, each dataset owning a
+    (start, length) segment of them. Datasets read their arrays as views
+    onto these columns, so no per-dataset copies are made. Datasets created
+    with a loader only take their segment once their data is first used.
+    """
 
     def __init__(self, *args, name='DataStore'):
         self.name = name
-        self.items = list(args)
+        self.items = []
         self.show_legend = False
 
+        self._columns = {key: np.empty(0) for key in COLUMNS}
+        self._size = 0
+        self._version = 0
+
+        self._experiment_indices = []
+        self._simulation_indices = []
+        self._experiments = None
+        self._simulations = None
+
+        for arg in args:
+            self.append(arg)
+
     def __getitem__(self, i: int) -> T:
         return self.items.__getitem__(i)
 
@@ -37,36 +124,220 @@ class DataStore(Sequence, MSONable):
         return len(self.items)
 
     def __setitem__(self, key, value):
-        self.items[key] = value
+        if isinstance(key, slice):
+            old = self.items[key]
+            new = list(value)
+        else:
+            old = [self.items[key]]
+            new = [value]
+        # Assign to a copy first, so a slice of the wrong size fails as it
+        # does for a list, before any segment is released.
+        items = list(self.items)
+        items[key] = new if isinstance(key, slice) else value
+        for item in old:
+            self._release(item)
+        self.items = items
+        for item in new:
+            self._attach(item)
+        self._reindex()
 
     def __delitem__(self, key):
+        for item in np.atleast_1d(np.arange(len(self.items))[key]):
+            self._release(self.items[item])
         del self.items[key]
+        self._reindex()
 
     def append(self, *args):
-        self.items.append(*args)
+        for item in args:
+            self.items.append(item)
+            self._attach(item)
+        self._reindex()
 
-    def as_dict(self, skip: list = []) -> dict:
-        this_dict = super(DataStore, self).as_dict(self)
-        this_dict['items'] = [
-            item.as_dict() for item in self.items if hasattr(item, 'as_dict')
-        ]
+    # # #
+    # Indexes
+    # # #
 
-    @classmethod
-    def from_dict(cls, d):
-        items = d['items']
-        del d['items']
-        obj = cls.from_dict(d)
-        decoder = MontyDecoder()
-        obj.items = [decoder.process_decoded(item) for item in items]
-        return obj
+    @property
+    def version(self) -> int:
+        """
+        :return: Counter incremented on every change of the stored data.
+        """
+        return self._version
+
+    @property
+    def experiment_indices(self) -> list:
+        """
+        :return: Positions of the experimental datasets in the store.
+        """
+        return self._experiment_indices
+
+    @property
+    def simulation_indices(self) -> list:
+        """
+        :return: Positions of the simulated datasets in the store.
+        """
+        return self._simulation_indices
 
     @property
     def experiments(self):
-        return [self[idx] for idx in range(len(self)) if self[idx].is_experiment]
+        if self._experiments is None:
+            self._experiments = [self.items[idx] for idx in self._experiment_indices]
+        return self._experiments
 
     @property
     def simulations(self):
-        return [self[idx] for idx in range(len(self)) if self[idx].is_simulation]
+        if self._simulations is None:
+            self._simulations = [self.items[idx] for idx in self._simulation_indices]
+        return self._simulations
+
+    def _reindex(self):
+        self._experiment_indices = [idx for idx, item in enumerate(self.items) if item.is_experiment]
+        self._simulation_indices = [idx for idx, item in enumerate(self.items) if item.is_simulation]
+        self._experiments = None
+        self._simulations = None
+        self._version += 1
+
+    def _touch(self):
+        self._version += 1
+
+    # # #
+    # Columns
+    # # #
+
+    def column(self, key: str) -> np.ndarray:
+        """
+        :param key: One of 'x', 'y', 'ye' or 'xe'.
+        :return: The used part of the shared column, in storage order.
+        """
+        return self._columns[key][:self._size]
+
+    def _view(self, item, key: str) -> np.ndarray:
+        return self._columns[key][item._start:item._start + item._length]
+
+    def _reserve(self, length: int):
+        capacity = self._columns['x'].size
+        if self._size + length <= capacity:
+            return
+        capacity = max(2 * capacity, self._size + length, 64)
+        for key in COLUMNS:
+            column = np.empty(capacity)
+            column[:self._size] = self._columns[key][:self._size]
+            self._columns[key] = column
+        for other in self.items:
+            if other._store is self:
+                other._moved()
+
+    def _attach(self, item):
+        item._owner = self
+        if item._loader is not None:
+            return
+        arrays = item._arrays
+        length = arrays['x'].size
+        self._reserve(length)
+        start = self._size
+        for key in COLUMNS:
+            self._columns[key][start:start + length] = arrays[key]
+        self._size += length
+        item._store = self
+        item._start = start
+        item._length = length
+        item._arrays = None
+
+    def _release(self, item):
+        """
+        Give the segment of `item` back to the store and hand the item its
+        own copy of the data, so it stays usable once removed.
+        """
+        if item._owner is self:
+            item._owner = None
+        if item._store is not self:
+            return
+        item._arrays = {key: self._view(item, key).copy() for key in COLUMNS}
+        start, length = item._start, item._length
+        for key in COLUMNS:
+            column = self._columns[key]
+            column[start:self._size - length] = column[start + length:self._size]
+        self._size -= length
+        for other in self.items:
+            if other._store is self and other._start > start:
+                other._start -= length
+                other._moved()
+        item._store = None
+        item._start = 0
+        item._length = 0
+
+    def _replace(self, item, arrays: dict):
+        """
+        Replace the data of an attached dataset. Same-sized data is written in
+        place, otherwise the segment is moved to the end of the columns.
+        """
+        length = arrays['x'].size
+        if length == item._length:
+            for key in COLUMNS:
+                self._view(item, key)[:] = arrays[key]
+        else:
+            self._release(item)
+            item._arrays = arrays
+            self._attach(item)
+        self._touch()
+
+    # # #
+    # Serialization
+    # # #
+
+    def _segments(self) -> list:
+        """
+        :return: The x, y, ye and xe arrays of each dataset: views onto the
+            columns for attached datasets, and for datasets which were never
+            loaded, the arrays from their loader, leaving them unloaded.
+        """
+        segments = []
+        for item in self.items:
+            if item._store is self:
+                segments.append([self._view(item, key) for key in COLUMNS])
+            elif item._loader is not None:
+                segments.append([np.asarray(array, dtype=float) for array in item._loader()])
+            else:
+                segments.append([item._arrays[key] for key in COLUMNS])
+        return segments
+
+    def as_dict(self, skip: list = None) -> dict:
+        if skip is None:
+            skip = []
+        segments = self._segments()
+        offsets = np.zeros(len(self.items) + 1, dtype=int)
+        offsets[1:] = np.cumsum([segment[0].size for segment in segments])
+        this_dict = {
+            '@module': self.__class__.__module__,
+            '@class': self.__class__.__name__,
+            'name': self.name,
+            'show_legend': self.show_legend,
+            'offsets': offsets,
+            'items': [item.as_dict(skip=skip + list(COLUMNS)) for item in self.items if hasattr(item, 'as_dict')]
+        }
+        for index, key in enumerate(COLUMNS):
+            if segments:
+                this_dict[key] = np.concatenate([segment[index] for segment in segments])
+            else:
+                this_dict[key] = np.empty(0)
+        return this_dict
+
+    @classmethod
+    def from_dict(cls, d):
+        obj = cls(name=d.get('name', 'DataStore'))
+        obj.show_legend = d.get('show_legend', False)
+        offsets = np.asarray(d['offsets'], dtype=int)
+        columns = {key: np.asarray(d[key], dtype=float) for key in COLUMNS}
+        decoder = MontyDecoder()
+        items = []
+        for i, item in enumerate(d['items']):
+            segment = slice(offsets[i], offsets[i + 1])
+            item = dict(item)
+            for key in COLUMNS:
+                item[key] = columns[key][segment]
+            items.append(DataSet1D.from_dict(item, decoder=decoder))
+        obj.append(*items)
+        return obj
 
 
 class DataSet1D(MSONable):
@@ -78,44 +349,313 @@ class DataSet1D(MSONable):
                  xe: Union[np.ndarray, list] = None,
                  model: Model = None,
                  x_label: str = 'x',
-                 y_label: str = 'y'):
-
-        self._model = model
-        self._model.background = np.min(y)
-
+                 y_label: str = 'y',
+                 loader: Callable = None):
+        """
+        :param loader: Optional callable returning the x, y, ye and xe
+            arrays. When given, the data is only loaded on first use and the
+            model background is left as it is.
+        """
         if x is None:
             x = np.array([])
         if y is None:
             y = np.array([])
         if ye is None:
             ye = np.zeros_like(x)
-        if xe is None: 
+        if xe is None:
             xe = np.zeros_like(x)
 
         self.name = name
-        if not isinstance(x, np.ndarray):
-            x = np.array(x)
-        if not isinstance(y, np.ndarray):
-            y = np.array(y)
 
-        self.x = x
-        self.y = y
-        self.ye = ye
-        self.xe = xe
+        self._store = None
+        self._owner = None
+        self._start = 0
+        self._length = 0
+        self._loader = loader
+        if loader is None:
+            self._arrays = {key: np.asarray(value, dtype=float) for key, value in zip(COLUMNS, (x, y, ye, xe))}
+        else:
+            self._arrays = None
+        self._version = 0
+        self._original = None
+        self._validation = None
+
+        self._model = model
+        if self._model is not None and loader is None:
+            self._model.background = self.estimated_background
 
         self.x_label = x_label
         self.y_label = y_label
 
         self._color = None
 
+    # # #
+    # Data columns
+    # # #
+
+    @property
+    def loaded(self) -> bool:
+        """
+        :return: False while the data of a lazily created dataset is unused.
+        """
+        return self._loader is None
+
+    def _load(self):
+        x, y, ye, xe = self._loader()
+        self._loader = None
+        self._arrays = {key: np.asarray(value, dtype=float) for key, value in zip(COLUMNS, (x, y, ye, xe))}
+        if self._owner is not None:
+            self._owner._attach(self)
+
+    def _get(self, key: str) -> np.ndarray:
+        if self._loader is not None:
+            self._load()
+        if self._store is not None:
+            return self._store._view(self, key)
+        return self._arrays[key]
+
+    def _set(self, key: str, value: Union[np.ndarray, list]):
+        if self._loader is not None:
+            self._load()
+        value = np.asarray(value, dtype=float)
+        if self._store is not None:
+            if value.size != self._length:
+                raise ValueError(f'Expected {self._length} values for `{key}`, got {value.size}. '
+                                 f'Use `set_data` to change the number of points.')
+            self._store._view(self, key)[:] = value
+            self._store._touch()
+        else:
+            self._arrays[key] = value
+        self._version += 1
+
+    @property
+    def x(self) -> np.ndarray:
+        return self._get('x')
+
+    @x.setter
+    def x(self, value):
+        self._set('x', value)
+
+    @property
+    def y(self) -> np.ndarray:
+        return self._get('y')
+
+    @y.setter
+    def y(self, value):
+        self._set('y', value)
+
+    @property
+    def ye(self) -> np.ndarray:
+        return self._get('ye')
+
+    @ye.setter
+    def ye(self, value):
+        self._set('ye', value)
+
+    @property
+    def xe(self) -> np.ndarray:
+        return self._get('xe')
+
+    @xe.setter
+    def xe(self, value):
+        self._set('xe', value)
+
+    def set_data(self, x, y, ye=None, xe=None):
+        """
+        Replace all the data columns at once, possibly changing the number of points.
+        """
+        x = np.asarray(x, dtype=float)
+        if ye is None:
+            ye = np.zeros_like(x)
+        if xe is None:
+            xe = np.zeros_like(x)
+        arrays = {key: np.asarray(value, dtype=float) for key, value in zip(COLUMNS, (x, y, ye, xe))}
+        if self._store is not None:
+            self._store._replace(self, arrays)
+        else:
+            self._loader = None
+            self._arrays = arrays
+            if self._owner is not None:
+                self._owner._attach(self)
+                self._owner._touch()
+        self._version += 1
+
+    def encode(self) -> list:
+        """
+        :return: The x, y, ye and xe arrays encoded by `encode_array`. Data
+            which was never loaded is passed on as it was read.
+        """
+        if isinstance(self._loader, EncodedColumns):
+            return self._loader.columns
+        return [encode_array(self._get(key)) for key in COLUMNS]
+
+    @property
+    def version(self) -> int:
+        """
+        :return: Counter incremented on every change of the data columns.
+        """
+        return self._version
+
+    def _moved(self):
+        """
+        The segment of the data was moved within the store, so views of the
+        old one, e.g. in `fit_data`, have to be made again.
+        """
+        self._version += 1
+        self._validation = None
+
+    def __len__(self) -> int:
+        if self._loader is not None:
+            self._load()
+        if self._store is not None:
+            return self._length
+        return self._arrays['x'].size
+
+    # # #
+    # Validation
+    # # #
+
+    def _validate(self):
+        if self._validation is None or self._validation[0] != self._version:
+            x, y, ye = self.x, self.y, self.ye
+            mask, counts = validate(x, y, ye)
+            if mask.all():
+                fit_data = (x, y, 1 / ye)
+            else:
+                fit_data = (x[mask], y[mask], 1 / ye[mask])
+            self._validation = (self._version, mask, counts, fit_data)
+        return self._validation
+
+    @property
+    def mask(self) -> np.ndarray:
+        """
+        :return: True for the points which can be used in a fit.
+        """
+        return self._validate()[1]
+
+    @property
+    def validation(self) -> dict:
+        """
+        :return: Number of points which are not finite, have a non-positive
+            uncertainty or break the monotonic order of q.
+        """
+        return self._validate()[2]
+
+    @property
+    def fit_data(self) -> tuple:
+        """
+        :return: x, y and the 1/ye weights of the usable points, kept until
+            the data changes.
+        """
+        return self._validate()[3]
+
+    @property
+    def estimated_background(self) -> float:
+        """
+        :return: Smallest positive reflectivity among the usable points.
+        """
+        y = self.y[self.mask]
+        y = y[y > 0]
+        if y.size == 0:
+            return 0.0
+        return float(np.min(y))
+
+    # # #
+    # Rebinning
+    # # #
+
+    @property
+    def rebinned(self) -> bool:
+        """
+        :return: True if the data has been rebinned and can be restored.
+        """
+        return self._original is not None
+
+    def rebin(self, dq_over_q: float = None, edges: Union[np.ndarray, list] = None):
+        """
+        Rebin the data onto bins of constant relative width or onto the given
+        bin edges. Points are combined with inverse-variance weights, the
+        reflectivity uncertainty is propagated accordingly and the q
+        resolution of a bin combines the resolution of its points with the
+        spread of their q values. Points which are not finite and empty bins
+        are dropped. Rebinning always
+        starts from the original data, which can be brought back with
+        `restore`.
+
+        :param dq_over_q: Relative bin width, e.g. 0.02 for 2 %
+        :param edges: Monotonically increasing bin edges, used instead of
+            `dq_over_q`
+        """
+        if self._original is None:
+            self._original = [self._get(key).copy() for key in COLUMNS]
+        x, y, ye, xe = self._original
+        if edges is None:
+            if dq_over_q is None or dq_over_q <= 0:
+                raise ValueError('Either a positive `dq_over_q` or the bin `edges` are required.')
+            usable = x[np.isfinite(x) & (x > 0)]
+            if usable.size == 0:
+                raise ValueError('The data has no finite, positive q to rebin.')
+            x_min = np.min(usable)
+            x_max = np.max(usable)
+            n_bins = max(int(np.ceil(np.log(x_max / x_min) / np.log1p(dq_over_q))), 1)
+            edges = x_min * (1 + dq_over_q) ** np.arange(n_bins + 1)
+            edges[-1] = np.nextafter(max(edges[-1], x_max), np.inf)
+        edges = np.asarray(edges, dtype=float)
+        n_bins = edges.size - 1
+
+        index = np.digitize(x, edges) - 1
+        valid = ((index >= 0) & (index < n_bins) & np.isfinite(x)
+                 & np.isfinite(y) & np.isfinite(ye) & np.isfinite(xe))
+        index, x, y, ye, xe = index[valid], x[valid], y[valid], ye[valid], xe[valid]
+
+        if np.all(ye > 0):
+            w = 1 / ye ** 2
+        else:
+            w = np.ones_like(y)
+        w_sum = np.bincount(index, w, n_bins)
+        n = np.bincount(index, minlength=n_bins)
+        used = n > 0
+        w_sum = w_sum[used]
+
+        def mean(values):
+            return np.bincount(index, w * values, n_bins)[used] / w_sum
+
+        new_x = mean(x)
+        new_y = mean(y)
+        if np.all(ye > 0):
+            new_ye = 1 / np.sqrt(w_sum)
+        else:
+            new_ye = np.sqrt(np.bincount(index, ye ** 2, n_bins)[used]) / n[used]
+        spread = np.maximum(mean(x ** 2) - new_x ** 2, 0)
+        new_xe = np.sqrt(mean(xe ** 2) + spread)
+        self.set_data(new_x, new_y, new_ye, new_xe)
+
+    def restore(self):
+        """
+        Undo `rebin`, bringing back the data as it was before rebinning.
+        """
+        if self._original is None:
+            return
+        original = self._original
+        self._original = None
+        self.set_data(*original)
+
+    # # #
+    # Model
+    # # #
+
     @property
     def model(self):
         return self._model
 
     @model.setter
     def model(self, new_model):
+        kind_changed = (self._model is None) != (new_model is None)
         self._model = new_model
-        self._model.background = np.min(self.y)
+        if self._model is not None:
+            self._model.background = self.estimated_background
+        if kind_changed and self._store is not None:
+            self._store._reindex()
 
     @property
     def is_experiment(self) -> bool:
@@ -125,5 +665,39 @@ class DataSet1D(MSONable):
     def is_simulation(self) -> bool:
         return self._model is None
 
+    # # #
+    # Serialization
+    # # #
+
+    def as_dict(self, skip: list = None) -> dict:
+        if skip is None:
+            skip = []
+        this_dict = {
+            '@module': self.__class__.__module__,
+            '@class': self.__class__.__name__,
+            'name': self.name,
+            'x_label': self.x_label,
+            'y_label': self.y_label
+        }
+        for key in COLUMNS:
+            if key not in skip:
+                this_dict[key] = self._get(key).copy()
+        if 'model' not in skip:
+            this_dict['model'] = None if self._model is None else self._model.as_dict(skip=['interface'])
+        return this_dict
+
+    @classmethod
+    def from_dict(cls, d, decoder=None):
+        if decoder is None:
+            decoder = MontyDecoder()
+        model = d.get('model', None)
+        if model is not None:
+            model = decoder.process_decoded(model)
+        return cls(name=d['name'],
+                   x=d.get('x', None), y=d.get('y', None), ye=d.get('ye', None), xe=d.get('xe', None),
+                   model=model,
+                   x_label=d.get('x_label', 'x'),
+                   y_label=d.get('y_label', 'y'))
+
     def __repr__(self) -> str:
-        return "1D DataStore of '{:s}' Vs '{:s}' with {} data points".format(self.x_label, self.y_label, len(self.x))
+        return "1D DataStore of '{:s}' Vs '{:s}' with {} data points".format(self.x_label, self.y_label, len(self))
@@ -0,0 +1,131 @@
+__author__ = 'github.com/arm61'
+
+import os
+import glob
+import json
+import hashlib
+
+from easyCore import np
+
+FIGURE_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.EasyReflectometry', 'figures')
+FIGURE_CACHE_SIZE = 20  # rendered figures kept on disk
+
+
+def figure_spec(curves: list, plot_rq4: bool, measured: bool, figsize_x: float, figsize_y: float) -> dict:
+    """
+    Everything needed to draw the quick plot, as plain data so it can be
+    hashed and sent to another process.
+
+    :param curves: One dict per dataset or model with 'name', 'color', 'q',
+        'r_calc', 'z' and 'sld', plus 'r' and 'dr' for measured data
+    :param plot_rq4: Plot R(q)q⁴ rather than R(q)
+    :param measured: The curves have measured data
+    :param figsize_x: Width in cm
+    :param figsize_y: Height in cm
+    :return: Figure specification
+    """
+    return {'curves': curves, 'plot_rq4': plot_rq4, 'measured': measured,
+            'figsize': (figsize_x, figsize_y)}
+
+
+def figure_key(spec: dict, fmt: str, dpi: int) -> str:
+    """
+    :return: Content hash of the figure as rendered, used as its cache file name
+    """
+    content_hash = hashlib.blake2b(digest_size=16)
+    scalars = {'plot_rq4': spec['plot_rq4'], 'measured': spec['measured'],
+               'figsize': spec['figsize'], 'fmt': fmt, 'dpi': dpi}
+    content_hash.update(json.dumps(scalars, sort_keys=True).encode())
+    for curve in spec['curves']:
+        for key in sorted(curve):
+            content_hash.update(key.encode())
+            value = curve[key]
+            if isinstance(value, str):
+                content_hash.update(value.encode())
+            else:
+                content_hash.update(np.ascontiguousarray(value, dtype='<f8').tobytes())
+    return f'{content_hash.hexdigest()}.{fmt}'
+
+
+def draw_figure(fig, spec: dict):
+    """
+    Draw the reflectivity and SLD profiles of `spec` on `fig`, offsetting
+    each curve so they do not overlap.
+    """
+    gs = fig.add_gridspec(1, 2)
+    ax1 = fig.add_subplot(gs[0, 0])
+    ax2 = fig.add_subplot(gs[0, 1])
+    ax1.set_xlabel('$q$/Å$^{-1}$')
+    if spec['plot_rq4']:
+        ax1.set_ylabel('$R(q)q^4$/Å$^{-4}$')
+    else:
+        ax1.set_ylabel('$R(q)$')
+    ax2.set_xlabel('$z$/Å')
+    ax2.set_ylabel('SLD($z$)/$10^{-6}$Å$^{-2}$')
+    for i, curve in enumerate(spec['curves']):
+        q = curve['q']
+        scale = 10 ** i * (q ** 4 if spec['plot_rq4'] else 1)
+        if spec['measured']:
+            ax1.errorbar(q, curve['r'] * scale, curve['dr'] * scale,
+                         marker='', ls='', color=curve['color'], alpha=0.5)
+        ax1.plot(q, curve['r_calc'] * scale, ls='-', color=curve['color'], zorder=10, label=curve['name'])
+        ax2.plot(curve['z'], curve['sld'] + 10 * i, color=curve['color'], ls='-')
+    ax1.set_yscale('log')
+    ax1.legend()
+
+
+def render_figure(spec: dict, path: str, fmt: str, dpi: int) -> str:
+    """
+    Draw and save the figure without going through pyplot, so it can run
+    in a worker process. The file is written in one go at the end.
+
+    :return: `path`
+    """
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    figsize_x, figsize_y = spec['figsize']
+    fig = Figure(figsize=(figsize_x / 2.54, figsize_y / 2.54), constrained_layout=True)
+    FigureCanvasAgg(fig)
+    draw_figure(fig, spec)
+    temp_path = f'{path}.part'
+    fig.savefig(temp_path, dpi=dpi, format=fmt)
+    os.replace(temp_path, path)
+    return path
+
+
+class FigureCache:
+    """
+    Rendered figures on disk, named by `figure_key`.
+    """
+
+    def __init__(self, directory: str = FIGURE_CACHE_PATH, size: int = FIGURE_CACHE_SIZE):
+        self._directory = directory
+        self._size = size
+
+    def path(self, key: str) -> str:
+        os.makedirs(self._directory, exist_ok=True)
+        return os.path.join(self._directory, key)
+
+    def get(self, key: str):
+        """
+        :return: Path of the rendered figure, None if it is not cached
+        """
+        path = os.path.join(self._directory, key)
+        if os.path.isfile(path):
+            os.utime(path)
+            return path
+        return None
+
+    def prune(self):
+        """
+        Remove the least recently used figures above the cache size.
+        """
+        files = glob.glob(os.path.join(self._directory, '*.*'))
+        files = [f for f in files if not f.endswith('.part')]
+        files.sort(key=os.path.getmtime, reverse=True)
+        for path in files[self._size:]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
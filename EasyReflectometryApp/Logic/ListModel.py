@@ -0,0 +1,98 @@
+__author__ = 'github.com/arm61'
+
+from PySide2.QtCore import QAbstractListModel, QModelIndex, Qt, Signal, Property, Slot
+
+
+def _same(a, b) -> bool:
+    # NaN marks the cells shown as '--', so it has to compare equal to itself
+    return a == b or (a != a and b != b)
+
+
+class DictListModel(QAbstractListModel):
+    """
+    A list model for QML views whose rows are dictionaries and whose roles
+    are their keys. New rows are compared with the current ones, so only
+    the rows which differ are reported to the views: changed rows with
+    `dataChanged`, extra or missing rows at the end with `rowsInserted`
+    or `rowsRemoved`. Delegates of the other rows are left alone.
+    """
+
+    countChanged = Signal()
+
+    def __init__(self, roles: list, parent=None):
+        """
+        :param roles: Keys of the rows exposed to QML
+        """
+        super().__init__(parent)
+        self._roles = list(roles)
+        self._role_ids = {name: Qt.UserRole + 1 + i for i, name in enumerate(self._roles)}
+        self._rows = []
+
+    # # #
+    # QAbstractListModel
+    # # #
+
+    def roleNames(self):
+        return {role_id: name.encode() for name, role_id in self._role_ids.items()}
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or not 0 <= index.row() < len(self._rows):
+            return None
+        name = self._roles[role - Qt.UserRole - 1] if role > Qt.UserRole else None
+        return self._rows[index.row()].get(name)
+
+    # # #
+    # Setters and getters
+    # # #
+
+    @Property(int, notify=countChanged)
+    def count(self):
+        return len(self._rows)
+
+    @Slot(int, result='QVariant')
+    def get(self, row: int):
+        """
+        :return: The row as a dictionary, as `XmlListModel.get` does
+        """
+        if not 0 <= row < len(self._rows):
+            return None
+        return self._rows[row]
+
+    @property
+    def rows(self) -> list:
+        return self._rows
+
+    def setRows(self, rows: list):
+        """
+        Replace the rows, notifying the views about the difference only.
+        """
+        n_old, n_new = len(self._rows), len(rows)
+        if n_new < n_old:
+            self.beginRemoveRows(QModelIndex(), n_new, n_old - 1)
+            del self._rows[n_new:]
+            self.endRemoveRows()
+        for i in range(min(n_old, n_new)):
+            self.setRow(i, rows[i])
+        if n_new > n_old:
+            self.beginInsertRows(QModelIndex(), n_old, n_new - 1)
+            self._rows.extend(rows[n_old:])
+            self.endInsertRows()
+        if n_new != n_old:
+            self.countChanged.emit()
+
+    def setRow(self, row: int, values: dict):
+        """
+        Replace a single row, notifying the views about the roles which changed.
+        """
+        old_values = self._rows[row]
+        roles = [role_id for name, role_id in self._role_ids.items()
+                 if not _same(old_values.get(name), values.get(name))]
+        self._rows[row] = values
+        if roles:
+            index = self.index(row)
+            self.dataChanged.emit(index, index, roles)
@@ -0,0 +1,152 @@
+__author__ = 'github.com/arm61'
+
+from contextlib import contextmanager
+from typing import Callable, ContextManager
+
+from easyCore import borg
+from easyCore import np
+
+from EasyReflectometry.experiment.models import Models
+
+
+@contextmanager
+def undo_macro(text: str):
+    """
+    Record the changes made in the block as a single undo step.
+
+    :param text: Undo text
+    """
+    macro = borg.stack.enabled
+    if macro:
+        borg.stack.beginMacro(text)
+    try:
+        yield
+    finally:
+        if macro:
+            borg.stack.endMacro()
+
+
+class ParameterVector:
+    """
+    The parameters of a `Models` object seen as arrays: values, errors,
+    bounds and fixed flags, in a fixed order. Arrays are read in one pass
+    and written back in one go, as a single undo step followed by a
+    single change notification.
+    """
+
+    def __init__(self, models: Models, free_only: bool = False, notify: Callable = None,
+                 transaction: Callable[[str], ContextManager] = undo_macro):
+        """
+        :param models: Models to take the parameters from
+        :param free_only: Only the parameters which are varied in a fit,
+            enabled and not fixed
+        :param notify: Called once after each bulk change
+        :param transaction: Context manager, called with the undo text,
+            which records each bulk change as a single undo step
+        """
+        self._models = models
+        self._free_only = free_only
+        self._notify = notify
+        self._transaction = transaction
+        self._parameters = []
+        self.refresh()
+
+    def refresh(self):
+        """
+        Collect the parameters again, after the structure of the models
+        or (with `free_only`) the fixed flags changed.
+        """
+        parameters = {}
+        for par in self._models.get_parameters():
+            if self._free_only and (par.fixed or not par.enabled):
+                continue
+            parameters.setdefault(id(par), par)
+        self._parameters = list(parameters.values())
+
+    @property
+    def parameters(self) -> list:
+        return self._parameters
+
+    @property
+    def names(self) -> list:
+        return [par.name for par in self._parameters]
+
+    def __len__(self) -> int:
+        return len(self._parameters)
+
+    # # #
+    # Bulk get
+    # # #
+
+    @property
+    def values(self) -> np.ndarray:
+        return np.fromiter((par.raw_value for par in self._parameters), dtype=float, count=len(self))
+
+    @values.setter
+    def values(self, values):
+        self.set(values=values)
+
+    @property
+    def errors(self) -> np.ndarray:
+        return np.fromiter((par.error for par in self._parameters), dtype=float, count=len(self))
+
+    @property
+    def min(self) -> np.ndarray:
+        return np.fromiter((par.min for par in self._parameters), dtype=float, count=len(self))
+
+    @property
+    def max(self) -> np.ndarray:
+        return np.fromiter((par.max for par in self._parameters), dtype=float, count=len(self))
+
+    @property
+    def fixed(self) -> np.ndarray:
+        return np.fromiter((par.fixed for par in self._parameters), dtype=bool, count=len(self))
+
+    # # #
+    # Bulk set
+    # # #
+
+    def set(self, values=None, errors=None, min=None, max=None, fixed=None):
+        """
+        Set any of the arrays. Bounds are set before values, so values can
+        be moved into new bounds in the same call. Parameters are only
+        touched where the new entry differs from the current one.
+
+        :raises ValueError: If an array does not have one entry per parameter
+        """
+        columns = (('min', min, self.min), ('max', max, self.max),
+                   ('value', values, self.values), ('error', errors, self.errors),
+                   ('fixed', fixed, self.fixed))
+        changes = []
+        for attr, new, current in columns:
+            if new is None:
+                continue
+            new = np.asarray(new, dtype=current.dtype)
+            if new.shape != current.shape:
+                raise ValueError(f'Expected {len(self)} values for `{attr}`, got {new.size}')
+            for i in np.flatnonzero(new != current):
+                changes.append((self._parameters[i], attr, new[i].item()))
+        if not changes:
+            return
+        with self._transaction(f'Set {len(changes)} parameter properties'):
+            for par, attr, value in changes:
+                setattr(par, attr, value)
+            if self._notify is not None:
+                self._notify()
+
+    # # #
+    # Snapshots
+    # # #
+
+    def snapshot(self) -> dict:
+        """
+        :return: Copy of the values, errors, bounds and fixed flags
+        """
+        return {'values': self.values, 'errors': self.errors,
+                'min': self.min, 'max': self.max, 'fixed': self.fixed}
+
+    def restore(self, snapshot: dict):
+        """
+        Set the parameters back to a `snapshot` taken from this vector.
+        """
+        self.set(**snapshot)
@@ -0,0 +1,259 @@
+__author__ = 'github.com/arm61'
+
+import os
+import json
+import uuid
+import datetime
+import tempfile
+from typing import List, Union
+
+JOURNAL_FILE = 'journal.log'
+SNAPSHOT_FILE = 'snapshot.json'
+DATA_FILE = 'data.json'
+
+
+def atomic_write(path: str, content: str):
+    """
+    Write `content` to `path` so that the file is either the old or the new
+    version, never a partial one: the content goes to a temporary file in
+    the same directory which then replaces the target.
+
+    :param path: File to write
+    :param content: Text to write
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    handle, tmp_path = tempfile.mkstemp(dir=directory, prefix='.', suffix='.tmp')
+    try:
+        with os.fdopen(handle, 'w') as file:
+            file.write(content)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def diff(old, new, path: list = None) -> list:
+    """
+    Compare two JSON-like structures.
+
+    :param old: Previous structure
+    :param new: Current structure
+    :return: List of ['set', path, value] and ['del', path] operations
+        which turn `old` into `new`
+    """
+    if path is None:
+        path = []
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops = []
+        for key, value in new.items():
+            if key in old:
+                ops.extend(diff(old[key], value, path + [key]))
+            else:
+                ops.append(['set', path + [key], value])
+        for key in old:
+            if key not in new:
+                ops.append(['del', path + [key]])
+        return ops
+    if isinstance(old, list) and isinstance(new, list) and len(old) == len(new):
+        ops = []
+        for index, (old_value, new_value) in enumerate(zip(old, new)):
+            ops.extend(diff(old_value, new_value, path + [index]))
+        return ops
+    if old == new:
+        return []
+    return [['set', path, new]]
+
+
+def patch(obj, ops: list):
+    """
+    Apply operations produced by `diff` to `obj`, in place where possible.
+
+    :return: The patched structure
+    """
+    for op in ops:
+        path = op[1]
+        if not path:
+            obj = op[2]
+            continue
+        target = obj
+        for key in path[:-1]:
+            target = target[key]
+        if op[0] == 'set':
+            target[path[-1]] = op[2]
+        else:
+            del target[path[-1]]
+    return obj
+
+
+class ProjectJournal:
+    """
+    Crash recovery journal for a project. A full snapshot of the project
+    description is written from time to time and every autosave in between
+    only appends the differences to the previous state to the journal. The
+    experiment arrays are kept in their own file and rewritten only when the
+    data itself changes, so an autosave costs the same whatever the size of
+    the loaded datasets.
+
+    The snapshot and the journal both carry the generation of the
+    snapshot, so journal entries recorded before a snapshot are never
+    replayed on top of it, even if the journal could not be rotated.
+    """
+
+    def __init__(self, directory: str, compact_every: int = 50):
+        """
+        :param directory: Directory holding the journal files
+        :param compact_every: Number of journal entries after which the
+            journal is folded into a new snapshot
+        """
+        self.directory = directory
+        self.compact_every = compact_every
+        self._state = None
+        self._entries = 0
+        self._data_version = None
+
+    @classmethod
+    def new_session(cls, root: str, **kwargs) -> 'ProjectJournal':
+        """
+        Journal of this session, in a directory of its own under `root`, so
+        that the journals of earlier sessions are left alone until they are
+        recovered or discarded.
+
+        :param root: Directory holding the journals of all sessions
+        :return: Journal in a new session directory, created on first write
+        """
+        name = f'{datetime.datetime.now():%Y%m%d-%H%M%S}-{os.getpid()}'
+        return cls(os.path.join(root, name), **kwargs)
+
+    @classmethod
+    def sessions(cls, root: str) -> List['ProjectJournal']:
+        """
+        :param root: Directory holding the journals of all sessions
+        :return: The journals left behind under `root` which can be
+            recovered, the most recent first
+        """
+        if not os.path.isdir(root):
+            return []
+        journals = [cls(os.path.join(root, name)) for name in os.listdir(root)]
+        journals = [journal for journal in journals if journal.available]
+        journals.sort(key=lambda journal: os.path.getmtime(journal._path(SNAPSHOT_FILE)), reverse=True)
+        return journals
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    @property
+    def available(self) -> bool:
+        """
+        :return: True if there is something to recover.
+        """
+        return os.path.isfile(self._path(SNAPSHOT_FILE))
+
+    def checkpoint(self, descr: dict):
+        """
+        Write a full snapshot and start a new journal of the same
+        generation. Until the journal is replaced, the old one belongs to
+        the previous generation and is ignored by `recover`.
+
+        :param descr: Project description without experiment arrays
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        generation = uuid.uuid4().hex
+        atomic_write(self._path(SNAPSHOT_FILE), json.dumps({'generation': generation, 'project': descr}))
+        atomic_write(self._path(JOURNAL_FILE), json.dumps({'generation': generation}) + '\n')
+        self._state = json.loads(json.dumps(descr))
+        self._entries = 0
+
+    def record(self, descr: dict):
+        """
+        Append the changes since the last record to the journal.
+
+        :param descr: Project description without experiment arrays
+        """
+        descr = json.loads(json.dumps(descr))
+        if self._state is None or self._entries >= self.compact_every:
+            self.checkpoint(descr)
+            return
+        ops = diff(self._state, descr)
+        if not ops:
+            return
+        line = json.dumps(ops) + '\n'
+        with open(self._path(JOURNAL_FILE), 'a') as file:
+            file.write(line)
+            file.flush()
+            os.fsync(file.fileno())
+        self._state = descr
+        self._entries += 1
+
+    @property
+    def data_version(self):
+        """
+        :return: Version of the data store last passed to `record_data`.
+        """
+        return self._data_version
+
+    def record_data(self, data: dict, version: int):
+        """
+        Store the experiment arrays, if they changed since the last call.
+
+        :param data: Encoded experiment arrays
+        :param version: Version of the data store the arrays come from
+        """
+        if version == self._data_version:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        atomic_write(self._path(DATA_FILE), json.dumps(data))
+        self._data_version = version
+
+    def recover(self) -> Union[dict, None]:
+        """
+        Rebuild the last recorded project description by replaying the
+        journal on top of the snapshot, if both are of the same generation.
+
+        :return: The project description including the experiment arrays
+            or None if there is nothing to recover
+        """
+        if not self.available:
+            return None
+        with open(self._path(SNAPSHOT_FILE), 'r') as file:
+            snapshot = json.load(file)
+        descr = snapshot['project']
+        if os.path.isfile(self._path(JOURNAL_FILE)):
+            with open(self._path(JOURNAL_FILE), 'r') as file:
+                try:
+                    header = json.loads(file.readline())
+                except json.JSONDecodeError:
+                    header = None
+                if not isinstance(header, dict) or header.get('generation') != snapshot['generation']:
+                    # Entries recorded before the snapshot was written.
+                    file.seek(0, os.SEEK_END)
+                for line in file:
+                    try:
+                        ops = json.loads(line)
+                    except json.JSONDecodeError:
+                        # The last entry was cut short by the crash.
+                        break
+                    descr = patch(descr, ops)
+        if os.path.isfile(self._path(DATA_FILE)):
+            with open(self._path(DATA_FILE), 'r') as file:
+                descr.update(json.load(file))
+        return descr
+
+    def clear(self):
+        """
+        Remove the journal files and their directory, e.g. once the project
+        has been saved.
+        """
+        for name in (JOURNAL_FILE, SNAPSHOT_FILE, DATA_FILE):
+            if os.path.isfile(self._path(name)):
+                os.unlink(self._path(name))
+        try:
+            os.rmdir(self.directory)
+        except OSError:
+            # Not there yet, or holding files of something else.
+            pass
+        self._state = None
+        self._entries = 0
+        self._data_version = None
@@ -0,0 +1,80 @@
+__author__ = 'github.com/arm61'
+
+import functools
+from collections import defaultdict
+
+# Qualified name of each memoized getter -> names of the signals invalidating it
+_MEMOIZED = {}
+
+
+def memoized(*signals: str):
+    """
+    Keep the value returned by a getter of a proxy until one of `signals`
+    is emitted or the value is invalidated explicitly, see `PropertyCache`.
+    Goes below `Property`/`property`:
+
+        @Property(str, notify=modelColorChanged)
+        @memoized('modelColorChanged')
+        def modelColor(self):
+
+    :param signals: Names of signals of the proxy, or of its parent as
+        'parent.<name>', after which the value has to be computed again
+    """
+    def decorator(getter):
+        name = getter.__name__
+        _MEMOIZED[getter.__qualname__] = signals
+
+        @functools.wraps(getter)
+        def wrapper(self):
+            return self._property_cache.get(name, getter, self)
+        return wrapper
+    return decorator
+
+
+class PropertyCache:
+    """
+    Values of the memoized getters of one proxy, with hit and miss counts.
+    Created in the `__init__` of the proxy, so the signals are connected
+    before anything else, QML included, can react to them with a read.
+    """
+
+    def __init__(self, owner):
+        self._values = {}
+        self._hits = defaultdict(int)
+        self._misses = defaultdict(int)
+        prefix = f'{type(owner).__qualname__}.'
+        for qualname, signals in _MEMOIZED.items():
+            if not qualname.startswith(prefix):
+                continue
+            name = qualname[len(prefix):]
+            for signal_name in signals:
+                signal = owner
+                for attr in signal_name.split('.'):
+                    signal = getattr(signal, attr)
+                signal.connect(lambda *args, name=name: self.invalidate(name))
+
+    def get(self, name: str, getter, owner):
+        if name in self._values:
+            self._hits[name] += 1
+            return self._values[name]
+        self._misses[name] += 1
+        value = getter(owner)
+        self._values[name] = value
+        return value
+
+    def invalidate(self, *names: str):
+        """
+        Drop the values of `names`, all of them if none are given.
+        """
+        if not names:
+            self._values.clear()
+        for name in names:
+            self._values.pop(name, None)
+
+    def stats(self) -> dict:
+        """
+        :return: Number of reads served from the cache (hits) and computed
+            (misses) for each memoized getter
+        """
+        return {name: {'hits': self._hits[name], 'misses': self._misses[name]}
+                for name in sorted(self._hits.keys() | self._misses.keys())}
@@ -1,18 +1,25 @@
 __author__ = 'github.com/arm61'
 
+import time
 import pathlib
-from os import path
-from dicttoxml import dicttoxml
+from os import path, listdir
+from concurrent.futures import ThreadPoolExecutor
 
-from PySide2.QtCore import QObject, Signal, Property, Slot
+from PySide2.QtCore import QObject, Signal, Property, Slot, QTimer, QFileSystemWatcher, QCoreApplication
 
 from easyCore import np
 from easyApp.Logic.Utils.Utils import generalizePath
 
 from EasyReflectometryApp.Logic.DataStore import DataSet1D, DataStore
+from EasyReflectometryApp.Logic.ListModel import DictListModel
+from EasyReflectometryApp.Logic.PropertyCache import PropertyCache, memoized
 
 from EasyReflectometry.data import load
 
+WATCH_EXTENSIONS = ('.ort', '.dat', '.txt')
+WATCH_DEBOUNCE = 500  # ms to wait for further files before updating the GUI
+WATCH_ATTEMPTS = 5  # reads of a watched file before it is given up
+
 
 class DataProxy(QObject):
 
@@ -22,12 +29,18 @@ class DataProxy(QObject):
     experimentChanged = Signal()
     experimentRemoved = Signal()
 
-    experimentDataAsXmlChanged = Signal()
+    experimentNamesChanged = Signal()
     experimentDataAsObjChanged = Signal()
 
+    rebinningChanged = Signal()
+
+    watchFolderChanged = Signal()
+    watchFileRead = Signal(str, object)
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.parent = parent
+        self._property_cache = PropertyCache(self)
 
         self._data = DataStore()
 
@@ -35,10 +48,33 @@ class DataProxy(QObject):
 
         self._experiment_skipped = False
         self._experiment_loaded = False
-        self._experiment_data_as_xml = ""
-
-        self.experimentRemoved.connect(self._setExperimentDataAsXml)
-        self.experimentChanged.connect(self._setExperimentDataAsXml)
+        self._experiment_data_model = DictListModel(['label', 'color', 'model_index', 'model_name'], self)
+
+        self._rebinning = 1.0
+        self._rebin_on_import = False
+
+        self._watch_folder = ''
+        self._watch_model_index = 0
+        self._watch_auto_fit = False
+        self._watch_seen = set()
+        self._watch_pending = []
+        self._watch_reads = {}
+        self._watch_attempts = {}
+        self._watch_retry = set()
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(self._onWatchFolderChanged)
+        self._watch_executor = None
+        self._watch_timer = QTimer(self)
+        self._watch_timer.setSingleShot(True)
+        self._watch_timer.setInterval(WATCH_DEBOUNCE)
+        self._watch_timer.timeout.connect(self._ingestWatchedFiles)
+        self.watchFileRead.connect(self._onWatchFileRead)
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.stopWatching)
+
+        self.experimentRemoved.connect(self._setExperimentDataModel)
+        self.experimentChanged.connect(self._setExperimentDataModel)
         self.experimentLoadedChanged.connect(self._onExperimentLoadedChanged)
         self.experimentSkippedChanged.connect(self._onExperimentSkippedChanged)
 
@@ -46,7 +82,7 @@ class DataProxy(QObject):
     # Setters and getters
     # # #
 
-    @Property(list, notify=experimentDataAsXmlChanged)
+    @Property(list, notify=experimentNamesChanged)
     def experimentNames(self):
         return [f'{i.model.name}/{i.name}' for i in self._data.experiments]
 
@@ -79,24 +115,34 @@ class DataProxy(QObject):
         self._experiment_loaded = loaded
         self.experimentLoadedChanged.emit()
 
-    @Property(str, notify=experimentDataAsXmlChanged)
-    def experimentDataAsXml(self):
-        return self._experiment_data_as_xml
+    @Property(QObject, constant=True)
+    def experimentDataModel(self):
+        return self._experiment_data_model
 
-    def _setExperimentDataAsXml(self):
-        self._experiment_data_as_xml = dicttoxml(self.experimentDataAsObj).decode()
-        self.experimentDataAsXmlChanged.emit()
+    def _setExperimentDataModel(self):
+        self._property_cache.invalidate('experimentDataAsObj')
+        self._experiment_data_model.setRows([
+            {'label': i['name'], 'color': i['color'], 'model_index': i['model_index'], 'model_name': i['model_name']}
+            for i in self.experimentDataAsObj])
+        self.experimentNamesChanged.emit()
 
     @Property('QVariant', notify=experimentDataAsObjChanged)
+    @memoized('experimentDataAsObjChanged', 'experimentChanged', 'experimentRemoved',
+              'parent.sampleChanged', 'parent.itemsChanged', 'parent.layersChanged',
+              'parent.parameterValuesChanged')
     def experimentDataAsObj(self):
+        models = self.parent._model_proxy._model
+        model_indices = {id(model): i for i, model in enumerate(models)}
         experiment_data_as_obj = []
         for experiment in self._data.experiments:
+            model_index = model_indices[id(experiment.model)]
+            model = models[model_index]
             dictionary = {'name': experiment.name}
-            dictionary['model_index'] = self.parent._model_proxy._model.index(experiment.model)
-            dictionary['color'] = self.parent._model_proxy._colors[dictionary['model_index']]
-            dictionary['model_name'] = self.parent._model_proxy._model[dictionary['model_index']].name
-            dictionary['resolution'] = self.parent._model_proxy._model[dictionary['model_index']].resolution.raw_value 
-            dictionary['background'] = self.parent._model_proxy._model[dictionary['model_index']].background.raw_value
+            dictionary['model_index'] = model_index
+            dictionary['color'] = self.parent._model_proxy._colors[model_index]
+            dictionary['model_name'] = model.name
+            dictionary['resolution'] = model.resolution.raw_value
+            dictionary['background'] = model.background.raw_value
             experiment_data_as_obj.append(dictionary)
         return experiment_data_as_obj
 
@@ -169,6 +215,38 @@ class DataProxy(QObject):
             return self._data[self.currentDataIndex].name 
         except IndexError:
             return None
+
+    @Property(float, notify=rebinningChanged)
+    def rebinning(self):
+        return self._rebinning
+
+    @rebinning.setter
+    def rebinning(self, new_rebinning: float):
+        """
+        :param new_rebinning: Relative bin width dq/q in %
+        """
+        if self._rebinning == new_rebinning:
+            return
+        self._rebinning = new_rebinning
+        self.rebinningChanged.emit()
+
+    @Property(bool, notify=rebinningChanged)
+    def rebinOnImport(self):
+        return self._rebin_on_import
+
+    @rebinOnImport.setter
+    def rebinOnImport(self, rebin: bool):
+        if self._rebin_on_import == rebin:
+            return
+        self._rebin_on_import = rebin
+        self.rebinningChanged.emit()
+
+    @Property(bool, notify=experimentChanged)
+    def currentDataRebinned(self):
+        try:
+            return self._data[self.currentDataIndex].rebinned
+        except IndexError:
+            return False
             
     # # #
     # Actions
@@ -185,7 +263,7 @@ class DataProxy(QObject):
             self.parent._simulation_proxy.simulationParametersChanged.emit()
 
     def _onExperimentDataChanged(self):
-        self._setExperimentDataAsXml()
+        self._setExperimentDataModel()
         self.parent._state_proxy.stateChanged.emit(True)
 
     def _onExperimentDataRemoved(self):
@@ -194,6 +272,19 @@ class DataProxy(QObject):
 
     def _loadExperimentData(self, file_url):
         file_path = generalizePath(file_url)
+        model = self.parent._model_proxy._model[0]
+        self._data.append(*self._createDataSets(self._readExperimentFile(file_path), model))
+
+    @staticmethod
+    def _readExperimentFile(file_path: str) -> list:
+        """
+        Read the datasets in an .ort or columnar text file. This does not
+        touch the proxy, so it can run outside of the GUI thread.
+
+        :param file_path: File to read
+        :return: List of (name, x, y, ye, xe) tuples
+        """
+        datasets = []
         if file_path[-4:] == '.ort':
             read_data = load(file_path)
             for i, d in enumerate(read_data.dims):
@@ -202,11 +293,7 @@ class DataProxy(QObject):
                 y = read_data[f"R{d[2:]}"].values
                 ye = np.sqrt(read_data[f"R{d[2:]}"].variances)
                 name = f"{d[3:]}" 
-                ds = DataSet1D(name=name, x=x, y=y, ye=ye, xe=xe, 
-                               model=self.parent._model_proxy._model[0], 
-                               x_label='q (1/angstrom)', 
-                               y_label='Reflectivity')
-                self._data.append(ds)
+                datasets.append((name, x, y, ye, xe))
         else:
             try:
                 x, y, ye, xe = np.loadtxt(file_path, unpack=True)
@@ -214,11 +301,30 @@ class DataProxy(QObject):
                 x, y, ye = np.loadtxt(file_path, unpack=True)
                 xe = np.zeros_like(ye)
             name = path.split(file_path)[-1].split('.')[0]
+            datasets.append((name, x, y, ye, xe))
+        return datasets
+
+    def _createDataSets(self, datasets: list, model) -> list:
+        """
+        :param datasets: List of (name, x, y, ye, xe) tuples
+        :param model: Model the datasets are attached to
+        :return: List of `DataSet1D`, rebinned if so requested
+        """
+        created = []
+        for name, x, y, ye, xe in datasets:
             ds = DataSet1D(name=name, x=x, y=y, ye=ye, xe=xe, 
-                           model=self.parent._model_proxy._model[0], 
+                           model=model, 
                            x_label='q (1/angstrom)', 
                            y_label='Reflectivity')
-            self._data.append(ds)
+            if self._rebin_on_import:
+                ds.rebin(self._rebinning / 100)
+            counts = ds.validation
+            if any(counts.values()):
+                print(f"Masked points in {name}: {counts['non_finite']} not finite, "
+                      f"{counts['non_positive_error']} with non-positive errors, "
+                      f"{counts['non_monotonic']} out of q order")
+            created.append(ds)
+        return created
 
     @Property(int, notify=experimentChanged)
     def currentDataIndex(self):
@@ -253,6 +359,181 @@ class DataProxy(QObject):
         self.experimentSkipped = False
         self.experimentChanged.emit()
 
+    @Slot()
+    def rebinExperiment(self):
+        """
+        Rebins the currently selected dataset to the relative bin width
+        given by `rebinning`.
+        """
+        self._data[self.currentDataIndex].rebin(self._rebinning / 100)
+        self._onExperimentDataRebinned()
+
+    @Slot()
+    def restoreExperiment(self):
+        """
+        Brings back the original data of the currently selected dataset.
+        """
+        if not self._data[self.currentDataIndex].rebinned:
+            return
+        self._data[self.currentDataIndex].restore()
+        self._onExperimentDataRebinned()
+
+    def _onExperimentDataRebinned(self):
+        self.parent._state_proxy.stateChanged.emit(True)
+        self.experimentChanged.emit()
+        self.parent._simulation_proxy._onCalculatedDataChanged()
+
+    # # #
+    # Watch folder
+    # # #
+
+    @Property(str, notify=watchFolderChanged)
+    def watchFolder(self):
+        return self._watch_folder
+
+    @Property(int, notify=watchFolderChanged)
+    def watchModelIndex(self):
+        return self._watch_model_index
+
+    @watchModelIndex.setter
+    def watchModelIndex(self, new_index: int):
+        if self._watch_model_index == new_index or new_index == -1:
+            return
+        self._watch_model_index = new_index
+        self.watchFolderChanged.emit()
+
+    @Property(bool, notify=watchFolderChanged)
+    def watchAutoFit(self):
+        return self._watch_auto_fit
+
+    @watchAutoFit.setter
+    def watchAutoFit(self, auto_fit: bool):
+        if self._watch_auto_fit == auto_fit:
+            return
+        self._watch_auto_fit = auto_fit
+        self.watchFolderChanged.emit()
+
+    @Slot(str)
+    def startWatching(self, folder_url):
+        """
+        Watch a folder for new data files. Files already in the folder are
+        left alone, new ones are read in the background and added to the
+        model selected by `watchModelIndex`.
+
+        :param folder_url: Folder to watch
+        """
+        self.stopWatching()
+        folder = generalizePath(folder_url)
+        if not path.isdir(folder):
+            print(f"Failed to find folder: '{folder}'")
+            return
+        self._watch_folder = folder
+        self._watch_seen = set(self._watchedFiles(folder))
+        self._watch_executor = ThreadPoolExecutor(max_workers=1)
+        self._watcher.addPath(folder)
+        self.watchFolderChanged.emit()
+
+    @Slot()
+    def stopWatching(self):
+        """
+        Stop watching the folder. Files read but not added yet are dropped
+        and reads still running are abandoned.
+        """
+        if not self._watch_folder:
+            return
+        self._watcher.removePath(self._watch_folder)
+        self._watch_timer.stop()
+        self._watch_executor.shutdown(wait=False, cancel_futures=True)
+        self._watch_executor = None
+        self._watch_folder = ''
+        self._watch_seen = set()
+        self._watch_pending = []
+        self._watch_reads = {}
+        self._watch_attempts = {}
+        self._watch_retry = set()
+        self.watchFolderChanged.emit()
+
+    @staticmethod
+    def _watchedFiles(folder: str) -> list:
+        return [path.join(folder, name) for name in listdir(folder)
+                if path.splitext(name)[1].lower() in WATCH_EXTENSIONS]
+
+    def _onWatchFolderChanged(self, folder: str):
+        if folder != self._watch_folder:
+            return
+        for file_path in self._watchedFiles(folder):
+            if file_path in self._watch_seen:
+                continue
+            self._watch_seen.add(file_path)
+            self._submitWatchedFile(file_path)
+
+    def _submitWatchedFile(self, file_path: str):
+        future = self._watch_executor.submit(self._readWatchedFile, file_path)
+        self._watch_reads[file_path] = future
+        self._watch_attempts[file_path] = self._watch_attempts.get(file_path, 0) + 1
+        future.add_done_callback(lambda f, p=file_path: self.watchFileRead.emit(p, f))
+
+    @classmethod
+    def _readWatchedFile(cls, file_path: str, interval: float = 0.2, timeout: float = 10) -> list:
+        """
+        Read a file once its size stopped changing, as it shows up in the
+        folder before the instrument has finished writing it.
+        """
+        size = -1
+        waited = 0
+        while path.getsize(file_path) != size and waited < timeout:
+            size = path.getsize(file_path)
+            time.sleep(interval)
+            waited += interval
+        return cls._readExperimentFile(file_path)
+
+    def _onWatchFileRead(self, file_path: str, future):
+        """
+        Collect a file read in the background. The GUI is only updated once
+        no further files arrived for `WATCH_DEBOUNCE` ms. Reads from before
+        the folder was last (re)started are ignored.
+        """
+        if self._watch_reads.get(file_path) is not future:
+            return
+        del self._watch_reads[file_path]
+        try:
+            datasets = future.result()
+        except Exception as exception:
+            # Most likely the file is still being written, read it again
+            # when the timer runs out. Once given up, the file is read
+            # again on the next change of the folder.
+            print(f'Failed to read {file_path}: {exception}')
+            if self._watch_attempts[file_path] < WATCH_ATTEMPTS:
+                self._watch_retry.add(file_path)
+                self._watch_timer.start()
+            else:
+                del self._watch_attempts[file_path]
+                self._watch_seen.discard(file_path)
+            return
+        del self._watch_attempts[file_path]
+        self._watch_pending.extend(datasets)
+        self._watch_timer.start()
+
+    def _ingestWatchedFiles(self):
+        retry, self._watch_retry = self._watch_retry, set()
+        for file_path in sorted(retry):
+            self._submitWatchedFile(file_path)
+        if not self._watch_pending:
+            return
+        models = self.parent._model_proxy._model
+        model = models[min(self._watch_model_index, len(models) - 1)]
+        datasets = self._createDataSets(self._watch_pending, model)
+        self._watch_pending = []
+        self._data.append(*datasets)
+        print(f'Added {len(datasets)} dataset(s) from {self._watch_folder}')
+        self.experimentLoaded = True
+        self.experimentSkipped = False
+        self.experimentChanged.emit()
+        if self._watch_auto_fit and self.parent._fitter_proxy.isFitFinished:
+            # The fit starts from the current parameter values, i.e. from the
+            # result of the previous fit.
+            QTimer.singleShot(0, self.parent._fitter_proxy.fit)
+
     @Slot(int)
     def removeExperiment(self, idx):
         del self._data[idx]
@@ -266,6 +547,6 @@ class DataProxy(QObject):
 
         self.experimentLoaded = False
         self.experimentSkipped = False
-        self._experiment_data_as_xml = ""
-        self.experimentDataAsXmlChanged.emit()
+        self._experiment_data_model.setRows([])
+        self.experimentNamesChanged.emit()
 
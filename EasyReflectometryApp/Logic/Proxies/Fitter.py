@@ -1,6 +1,7 @@
 __author__ = 'github.com/arm61'
 
 import sys
+from contextlib import nullcontext
 from dicttoxml import dicttoxml
 from distutils.util import strtobool
 
@@ -134,18 +135,46 @@ class FitterProxy(QObject):
     # # #
 
     def nonthreaded_fit(self):
-        interfaces = [self.parent._interface.fit_func for i in self.parent._data_proxy._data] 
+        interfaces = [self.parent._interface.fit_func for i in self.parent._data_proxy._data]
+        # Apply the constraints once per evaluation of the model rather than
+        # through callbacks on every parameter write
+        try:
+            plan = self.parent._parameter_proxy.constraintPlan()
+        except ValueError as ex:
+            print(f'Constraints applied one by one: {ex}')
+            plan = None
+        if plan is not None and len(plan):
+            interfaces = [plan.wrap(fit_func) for fit_func in interfaces]
+            constraints = plan.detached()
+        else:
+            constraints = nullcontext()
         self.eFitter = easyFitter([i.model for i in self.parent._data_proxy._data],
                                   interfaces)
         self.isFitFinished = False
         exp_data = self.parent._data_proxy._data.experiments
 
-        x = [i.x for i in exp_data]
-        y = [i.y for i in exp_data]
-        weights = [1 / i.ye for i in exp_data]
+        # Points which are not finite, have no uncertainty or break the
+        # order of q are left out, see `DataSet1D.fit_data`.
+        fit_data = [i.fit_data for i in exp_data]
+        x = [i[0] for i in fit_data]
+        y = [i[1] for i in fit_data]
+        weights = [i[2] for i in fit_data]
         method = self.parent.minimizer._current_minimizer_method_name
 
-        res = self.eFitter.easy_f.fit_lists(x, y, weights_list=weights, method=method)
+        # Put the free parameters back where they were if the fit fails
+        free_parameters = self.parent._parameter_proxy.parameterVector(free_only=True)
+        start = free_parameters.snapshot()
+        try:
+            with constraints:
+                res = self.eFitter.easy_f.fit_lists(x, y, weights_list=weights, method=method)
+        except Exception as ex:
+            print(f'Fit failed: {ex}')
+            free_parameters.restore(start)
+            self._fit_results = self._defaultFitResults()
+            self._fit_results['success'] = False
+            self.fitResultsChanged.emit()
+            self._setFitResultsFailed(str(ex))
+            return
         self._setFitResults(res)
 
     # def threaded_fit(self):
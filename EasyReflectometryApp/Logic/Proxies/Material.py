@@ -1,37 +1,39 @@
 __author__ = 'github.com/arm61'
 
-from dicttoxml import dicttoxml
-
-from matplotlib import cm, colors
+from matplotlib import cm
 
 from PySide2.QtCore import QObject, Signal, Property, Slot
 
-from easyCore import borg
+from easyCore import np, borg
 
 from EasyReflectometry.sample.material import Material
 from EasyReflectometry.sample.materials import Materials
 
+from EasyReflectometryApp.Logic.ListModel import DictListModel
+
 COLOURMAP = cm.get_cmap('Blues', 100)
 MIN_SLD = -3
 MAX_SLD = 15
+SLD_COLOR_CACHE_SIZE = 1000
 
 
 class MaterialProxy(QObject):
 
     materialsChanged = Signal()
     materialsIndexChanged = Signal()
-    materialsAsXmlChanged = Signal()
 
     def __init__(self, parent=None):
         super().__init__(parent)
         self.parent = parent
 
-        self._materials_as_xml = ""
+        self._materials_model = DictListModel(['color', 'label', 'sld', 'isld'], self)
+        self._materials_fingerprint = None
+        self._sld_colors = {}
         self._materials = self._defaultMaterials()
 
         self._current_materials_index = 0
 
-        self.materialsChanged.connect(self._setMaterialsAsXml)
+        self.materialsChanged.connect(self._setMaterialsModel)
 
     # # #
     # Defaults
@@ -54,29 +56,57 @@ class MaterialProxy(QObject):
     @property
     def materialsAsObj(self):
         """
-        :return: A list of the materials to be converted to XML.
+        :return: A list of the materials as dictionaries with their name,
+            SLD, iSLD and colour.
         """
-        _materials_as_obj = []
-        for i in self._materials:
-            dictionary = i.as_dict(skip=['interface', 'min', 'max', 'error', 'fixed', 'description', 'url'])
-            dictionary['color'] = colors.rgb2hex(
-                COLOURMAP((dictionary['sld']['value'] - MIN_SLD) / (MAX_SLD - MIN_SLD)))
-            _materials_as_obj.append(dictionary)
-        return _materials_as_obj
+        slds = [i.sld.raw_value for i in self._materials]
+        return [{'name': i.name, 'sld': sld, 'isld': i.isld.raw_value, 'color': color}
+                for i, sld, color in zip(self._materials, slds, self._sldColors(slds))]
 
-    @Property(str, notify=materialsAsXmlChanged)
-    def materialsAsXml(self):
+    def _sldColors(self, slds: list) -> list:
         """
-        :return: The list of materials as XML.
+        Colours of the SLD values on the colour map. Values not seen before
+        are mapped together in one call, and the colours of finite values
+        are kept by value. Non-finite values get the colour map's colour
+        for them (bad, under or over) and are not kept.
+
+        :param slds: SLD values
+        :return: Hex colour of each value
         """
-        return self._materials_as_xml
+        finite = {sld for sld in slds if np.isfinite(sld)}
+        if len(finite | self._sld_colors.keys()) > SLD_COLOR_CACHE_SIZE:
+            self._sld_colors = {}
+        missing = sorted(finite - self._sld_colors.keys())
+        non_finite = [sld for sld in slds if not np.isfinite(sld)]
+        values = np.array(missing + non_finite, dtype=float)
+        hex_colors = []
+        if values.size:
+            rgb = np.round(COLOURMAP((values - MIN_SLD) / (MAX_SLD - MIN_SLD))[:, :3] * 255).astype(int)
+            hex_colors = [f'#{red:02x}{green:02x}{blue:02x}' for red, green, blue in rgb.tolist()]
+            self._sld_colors.update(zip(missing, hex_colors))
+        non_finite_colors = iter(hex_colors[len(missing):])
+        return [self._sld_colors[sld] if np.isfinite(sld) else next(non_finite_colors) for sld in slds]
 
-    def _setMaterialsAsXml(self):
+    @Property(QObject, constant=True)
+    def materialsModel(self):
         """
-        Sets the _materials_as_xml object. 
+        :return: The list model of the materials table.
         """
-        self._materials_as_xml = dicttoxml(self.materialsAsObj).decode()
-        self.materialsAsXmlChanged.emit()
+        return self._materials_model
+
+    def _setMaterialsModel(self):
+        """
+        Updates the rows of the materials table which changed, if the name
+        or SLD of any material changed.
+        """
+        fingerprint = tuple((i.name, i.sld.raw_value, i.isld.raw_value) for i in self._materials)
+        if fingerprint == self._materials_fingerprint:
+            return
+        self._materials_fingerprint = fingerprint
+        self._materials_model.setRows([
+            {'color': material['color'], 'label': material['name'],
+             'sld': material['sld'], 'isld': material['isld']}
+            for material in self.materialsAsObj])
 
     @Property(list, notify=materialsChanged)
     def materialsName(self):
@@ -110,15 +140,17 @@ class MaterialProxy(QObject):
         """
         Add a new material.
         """
-        borg.stack.enabled = False
+        # force_state leaves an open undo macro, e.g. of a transaction, running
+        enabled = borg.stack.enabled
+        borg.stack.force_state(False)
         self._materials.append(
             Material.from_pars(2.074,
                                0.000,
                                name=f'Si',
                                interface=self.parent._interface))
-        borg.stack.enabled = True
-        self.materialsChanged.emit()
-        self.parent.layersMaterialsChanged.emit()
+        borg.stack.force_state(enabled)
+        self.parent.notify('materialsChanged', sender=self)
+        self.parent.notify('layersMaterialsChanged')
 
     @Slot()
     def duplicateSelectedMaterials(self):
@@ -127,7 +159,8 @@ class MaterialProxy(QObject):
         """
         # if borg.stack.enabled:
         #    borg.stack.beginMacro('Loaded default material')
-        borg.stack.enabled = False
+        enabled = borg.stack.enabled
+        borg.stack.force_state(False)
         # This is a fix until deepcopy is worked out
         # Manual duplication instead of creating a copy
         to_dup = self._materials[self.currentMaterialsIndex]
@@ -136,9 +169,9 @@ class MaterialProxy(QObject):
                                to_dup.isld.raw_value,
                                name=to_dup.name,
                                interface=self.parent._interface))
-        borg.stack.enabled = True
-        self.materialsChanged.emit()
-        self.parent.layersMaterialsChanged.emit()
+        borg.stack.force_state(enabled)
+        self.parent.notify('materialsChanged', sender=self)
+        self.parent.notify('layersMaterialsChanged')
 
     @Slot(str)
     def removeMaterials(self, i: str):
@@ -1,11 +1,12 @@
 __author__ = 'github.com/arm61'
 
+import functools
 from ast import Mult
-from dicttoxml import dicttoxml
+from contextlib import contextmanager
 
 from PySide2.QtCore import QObject, Signal, Property, Slot
 
-from easyCore import np, borg
+from easyCore import np
 from easyCore.Utils.UndoRedo import property_stack_deco
 
 from EasyReflectometry.sample.layer import Layer
@@ -16,6 +17,10 @@ from EasyReflectometry.experiment.models import Models
 from EasyReflectometry.interface import InterfaceFactory
 from numpy import isin
 
+from EasyReflectometryApp.Logic.ListModel import DictListModel
+from EasyReflectometryApp.Logic.PropertyCache import PropertyCache, memoized
+from EasyReflectometryApp.Logic.Reorder import move
+
 ITEM_LOOKUP = {'Multi-layer': MultiLayer, 'Repeating Multi-layer': RepeatingMultiLayer, 'Surfactant Layer': SurfactantLayer}
 COLORS =["#0173B2", "#DE8F05", "#029E73", "#D55E00", "#CC78BC", "#CA9161", "#FBAFE4", "#949494", "#ECE133", "#56B4E9"]
 
@@ -29,17 +34,18 @@ class ModelProxy(QObject):
     itemsIndexChanged = Signal()
     layersIndexChanged = Signal()
     
-    modelsAsXmlChanged = Signal()
-    itemsAsXmlChanged = Signal()
-    layersAsXmlChanged = Signal()
+    modelColorChanged = Signal()
 
     def __init__(self, parent=None):
         super().__init__(parent)
         self.parent = parent
+        self._property_cache = PropertyCache(self)
 
-        self._models_as_xml = ""
-        self._items_as_xml = ""
-        self._layers_as_xml = ""
+        self._models_model = DictListModel(['color', 'label'], self)
+        self._items_model = DictListModel(['label', 'type'], self)
+        self._layers_model = DictListModel(['materialid', 'thick', 'thick_enabled', 'rough', 'rough_enabled',
+                                            'formula', 'apm', 'apm_enabled', 'solvation', 'solvation_enabled',
+                                            'solvent'], self)
         self._structure = self._defaultStructure()
         self._model = Models.from_pars(self._defaultModel(structure=self._structure, interface=parent._interface))
         self._colors = [COLORS[0]]
@@ -88,6 +94,7 @@ class ModelProxy(QObject):
 
 
     @property
+    @memoized('modelsNameChanged', 'modelChanged', 'parent.sampleChanged', 'parent.itemsChanged', 'parent.layersChanged')
     def modelsAsObj(self):
         _models_as_obj = []
         for i, m in enumerate(self._model):
@@ -96,18 +103,19 @@ class ModelProxy(QObject):
             _models_as_obj.append(dictionary)
         return _models_as_obj
 
-    @Property(str, notify=modelsAsXmlChanged)
+    @Property(str, notify=modelColorChanged)
+    @memoized('modelColorChanged', 'modelChanged')
     def modelColor(self):
         return self._colors[self.currentModelIndex]
 
-    @Property(str, notify=modelsAsXmlChanged)
-    def modelsAsXml(self):
-        print('>>> itemsAsXml')
-        return self._models_as_xml
+    @Property(QObject, constant=True)
+    def modelsModel(self):
+        return self._models_model
 
-    def _setModelsAsXml(self):
-        self._models_as_xml = dicttoxml(self.modelsAsObj).decode()
-        self.modelsAsXmlChanged.emit()
+    def _setModelsModel(self):
+        self._property_cache.invalidate('modelsAsObj', 'modelColor')
+        self._models_model.setRows([{'color': i['color'], 'label': i['name']} for i in self.modelsAsObj])
+        self.modelColorChanged.emit()
 
     @Property(list, notify=modelsNameChanged)
     def modelList(self):
@@ -123,10 +131,12 @@ class ModelProxy(QObject):
         self.parent.sampleChanged.emit()
 
     @Property(list, notify=itemsNameChanged)
+    @memoized('itemsNameChanged', 'modelChanged', 'parent.sampleChanged', 'parent.itemsChanged', 'parent.layersChanged')
     def itemsNamesConstrain(self):
         return [i['name'] for i in self.itemsAsObj[1:] if i['type'] != 'Surfactant Layer']
 
     @property
+    @memoized('itemsNameChanged', 'modelChanged', 'parent.sampleChanged', 'parent.itemsChanged', 'parent.layersChanged')
     def itemsAsObj(self):
         _items_as_obj = []
         for i in self._model[self.currentModelIndex].structure:
@@ -135,37 +145,56 @@ class ModelProxy(QObject):
             _items_as_obj.append(dictionary)
         return _items_as_obj
 
-    @Property(str, notify=itemsAsXmlChanged)
-    def itemsAsXml(self):
-        print('>>> itemsAsXml')
-        return self._items_as_xml
+    @Property(QObject, constant=True)
+    def itemsModel(self):
+        return self._items_model
 
-    def _setItemsAsXml(self):
-        self._items_as_xml = dicttoxml(self.itemsAsObj).decode()
-        self.itemsAsXmlChanged.emit()
+    def _setItemsModel(self):
+        self._property_cache.invalidate('itemsAsObj', 'itemsNamesConstrain')
+        self._items_model.setRows([{'label': i['name'], 'type': i['type']} for i in self.itemsAsObj])
 
     @property
+    @memoized('itemsIndexChanged', 'modelChanged', 'parent.layersSelectionChanged', 'parent.sampleChanged', 'parent.itemsChanged', 'parent.layersChanged',
+              'parent.parameterValuesChanged')
     def layersAsObj(self):
-        _layers_as_obj = []
-        for i in self._model[self.currentModelIndex].structure:
-            dictionary = {'layers': [j.as_dict(skip=['interface', 'min', 'max', 'error', 'fixed', 'description', 'url']) for j in i.layers]}
-            if 'repetitions' in dictionary.keys():
-                dictionary['repetitions'] = i.repetitions.as_dict(skip=['interface', 'min', 'max', 'error', 'fixed', 'description', 'url'])
-            _layers_as_obj.append(dictionary)
-        if len(self._model[self.currentModelIndex].structure) > 0:
-            _layers_as_obj[0]['layers'][0]['thickness']['value'] = np.nan
-            _layers_as_obj[0]['layers'][0]['roughness']['value'] = np.nan
-            _layers_as_obj[-1]['layers'][-1]['thickness']['value'] = np.nan
+        """
+        :return: The layers of the current item as table rows. The thickness
+            and roughness of the semi-infinite super- and subphase are NaN.
+        """
+        structure = self._model[self.currentModelIndex].structure
+        if self.currentItemsIndex >= len(structure):
+            return []
+        _layers_as_obj = [self._layerRow(j) for j in structure[self.currentItemsIndex].layers]
+        if self.currentItemsIndex == 0 and _layers_as_obj:
+            _layers_as_obj[0]['thick'] = np.nan
+            _layers_as_obj[0]['rough'] = np.nan
+        if self.currentItemsIndex == len(structure) - 1 and _layers_as_obj:
+            _layers_as_obj[-1]['thick'] = np.nan
         return _layers_as_obj
 
-    @Property(str, notify=layersAsXmlChanged)
-    def layersAsXml(self):
-        print('>>> layersAsXml')
-        return self._layers_as_xml
-
-    def _setLayersAsXml(self):
-        self._layers_as_xml = dicttoxml(self.layersAsObj).decode()
-        self.layersAsXmlChanged.emit()
+    @staticmethod
+    def _layerRow(layer: Layer) -> dict:
+        dictionary = {'materialid': layer.material.name,
+                      'thick': layer.thickness.raw_value,
+                      'thick_enabled': layer.thickness.enabled,
+                      'rough': layer.roughness.raw_value,
+                      'rough_enabled': layer.roughness.enabled}
+        if hasattr(layer, 'chemical_structure'):
+            dictionary['formula'] = layer.chemical_structure
+            dictionary['apm'] = layer.area_per_molecule.raw_value
+            dictionary['apm_enabled'] = layer.area_per_molecule.enabled
+            dictionary['solvation'] = layer.solvation.raw_value
+            dictionary['solvation_enabled'] = layer.solvation.enabled
+            dictionary['solvent'] = layer.solvent.name
+        return dictionary
+
+    @Property(QObject, constant=True)
+    def layersModel(self):
+        return self._layers_model
+
+    def _setLayersModel(self):
+        self._property_cache.invalidate('layersAsObj')
+        self._layers_model.setRows(self.layersAsObj)
 
     @Property(int, notify=itemsIndexChanged)
     def currentItemsIndex(self):
@@ -206,47 +235,27 @@ class ModelProxy(QObject):
     def currentItemsType(self, type: str):
         if self._model[self.currentModelIndex].structure[self.currentItemsIndex].type == type or type == -1:
             return
-        current_layers = self._model[self.currentModelIndex].structure[self.currentItemsIndex].layers
-        if self._model[self.currentModelIndex].structure[self.currentItemsIndex].type == 'Surfactant Layer':
-            current_layers = Layer.from_pars(self.parent._material_proxy._materials[0], 10, 3)
-        target_position = self.currentItemsIndex
-        self._model[self.currentModelIndex].remove_item(self.currentItemsIndex)
-        if type == 'Multi-layer':
-            self._model[self.currentModelIndex].add_item(ITEM_LOOKUP[type].from_pars(current_layers,
-                                                             type))
-        elif type == 'Repeating Multi-layer':
-            self._model[self.currentModelIndex].add_item(ITEM_LOOKUP[type].from_pars(current_layers, 1,
-                                                             type))
-        elif type == 'Surfactant Layer':
-            self._model[self.currentModelIndex].add_item(ITEM_LOOKUP[type].from_pars(
-                'C32D64', 16, self.parent._material_proxy._materials[0], 0.0, 48.0, 3.0,
-                'C10H18NO8P', 10, self.parent._material_proxy._materials[0], 0.2, 48.0, 3.0,
-                name=type))
-        self.parent._parameter_proxy._setParametersAsObj()
-        if target_position != len(self._model[self.currentModelIndex].structure) - 1:
-            new_items_list = []
-            self._model[self.currentModelIndex].structure[0].layers[0].thickness.enabled = True
-            self._model[self.currentModelIndex].structure[0].layers[0].roughness.enabled = True
-            self._model[self.currentModelIndex].structure[-1].layers[-1].thickness.enabled = True
-            for i, item in enumerate(self._model[self.currentModelIndex].structure):
-                if i == target_position:
-                    new_items_list.append(
-                        self._model[self.currentModelIndex].structure[len(self._model[self.currentModelIndex].structure) - 1])
-                elif i == len(self._model[self.currentModelIndex].structure) - 1:
-                    new_items_list.append(self._model[self.currentModelIndex].structure[target_position])
-                else:
-                    new_items_list.append(item)
-            while len(self._model[self.currentModelIndex].structure) != 0:
-                self._model[self.currentModelIndex].remove_item(0)
-            for i in range(len(new_items_list)):
-                self._model[self.currentModelIndex].add_item(new_items_list[i])
-            borg.stack.enabled = True
-            self._model[self.currentModelIndex].structure[0].layers[0].thickness.enabled = False
-            self._model[self.currentModelIndex].structure[0].layers[0].roughness.enabled = False
-            self._model[self.currentModelIndex].structure[-1].layers[-1].thickness.enabled = False
-        self.itemsNameChanged.emit()
-        self.parent.layersChanged.emit()
-        self.parent.itemsChanged.emit()
+        model = self._model[self.currentModelIndex]
+        with self.parent.transaction(f'Change item type to {type}'):
+            with self._edgeLayersEnabled(model.structure):
+                current_layers = model.structure[self.currentItemsIndex].layers
+                if model.structure[self.currentItemsIndex].type == 'Surfactant Layer':
+                    current_layers = Layer.from_pars(self.parent._material_proxy._materials[0], 10, 3)
+                target_position = self.currentItemsIndex
+                model.remove_item(self.currentItemsIndex)
+                if type == 'Multi-layer':
+                    model.add_item(ITEM_LOOKUP[type].from_pars(current_layers, type))
+                elif type == 'Repeating Multi-layer':
+                    model.add_item(ITEM_LOOKUP[type].from_pars(current_layers, 1, type))
+                elif type == 'Surfactant Layer':
+                    model.add_item(ITEM_LOOKUP[type].from_pars(
+                        'C32D64', 16, self.parent._material_proxy._materials[0], 0.0, 48.0, 3.0,
+                        'C10H18NO8P', 10, self.parent._material_proxy._materials[0], 0.2, 48.0, 3.0,
+                        name=type))
+                if target_position != len(model.structure) - 1:
+                    move(model.structure, len(model.structure) - 1, target_position, model)
+            self.parent.notify('itemsNameChanged', sender=self)
+            self.parent.notify('layersChanged', 'itemsChanged')
 
     @Property(int, notify=layersIndexChanged)
     def currentLayersIndex(self):
@@ -313,8 +322,8 @@ class ModelProxy(QObject):
                     j.name = j.material.name
                 else:
                     j.name = j.material.name + ' Layer'
-        self._setItemsAsXml()
-        self._setModelsAsXml()
+        self._setItemsModel()
+        self._setModelsModel()
 
     def _onLayersChanged(self):
         for i in self._model[self.currentModelIndex].structure:
@@ -323,7 +332,7 @@ class ModelProxy(QObject):
                     j.name = j.material.name
                 else:
                     j.name = j.material.name + ' Layer'
-        self._setLayersAsXml()
+        self._setLayersModel()
         structure_dict = self._model[self.currentModelIndex].structure.as_dict()
         self._pure = Model.from_pars(Structure.from_dict(structure_dict), 1, 0, 0, interface=self._pure_interface)
 
@@ -430,130 +439,83 @@ class ModelProxy(QObject):
 
     @Slot()
     def addNewItems(self):
-        self._model[self.currentModelIndex].structure[0].layers[0].thickness.enabled = True
-        self._model[self.currentModelIndex].structure[0].layers[0].roughness.enabled = True
-        self._model[self.currentModelIndex].structure[-1].layers[-1].thickness.enabled = True
-        try:
-            self._model[self.currentModelIndex].add_item(
-                MultiLayer.from_pars(
-                    Layer.from_pars(self.parent._material_proxy._materials[0], 10.,
-                                    1.2),
-                    f'Multi-layer {len(self._model[self.currentModelIndex].structure)+1}'))
-        except IndexError:
-            self.parent._material_proxy.addNewMaterials()
-            self._model[self.currentModelIndex].add_item(
-                MultiLayer.from_pars(
-                    Layer.from_pars(self.parent._material_proxy._materials[0], 10.,
-                                    1.2),
-                    f'Multi-layer {len(self._model[self.currentModelIndex].structure)+1}'))
-        self._model[self.currentModelIndex].structure[0].layers[0].thickness.enabled = False
-        self._model[self.currentModelIndex].structure[0].layers[0].roughness.enabled = False
-        self._model[self.currentModelIndex].structure[-1].layers[-1].thickness.enabled = False
-        self.parent.layersChanged.emit()
-        self.parent.itemsChanged.emit()
+        with self.parent.transaction('Add item'):
+            with self._edgeLayersEnabled(self._model[self.currentModelIndex].structure):
+                try:
+                    self._model[self.currentModelIndex].add_item(
+                        MultiLayer.from_pars(
+                            Layer.from_pars(self.parent._material_proxy._materials[0], 10.,
+                                            1.2),
+                            f'Multi-layer {len(self._model[self.currentModelIndex].structure)+1}'))
+                except IndexError:
+                    self.parent._material_proxy.addNewMaterials()
+                    self._model[self.currentModelIndex].add_item(
+                        MultiLayer.from_pars(
+                            Layer.from_pars(self.parent._material_proxy._materials[0], 10.,
+                                            1.2),
+                            f'Multi-layer {len(self._model[self.currentModelIndex].structure)+1}'))
+            self.parent.notify('layersChanged', 'itemsChanged')
 
     @Slot()
     def duplicateSelectedItems(self):
         # This is a fix until deepcopy is worked out
         # Manual duplication instead of creating a copy
-        self._model[self.currentModelIndex].structure[0].layers[0].thickness.enabled = True
-        self._model[self.currentModelIndex].structure[0].layers[0].roughness.enabled = True
-        self._model[self.currentModelIndex].structure[-1].layers[-1].thickness.enabled = True
-        to_dup = self._model[self.currentModelIndex].structure[self.currentItemsIndex]
-        if isinstance(to_dup, RepeatingMultiLayer):
-            to_dup_layers = []
-            for i in to_dup.layers:
-                to_dup_layers.append(
-                    Layer.from_pars(i.material,
-                                    i.thickness.raw_value,
-                                    i.roughness.raw_value,
-                                    name=i.name,
-                                    interface=self.parent._interface))
-            dup_item = RepeatingMultiLayer.from_pars(*to_dup_layers, 
-                                                     to_dup.repetitions.raw_value,
-                                                     name=to_dup.name)
-        elif isinstance(to_dup, SurfactantLayer):
-            dup_item = SurfactantLayer.from_dict(to_dup.as_dict())
-            for i, layer in enumerate(dup_item.layers):
-                layer.solvent = to_dup.layers[i].solvent
-        elif isinstance(to_dup, MultiLayer):
-            to_dup_layers = []
-            for i in to_dup.layers:
-                to_dup_layers.append(
-                    Layer.from_pars(i.material,
-                                    i.thickness.raw_value,
-                                    i.roughness.raw_value,
-                                    name=i.name,
-                                    interface=self.parent._interface))
-            dup_item = MultiLayer.from_pars(*to_dup_layers, name=to_dup.name)
-        self._model[self.currentModelIndex].add_item(dup_item)
-        self._model[self.currentModelIndex].structure[0].layers[0].thickness.enabled = False
-        self._model[self.currentModelIndex].structure[0].layers[0].roughness.enabled = False
-        self._model[self.currentModelIndex].structure[-1].layers[-1].thickness.enabled = False
-        self.parent.layersChanged.emit()
-        self.parent.itemsChanged.emit()
+        with self.parent.transaction('Duplicate item'):
+            with self._edgeLayersEnabled(self._model[self.currentModelIndex].structure):
+                to_dup = self._model[self.currentModelIndex].structure[self.currentItemsIndex]
+                if isinstance(to_dup, RepeatingMultiLayer):
+                    to_dup_layers = []
+                    for i in to_dup.layers:
+                        to_dup_layers.append(
+                            Layer.from_pars(i.material,
+                                            i.thickness.raw_value,
+                                            i.roughness.raw_value,
+                                            name=i.name,
+                                            interface=self.parent._interface))
+                    dup_item = RepeatingMultiLayer.from_pars(*to_dup_layers, 
+                                                             to_dup.repetitions.raw_value,
+                                                             name=to_dup.name)
+                elif isinstance(to_dup, SurfactantLayer):
+                    dup_item = SurfactantLayer.from_dict(to_dup.as_dict())
+                    for i, layer in enumerate(dup_item.layers):
+                        layer.solvent = to_dup.layers[i].solvent
+                elif isinstance(to_dup, MultiLayer):
+                    to_dup_layers = []
+                    for i in to_dup.layers:
+                        to_dup_layers.append(
+                            Layer.from_pars(i.material,
+                                            i.thickness.raw_value,
+                                            i.roughness.raw_value,
+                                            name=i.name,
+                                            interface=self.parent._interface))
+                    dup_item = MultiLayer.from_pars(*to_dup_layers, name=to_dup.name)
+                self._model[self.currentModelIndex].add_item(dup_item)
+            self.parent.notify('layersChanged', 'itemsChanged')
 
     @Slot()
     def moveSelectedItemsUp(self):
-        # if borg.stack.enabled:
-        #    borg.stack.beginMacro('Loaded default item')
-        borg.stack.enabled = False
-        # This convoluted approach is necessary as currently the BaseCollection
-        # does not allow insertion or popping. In future, this could be
-        # replaced with the approach for moving items around
-        old_index = self.currentItemsIndex
-        new_items_list = []
-        if old_index != 0:
-            self._model[self.currentModelIndex].structure[0].layers[0].thickness.enabled = True
-            self._model[self.currentModelIndex].structure[0].layers[0].roughness.enabled = True
-            self._model[self.currentModelIndex].structure[-1].layers[-1].thickness.enabled = True
-            for i, item in enumerate(self._model[self.currentModelIndex].structure):
-                if i == old_index - 1:
-                    new_items_list.append(self._model[self.currentModelIndex].structure[old_index])
-                elif i == old_index:
-                    new_items_list.append(self._model[self.currentModelIndex].structure[old_index - 1])
-                else:
-                    new_items_list.append(item)
-            while len(self._model[self.currentModelIndex].structure) != 0:
-                self._model[self.currentModelIndex].remove_item(0)
-            for i in range(len(new_items_list)):
-                self._model[self.currentModelIndex].add_item(new_items_list[i])
-            borg.stack.enabled = True
-            self._model[self.currentModelIndex].structure[0].layers[0].thickness.enabled = False
-            self._model[self.currentModelIndex].structure[0].layers[0].roughness.enabled = False
-            self._model[self.currentModelIndex].structure[-1].layers[-1].thickness.enabled = False
-            self.parent.layersChanged.emit()
-            self.parent.itemsChanged.emit()
+        """
+        Move the currently selected item up.
+        """
+        i = self.currentItemsIndex
+        if i > 0:
+            self._moveItem(i, i - 1)
 
     @Slot()
     def moveSelectedItemsDown(self):
-        # This convoluted approach is necessary as currently the BaseCollection
-        # does not allow insertion or popping. In future, this could be
-        # replaced with the approach for moving items around
-        old_index = self.currentItemsIndex
-        new_items_list = []
-        if old_index != len(self._model[self.currentModelIndex].structure):
-            borg.stack.enabled = False
-            self._model[self.currentModelIndex].structure[0].layers[0].thickness.enabled = True
-            self._model[self.currentModelIndex].structure[0].layers[0].roughness.enabled = True
-            self._model[self.currentModelIndex].structure[-1].layers[-1].thickness.enabled = True
-            for i, item in enumerate(self._model[self.currentModelIndex].structure):
-                if i == old_index:
-                    new_items_list.append(self._model[self.currentModelIndex].structure[old_index + 1])
-                elif i == old_index + 1:
-                    new_items_list.append(self._model[self.currentModelIndex].structure[old_index])
-                else:
-                    new_items_list.append(item)
-            while len(self._model[self.currentModelIndex].structure) != 0:
-                self._model[self.currentModelIndex].remove_item(0)
-            for i in range(len(new_items_list)):
-                self._model[self.currentModelIndex].add_item(new_items_list[i])
-            borg.stack.enabled = True
-            self._model[self.currentModelIndex].structure[0].layers[0].thickness.enabled = False
-            self._model[self.currentModelIndex].structure[0].layers[0].roughness.enabled = False
-            self._model[self.currentModelIndex].structure[-1].layers[-1].thickness.enabled = False
-            self.parent.layersChanged.emit()
-            self.parent.itemsChanged.emit()
+        """
+        Move the currently selected item down.
+        """
+        i = self.currentItemsIndex
+        if i < len(self._model[self.currentModelIndex].structure) - 1:
+            self._moveItem(i, i + 1)
+
+    def _moveItem(self, old_index: int, new_index: int):
+        model = self._model[self.currentModelIndex]
+        with self.parent.transaction('Move item'):
+            move(model.structure, old_index, new_index, model,
+                 guard=functools.partial(self._edgeLayersEnabled, model.structure))
+            self.parent.notify('layersChanged', 'itemsChanged')
 
     @Slot(str)
     def removeItems(self, i: str):
@@ -563,15 +525,10 @@ class ModelProxy(QObject):
         :param i: Index of the item
         :type i: str
         """
-        self._model[self.currentModelIndex].structure[0].layers[0].thickness.enabled = True
-        self._model[self.currentModelIndex].structure[0].layers[0].roughness.enabled = True
-        self._model[self.currentModelIndex].structure[-1].layers[-1].thickness.enabled = True
-        self._model[self.currentModelIndex].remove_item(int(i))
-        self._model[self.currentModelIndex].structure[0].layers[0].thickness.enabled = False
-        self._model[self.currentModelIndex].structure[0].layers[0].roughness.enabled = False
-        self._model[self.currentModelIndex].structure[-1].layers[-1].thickness.enabled = False
-        self.parent.layersChanged.emit()
-        self.parent.itemsChanged.emit()
+        with self.parent.transaction('Remove item'):
+            with self._edgeLayersEnabled(self._model[self.currentModelIndex].structure):
+                self._model[self.currentModelIndex].remove_item(int(i))
+            self.parent.notify('layersChanged', 'itemsChanged')
 
     @Slot(str)
     def setCurrentItemsName(self, name):
@@ -594,104 +551,78 @@ class ModelProxy(QObject):
 
     @Slot()
     def addNewLayers(self):
-        self._model[self.currentModelIndex].structure[0].layers[0].thickness.enabled = True
-        self._model[self.currentModelIndex].structure[0].layers[0].roughness.enabled = True
-        self._model[self.currentModelIndex].structure[-1].layers[-1].thickness.enabled = True
-        try:
-            self._model[self.currentModelIndex].structure[self.currentItemsIndex].add_layer(
-                Layer.from_pars(
-                    self.parent._material_proxy._materials[0],
-                    10.0,
-                    1.2,
-                    name=f'Layer {len(self._model[self.currentModelIndex].structure[self.currentItemsIndex].layers)}'
-                ))
-        except IndexError:
-            self.addNewItems()
-        self._model[self.currentModelIndex].structure[0].layers[0].thickness.enabled = False
-        self._model[self.currentModelIndex].structure[0].layers[0].roughness.enabled = False
-        self._model[self.currentModelIndex].structure[-1].layers[-1].thickness.enabled = False
-        self.parent.layersChanged.emit()
+        with self.parent.transaction('Add layer'):
+            with self._edgeLayersEnabled(self._model[self.currentModelIndex].structure):
+                try:
+                    self._model[self.currentModelIndex].structure[self.currentItemsIndex].add_layer(
+                        Layer.from_pars(
+                            self.parent._material_proxy._materials[0],
+                            10.0,
+                            1.2,
+                            name=f'Layer {len(self._model[self.currentModelIndex].structure[self.currentItemsIndex].layers)}'
+                        ))
+                except IndexError:
+                    self.addNewItems()
+            self.parent.notify('layersChanged')
 
     @Slot()
     def duplicateSelectedLayers(self):
         # This is a fix until deepcopy is worked out
         # Manual duplication instead of creating a copy
-        self._model[self.currentModelIndex].structure[0].layers[0].thickness.enabled = True
-        self._model[self.currentModelIndex].structure[0].layers[0].roughness.enabled = True
-        self._model[self.currentModelIndex].structure[-1].layers[-1].thickness.enabled = True
-        to_dup = self._model[self.currentModelIndex].structure[self.currentItemsIndex].layers[
-            self.currentLayersIndex]
-        self._model[self.currentModelIndex].structure[self.currentItemsIndex].add_layer(
-            Layer.from_pars(to_dup.material,
-                            to_dup.thickness.raw_value,
-                            to_dup.roughness.raw_value,
-                            name=to_dup.name))
-        self._model[self.currentModelIndex].structure[0].layers[0].thickness.enabled = False
-        self._model[self.currentModelIndex].structure[0].layers[0].roughness.enabled = False
-        self._model[self.currentModelIndex].structure[-1].layers[-1].thickness.enabled = False
-        self.parent.layersChanged.emit()
+        with self.parent.transaction('Duplicate layer'):
+            with self._edgeLayersEnabled(self._model[self.currentModelIndex].structure):
+                to_dup = self._model[self.currentModelIndex].structure[self.currentItemsIndex].layers[
+                    self.currentLayersIndex]
+                self._model[self.currentModelIndex].structure[self.currentItemsIndex].add_layer(
+                    Layer.from_pars(to_dup.material,
+                                    to_dup.thickness.raw_value,
+                                    to_dup.roughness.raw_value,
+                                    name=to_dup.name))
+            self.parent.notify('layersChanged')
 
     @Slot()
     def moveSelectedLayersUp(self):
-        old_index = self.currentLayersIndex
-        new_layers_list = []
-        item = self._model[self.currentModelIndex].structure[self.currentItemsIndex]
-        layers = item.layers
-        # This convoluted approach is necessary as currently the BaseCollection does
-        # not allow insertion or popping. In future, this could be replaced with the
-        # approach for moving items around
-        if old_index != 0:
-            borg.stack.enabled = False
-            self._model[self.currentModelIndex].structure[0].layers[0].thickness.enabled = True
-            self._model[self.currentModelIndex].structure[0].layers[0].roughness.enabled = True
-            self._model[self.currentModelIndex].structure[-1].layers[-1].thickness.enabled = True
-            for i, l in enumerate(layers):
-                if i == old_index - 1:
-                    new_layers_list.append(layers[old_index])
-                elif i == old_index:
-                    new_layers_list.append(layers[old_index - 1])
-                else:
-                    new_layers_list.append(l)
-            while len(layers) != 0:
-                item.remove_layer(0)
-            for i in range(len(new_layers_list)):
-                item.add_layer(new_layers_list[i])
-            borg.stack.enabled = True
-            self._model[self.currentModelIndex].structure[0].layers[0].thickness.enabled = False
-            self._model[self.currentModelIndex].structure[0].layers[0].roughness.enabled = False
-            self._model[self.currentModelIndex].structure[-1].layers[-1].thickness.enabled = False
-            self.parent.layersChanged.emit()
+        """
+        Move the currently selected layer up.
+        """
+        i = self.currentLayersIndex
+        if i > 0:
+            self._moveLayer(i, i - 1)
 
     @Slot()
     def moveSelectedLayersDown(self):
-        old_index = self.currentLayersIndex
-        new_layers_list = []
-        item = self._model[self.currentModelIndex].structure[self.currentItemsIndex]
-        layers = item.layers
-        # This convoluted approach is necessary as currently the BaseCollection does
-        # not allow insertion or popping. In future, this could be replaced with the
-        # approach for moving items around
-        if old_index != len(layers):
-            self._model[self.currentModelIndex].structure[0].layers[0].thickness.enabled = True
-            self._model[self.currentModelIndex].structure[0].layers[0].roughness.enabled = True
-            self._model[self.currentModelIndex].structure[-1].layers[-1].thickness.enabled = True
-            borg.stack.enabled = False
-            for i, l in enumerate(layers):
-                if i == old_index:
-                    new_layers_list.append(layers[old_index + 1])
-                elif i == old_index + 1:
-                    new_layers_list.append(layers[old_index])
-                else:
-                    new_layers_list.append(l)
-            while len(layers) != 0:
-                item.remove_layer(0)
-            for i in range(len(new_layers_list)):
-                item.add_layer(new_layers_list[i])
-            borg.stack.enabled = True
-            self._model[self.currentModelIndex].structure[0].layers[0].thickness.enabled = False
-            self._model[self.currentModelIndex].structure[0].layers[0].roughness.enabled = False
-            self._model[self.currentModelIndex].structure[-1].layers[-1].thickness.enabled = False
-            self.parent.layersChanged.emit()
+        """
+        Move the currently selected layer down.
+        """
+        i = self.currentLayersIndex
+        if i < len(self._model[self.currentModelIndex].structure[self.currentItemsIndex].layers) - 1:
+            self._moveLayer(i, i + 1)
+
+    def _moveLayer(self, old_index: int, new_index: int):
+        model = self._model[self.currentModelIndex]
+        item = model.structure[self.currentItemsIndex]
+        with self.parent.transaction('Move layer'):
+            move(item.layers, old_index, new_index, model, item,
+                 guard=functools.partial(self._edgeLayersEnabled, model.structure))
+            self.parent.notify('layersChanged')
+
+    @staticmethod
+    @contextmanager
+    def _edgeLayersEnabled(structure: Structure):
+        """
+        Enable the thickness and roughness of the outermost layers, which are
+        not used, while items or layers of `structure` are added, removed or
+        rearranged.
+        """
+        structure[0].layers[0].thickness.enabled = True
+        structure[0].layers[0].roughness.enabled = True
+        structure[-1].layers[-1].thickness.enabled = True
+        try:
+            yield
+        finally:
+            structure[0].layers[0].thickness.enabled = False
+            structure[0].layers[0].roughness.enabled = False
+            structure[-1].layers[-1].thickness.enabled = False
 
     @Slot(str)
     def removeLayers(self, i: str):
@@ -701,14 +632,10 @@ class ModelProxy(QObject):
         :param i: Index of the layer
         :type i: str
         """
-        self._model[self.currentModelIndex].structure[0].layers[0].thickness.enabled = True
-        self._model[self.currentModelIndex].structure[0].layers[0].roughness.enabled = True
-        self._model[self.currentModelIndex].structure[-1].layers[-1].thickness.enabled = True
-        self._model[self.currentModelIndex].structure[self.currentItemsIndex].remove_layer(int(i))
-        self._model[self.currentModelIndex].structure[0].layers[0].thickness.enabled = False
-        self._model[self.currentModelIndex].structure[0].layers[0].roughness.enabled = False
-        self._model[self.currentModelIndex].structure[-1].layers[-1].thickness.enabled = False
-        self.parent.layersChanged.emit()
+        with self.parent.transaction('Remove layer'):
+            with self._edgeLayersEnabled(self._model[self.currentModelIndex].structure):
+                self._model[self.currentModelIndex].structure[self.currentItemsIndex].remove_layer(int(i))
+            self.parent.notify('layersChanged')
 
     @Slot(str)
     def setCurrentLayersMaterial(self, current_index):
@@ -1,7 +1,7 @@
 __author__ = 'github.com/arm61'
 
+from bisect import bisect_left
 from typing import Union
-from dicttoxml import dicttoxml
 from distutils.util import strtobool
 from PySide2.QtCore import QObject, Signal, Property, Slot
 from easyCore.Fitting.Constraints import ObjConstraint, NumericConstraint, FunctionalConstraint
@@ -10,10 +10,17 @@ from easyCore import borg
 from easyCore import np
 from easyCore.Utils.classTools import generatePath
 
+from EasyReflectometryApp.Logic.ConstraintPlan import ConstraintCycleError, ConstraintPlan
+from EasyReflectometryApp.Logic.ListModel import DictListModel
+from EasyReflectometryApp.Logic.ParameterVector import ParameterVector
+
+PARAMETER_ROLES = ['id', 'number', 'label', 'value', 'unit', 'error', 'fit', 'min', 'max']
+CONSTRAINT_ROLES = ['number', 'index', 'dependentName', 'relationalOperator', 'value', 'arithmeticOperator',
+                    'independentName', 'enabled']
+
 
 class ParameterProxy(QObject):
 
-    parametersAsXmlChanged = Signal()
     parametersAsObjChanged = Signal()
 
     parametersFilterCriteriaChanged = Signal()
@@ -24,9 +31,25 @@ class ParameterProxy(QObject):
 
         self._parameters_as_obj = []
         self._n_fit = False
-        self._parameters_as_xml = ""
+        self._parameters_model = DictListModel(PARAMETER_ROLES, self)
+        self._constraints_model = DictListModel(CONSTRAINT_ROLES, self)
+
+        self._parameter_index = []
+        self._parameter_index_by_id = {}
+        self._parameter_index_fingerprint = None
+        self._parameter_index_stale = True
+        self._parameter_index_version = 0
+
+        self._parameter_table = []
+        self._parameter_table_search = []
+        self._parameter_rows = {}
 
         self._parameters_filter_criteria = ""
+        self._parameters_filter_rows = []
+        self._parameters_filter_cache = (None, [])
+
+        self._constraint_plan = None
+        self._constraint_plan_fingerprint = None
 
         self.parametersFilterCriteriaChanged.connect(
             self._onParametersFilterCriteriaChanged)
@@ -43,54 +66,78 @@ class ParameterProxy(QObject):
     def nFit(self):
         return self._n_fit
 
-    def _setParametersAsObj(self):
-        self._parameters_as_obj.clear()
+    @Property('QVariant', notify=parametersAsObjChanged)
+    def parametersFilterRows(self):
+        """
+        Rows of the full parameter table matching the filter criteria.
+        """
+        return self._parameters_filter_rows
 
-        par_ids, par_paths = generatePath(self.parent._model_proxy._model, True)
-        pids = []
-        labels = []
-        self._n_fit = False
-        for par_index, par_path in enumerate(par_paths):
-            par_id = par_ids[par_index]
-            if par_id in pids:
-                continue
-            pids.append(par_id)
-            par = borg.map.get_item_by_key(par_id)
-            path_split = par_path.split('.')
-            if path_split[-1] == 'repetitions' and par.raw_value == 1:
-                continue
-            if not par.enabled:
-                continue
-            unit = '{:~P}'.format(par.unit)
-            label = get_label(par_path)
-            if label is None:
-                continue
-            if self._parameters_filter_criteria.lower() not in label.lower():
+    def _setParametersAsObj(self):
+        """
+        Build the table of all the parameters which can be shown, then
+        apply the filter to it.
+        """
+        self._parameter_table = []
+        self._parameter_table_search = []
+        self._parameter_rows = {}
+        for entry in self._parameterIndex():
+            if not self._isParameterShown(entry):
                 continue
-            if not par.fixed: 
-                self._n_fit = True
-            self._parameters_as_obj.append({
-                "id": str(par_id),
-                "number": par_index + 1,
-                "label": label,
-                "value": par.raw_value,
-                "unit": unit,
-                "error": float(par.error),
-                "fit": int(not par.fixed),
-                "min": float(par.min),
-                "max": float(par.max)
-            })
+            row = self._parameterRow(entry)
+            self._parameter_rows[row['id']] = len(self._parameter_table)
+            self._parameter_table.append(row)
+            self._parameter_table_search.append(entry['search'])
+        self._n_fit = any(row['fit'] for row in self._parameter_table)
+        self._parameters_filter_cache = (None, [])
+        self._applyParametersFilter()
+
+    def _applyParametersFilter(self):
+        """
+        Select the table rows whose label contains the filter criteria.
+        When the criteria only grow, e.g. while typing, just the rows
+        which matched last time are searched.
+        """
+        criteria = self._parameters_filter_criteria.lower()
+        previous_criteria, previous_rows = self._parameters_filter_cache
+        if previous_criteria is not None and previous_criteria in criteria:
+            candidates = previous_rows
+        else:
+            candidates = range(len(self._parameter_table))
+        search = self._parameter_table_search
+        self._parameters_filter_rows = [i for i in candidates if criteria in search[i]]
+        self._parameters_filter_cache = (criteria, self._parameters_filter_rows)
+        self._parameters_as_obj = [self._parameter_table[i] for i in self._parameters_filter_rows]
+        self.parametersAsObjChanged.emit()
 
+    def _updateParameterRow(self, obj_id: str):
+        """
+        Refresh the table row of a single parameter.
+        """
+        position = self._parameter_rows.get(obj_id)
+        entry = self._parameter_index_by_id.get(obj_id)
+        if position is None or not self._isParameterShown(entry):
+            # Shown or hidden by the change, e.g. repetitions set to 1
+            if entry is not None and (position is not None or self._isParameterShown(entry)):
+                self._setParametersAsObj()
+                self._setParametersModel()
+            return
+        row = self._parameterRow(entry)
+        self._parameter_table[position] = row
+        self._n_fit = any(row['fit'] for row in self._parameter_table)
+        self._parameters_as_obj = [self._parameter_table[i] for i in self._parameters_filter_rows]
         self.parametersAsObjChanged.emit()
+        filter_rows = self._parameters_filter_rows
+        model_row = bisect_left(filter_rows, position)
+        if model_row < len(filter_rows) and filter_rows[model_row] == position:
+            self._parameters_model.setRow(model_row, row)
 
-    @Property(str, notify=parametersAsXmlChanged)
-    def parametersAsXml(self):
-        return self._parameters_as_xml
+    @Property(QObject, constant=True)
+    def parametersModel(self):
+        return self._parameters_model
 
-    def _setParametersAsXml(self):
-        self._parameters_as_xml = dicttoxml(self._parameters_as_obj,
-                                            attr_type=False).decode()
-        self.parametersAsXmlChanged.emit()
+    def _setParametersModel(self):
+        self._parameters_model.setRows(self._parameters_as_obj)
 
     @Slot(str)
     def setParametersFilterCriteria(self, new_criteria):
@@ -99,17 +146,126 @@ class ParameterProxy(QObject):
         self._parameters_filter_criteria = new_criteria
         self.parametersFilterCriteriaChanged.emit()
 
+    # # #
+    # Parameter index
+    # # #
+
+    def _parameterIndex(self) -> list:
+        """
+        Parameters of the models which can be shown in the table, with
+        what only changes with the structure of the models: id, number,
+        label and unit. Built again when the models, items, layers or
+        materials are added, removed, reordered or renamed. The structure
+        is only looked at again after a signal which can change it, see
+        `_onParametersChanged`, not after edits of single parameters.
+        """
+        if self._parameter_index_stale:
+            fingerprint = self._structureFingerprint()
+            if fingerprint != self._parameter_index_fingerprint:
+                self._buildParameterIndex()
+                self._parameter_index_fingerprint = fingerprint
+                self._parameter_index_version += 1
+            self._parameter_index_stale = False
+        return self._parameter_index
+
+    def _buildParameterIndex(self):
+        self._parameter_index = []
+        self._parameter_index_by_id = {}
+        par_ids, par_paths = generatePath(self.parent._model_proxy._model, True)
+        for par_index, par_path in enumerate(par_paths):
+            par_id = str(par_ids[par_index])
+            if par_id in self._parameter_index_by_id:
+                continue
+            label = get_label(par_path)
+            if label is None:
+                self._parameter_index_by_id[par_id] = None
+                continue
+            par = borg.map.get_item_by_key(par_ids[par_index])
+            entry = {
+                "id": par_id,
+                "number": par_index + 1,
+                "label": label,
+                "search": label.lower(),
+                "unit": '{:~P}'.format(par.unit),
+                "repetitions": par_path.split('.')[-1] == 'repetitions',
+                "par": par
+            }
+            self._parameter_index_by_id[par_id] = entry
+            self._parameter_index.append(entry)
+
+    def _structureFingerprint(self) -> tuple:
+        """
+        The borg uid and name of every object below the models, following
+        the edges of the borg map as the parameter paths do. Any change to
+        the parameters which exist, e.g. the components of a material
+        mixture, or to the names in their labels changes the fingerprint.
+        """
+        seen = set()
+
+        def walk(key: int) -> tuple:
+            if key in seen:
+                return (key,)
+            seen.add(key)
+            obj = borg.map.get_item_by_key(key)
+            try:
+                edges = borg.map.get_edges(obj)
+            except AttributeError:
+                edges = []
+            return (key, getattr(obj, 'name', None), tuple(walk(edge) for edge in edges))
+
+        return walk(borg.map.convert_id_to_key(self.parent._model_proxy._model))
+
+    @staticmethod
+    def _isParameterShown(entry: dict) -> bool:
+        par = entry['par']
+        if entry['repetitions'] and par.raw_value == 1:
+            return False
+        return par.enabled
+
+    @staticmethod
+    def _parameterRow(entry: dict) -> dict:
+        par = entry['par']
+        return {
+            "id": entry['id'],
+            "number": entry['number'],
+            "label": entry['label'],
+            "value": par.raw_value,
+            "unit": entry['unit'],
+            "error": float(par.error),
+            "fit": int(not par.fixed),
+            "min": float(par.min),
+            "max": float(par.max)
+        }
+
     # # #
     # Actions
     # # #
 
     def _onParametersChanged(self):
+        self._parameter_index_stale = True
         self._setParametersAsObj()
-        self._setParametersAsXml()
+        self._setParametersModel()
+        self._setConstraintsModel()
         self.parent._state_proxy.stateChanged.emit(True)
 
     def _onParametersFilterCriteriaChanged(self):
-        self._onParametersChanged()
+        self._applyParametersFilter()
+        self._setParametersModel()
+
+    def parameterVector(self, free_only: bool = False) -> ParameterVector:
+        """
+        Values, errors, bounds and fixed flags of the parameters of the
+        models as arrays. Bulk changes through the vector are one undo
+        step and update the sample once.
+
+        :param free_only: Only the parameters which are varied in a fit
+        """
+        return ParameterVector(self.parent._model_proxy._model, free_only,
+                               self._onParameterVectorChanged, self.parent.transaction)
+
+    def _onParameterVectorChanged(self):
+        self.parent.notify('sampleChanged')
+        self.parent.notify('undoRedoChanged', sender=self.parent._undoredo_proxy)
 
     @Slot(str, 'QVariant')
     def editParameter(self, obj_id: str,
@@ -127,7 +283,8 @@ class ParameterProxy(QObject):
                 return
 
             obj.fixed = not new_value
-            self._onParametersChanged()
+            self._updateParameterRow(obj_id)
+            self.parent._state_proxy.stateChanged.emit(True)
             self.parent._undoredo_proxy.undoRedoChanged.emit()
 
         else:
@@ -135,7 +292,10 @@ class ParameterProxy(QObject):
                 return
 
             obj.value = new_value
-            self.parent.sampleChanged.emit()
+            for par_id in [obj_id] + self._dependentIds(obj):
+                self._updateParameterRow(par_id)
+            self.parent.parameterValuesChanged.emit()
+            self.parent._state_proxy.stateChanged.emit(True)
 
     @Slot(str, 'QVariant')
     def editParameterMin(self, obj_id: str, new_value: Union[float, str]):
@@ -159,7 +319,7 @@ class ParameterProxy(QObject):
             return 
         
         obj.min = new_value
-        self.parent.sampleChanged.emit()
+        self._onParameterBoundsChanged(obj_id)
 
     @Slot(str, 'QVariant')
     def editParameterMax(self, obj_id: str, new_value: Union[float, str]):
@@ -179,11 +339,16 @@ class ParameterProxy(QObject):
 
         new_value = float(new_value)
         
-        if obj.min == new_value:
+        if obj.max == new_value:
             return 
         
         obj.max = new_value
-        self.parent.sampleChanged.emit()
+        self._onParameterBoundsChanged(obj_id)
+
+    def _onParameterBoundsChanged(self, obj_id: str):
+        self._updateParameterRow(obj_id)
+        self.parent._state_proxy.stateChanged.emit(True)
+        self.parent._undoredo_proxy.undoRedoChanged.emit()
 
     def _parameterObj(self, obj_id: str):
         if not obj_id:
@@ -192,7 +357,42 @@ class ParameterProxy(QObject):
         obj = borg.map.get_item_by_key(obj_id)
         return obj
 
+    @staticmethod
+    def _dependentIds(par) -> list:
+        """
+        :return: Ids of the parameters set by the user constraints of `par`,
+            directly or through other constraints
+        """
+        ids = []
+        pending = [par]
+        while pending:
+            for constraint in pending.pop().user_constraints.values():
+                dependent = constraint.get_obj(constraint.dependent_obj_ids)
+                dependent_id = str(borg.map.convert_id_to_key(dependent))
+                if dependent is par or dependent_id in ids:
+                    continue
+                ids.append(dependent_id)
+                pending.append(dependent)
+        return ids
+
     # Constraints
+    def constraintPlan(self) -> ConstraintPlan:
+        """
+        The user constraints compiled over the parameter vector. Compiled
+        again only when the constraints or the structure of the models
+        change.
+
+        :raises ValueError: See `ConstraintPlan`
+        """
+        constraints = self.parent._model_proxy._model.constraints
+        self._parameterIndex()
+        fingerprint = (self._parameter_index_version,
+                       tuple((id(c), c.enabled, c.operator, c.value) for c in constraints))
+        if fingerprint != self._constraint_plan_fingerprint:
+            self._constraint_plan = ConstraintPlan(self.parameterVector().parameters, constraints)
+            self._constraint_plan_fingerprint = fingerprint
+        return self._constraint_plan
+
     @Slot(int, str, float, str, int)
     def addConstraint(self, dependent_par_idx, relational_operator,
                       value, arithmetic_operator, independent_par_idx):
@@ -203,24 +403,7 @@ class ParameterProxy(QObject):
         #    print(f"Add constraint: {self.fitablesList()[dependent_par_idx]['label']}{relational_operator}{value}")
         # else:
         #    print(f"Add constraint: {self.fitablesList()[dependent_par_idx]['label']}{relational_operator}{value}{arithmetic_operator}{self.fitablesList()[independent_par_idx]['label']}")
-        pars = []
-        pids = []
-        par_ids, par_paths = generatePath(self.parent._model_proxy._model, True)
-        for par_index, par_path in enumerate(par_paths):
-            par_id = par_ids[par_index]
-            if par_id in pids:
-                continue
-            pids.append(par_id)
-            par = borg.map.get_item_by_key(par_id)
-            path_split = par_path.split('.')
-            if path_split[-1] == 'repetitions' and par.raw_value == 1:
-                continue
-            if not par.enabled:
-                continue
-            label = get_label(par_path)
-            if label is None:
-                continue
-            pars.append(par)
+        pars = [entry['par'] for entry in self._parameterIndex() if self._isParameterShown(entry)]
         if arithmetic_operator != "" and independent_par_idx > -1:
             c = ObjConstraint(pars[dependent_par_idx],
                               str(float(value)) + arithmetic_operator,
@@ -234,9 +417,19 @@ class ParameterProxy(QObject):
             return
         # print(c)
         pars[independent_par_idx].user_constraints[pars[dependent_par_idx].name] = c
+        try:
+            self.constraintPlan()
+        except ConstraintCycleError as ex:
+            del pars[independent_par_idx].user_constraints[pars[dependent_par_idx].name]
+            print(f"Failed to add constraint: {ex}")
+            return
+        except ValueError:
+            # Not compiled, the fit applies the constraints one by one
+            pass
         c()
         self.parent.sampleChanged.emit()
         self.parametersAsObjChanged.emit()
+        self._setConstraintsModel()
 
     def constraintsList(self):
         constraint_list = []
@@ -277,11 +470,14 @@ class ParameterProxy(QObject):
             )
         return constraint_list
 
-    @Property(str, notify=parametersAsObjChanged)
-    def constraintsAsXml(self):
-        xml = dicttoxml(self.constraintsList(), attr_type=False)
-        xml = xml.decode()
-        return xml
+    @Property(QObject, constant=True)
+    def constraintsModel(self):
+        return self._constraints_model
+
+    def _setConstraintsModel(self):
+        constraint_list = self.constraintsList()
+        if constraint_list is not None:
+            self._constraints_model.setRows(constraint_list)
 
     @Slot(int)
     def removeConstraintByIndex(self, index: int):
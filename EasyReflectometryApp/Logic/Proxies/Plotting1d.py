@@ -1,12 +1,21 @@
 __author__ = 'github.com/andrewsazonov'
 
+import time
+import base64
+import ctypes
+import hashlib
+
 import numpy as np
+import shiboken2
 
-from PySide2.QtCore import QObject, Qt, QPointF, Signal, Slot, Property
-from PySide2.QtGui import QImage, QBrush
+from PySide2.QtCore import QObject, Signal, Slot, Property, QTimer
+from PySide2.QtGui import QImage, QBrush, QColor, QPolygonF
 from PySide2.QtQml import QJSValue
 from PySide2.QtCharts import QtCharts
 
+DEFAULT_PLOT_PIXEL_WIDTH = 800
+DEFAULT_MAX_UPDATE_RATE = 60  # Hz
+
 
 class Plotting1dProxy(QObject):
     """
@@ -36,14 +45,19 @@ class Plotting1dProxy(QObject):
     qtchartsCalculatedDataObjChanged = Signal()
     qtchartsBackgroundDataObjChanged = Signal()
 
+    # Update queue
+    maxUpdateRateChanged = Signal()
+    updatesFlushed = Signal()
+
     # Misc
     sldXDataReversedChanged = Signal()
+    transferStatsChanged = Signal()
 
     def __init__(self, parent=None):
         super().__init__(parent)
 
         # Lib
-        self._libs = ['bokeh']#, 'qtcharts']
+        self._libs = ['bokeh', 'qtcharts']
         self._current_lib = 'bokeh'
         self.currentLibChanged.connect(self.onCurrentLibChanged)
 
@@ -75,6 +89,11 @@ class Plotting1dProxy(QObject):
 
         self._y_axis_range_extension = 0.1
 
+        # Decimation
+        self._plot_pixel_width = DEFAULT_PLOT_PIXEL_WIDTH
+        self._view_min_x = None
+        self._view_max_x = None
+
         # Data containers
         self._measured_xarray = np.empty(0)
         self._measured_yarray = np.empty(0)
@@ -115,11 +134,31 @@ class Plotting1dProxy(QObject):
         self._qtcharts_calculated_data_obj = {}
         self._qtcharts_background_data_obj = {}
 
+        # Arrays behind the QtCharts data containers
+        self._qtcharts_series = {}
+        self._qtcharts_series_count = 0
+
+        # Update queue
+        self._max_update_rate = DEFAULT_MAX_UPDATE_RATE
+        self._pending_updates = []
+        self._update_timer = QTimer(self)
+        self._update_timer.setSingleShot(True)
+        self._update_timer.setInterval(1000 // self._max_update_rate)
+        self._update_timer.timeout.connect(self._flushUpdates)
+
         # Misc
         self._sld_x_data_reversed = False
+        self._brushes = {}
+        self._transfer_stats = {'updates': 0, 'skipped': 0, 'flushes': 0,
+                                'bytes': 0, 'last_bytes': 0, 'last_ms': 0.0}
+        self._series_hashes = {}
+        self._series_bounds = {}
 
     def clearFrontendState(self):
 
+        # Series sent to GUI
+        self._series_hashes = {}
+
         # Ranges for GUI
         self._experiment_plot_ranges_obj = {}
         self._analysis_plot_ranges_obj = {}
@@ -139,22 +178,22 @@ class Plotting1dProxy(QObject):
         self._qtcharts_background_data_obj = {}
 
         # Ranges
-        self.experimentPlotRangesObjChanged.emit()
-        self.analysisPlotRangesObjChanged.emit()
-        self.sampleSldPlotRangesObjChanged.emit()
-        self.analysisSldPlotRangesObjChanged.emit()
+        self._queueUpdate('experimentPlotRangesObjChanged')
+        self._queueUpdate('analysisPlotRangesObjChanged')
+        self._queueUpdate('sampleSldPlotRangesObjChanged')
+        self._queueUpdate('analysisSldPlotRangesObjChanged')
 
         # Data containers
-        self.bokehMeasuredDataObjChanged.emit()
-        self.bokehCalculatedDataObjChanged.emit()
-        self.bokehPureDataObjChanged.emit()
-        self.bokehBackgroundDataObjChanged.emit()
-        self.bokehSampleSldDataObjChanged.emit()
-        self.bokehAnalysisSldDataObjChanged.emit()
+        self._queueUpdate('bokehMeasuredDataObjChanged')
+        self._queueUpdate('bokehCalculatedDataObjChanged')
+        self._queueUpdate('bokehPureDataObjChanged')
+        self._queueUpdate('bokehBackgroundDataObjChanged')
+        self._queueUpdate('bokehSampleSldDataObjChanged')
+        self._queueUpdate('bokehAnalysisSldDataObjChanged')
 
-        self.qtchartsMeasuredDataObjChanged.emit()
-        self.qtchartsCalculatedDataObjChanged.emit()
-        self.qtchartsBackgroundDataObjChanged.emit()
+        self._queueUpdate('qtchartsMeasuredDataObjChanged')
+        self._queueUpdate('qtchartsCalculatedDataObjChanged')
+        self._queueUpdate('qtchartsBackgroundDataObjChanged')
 
     # Public: QML frontend
 
@@ -231,33 +270,101 @@ class Plotting1dProxy(QObject):
     # QtCharts for GUI
     @Slot('QVariant', 'QVariant')
     def lineSeriesCustomReplace(self, line_series, points):
+        """
+        Replace all the points of `line_series`. `points` is one of the
+        keys in the QtCharts data containers, in which case the series is
+        filled in one go from the arrays behind it, or a list of points.
+        """
         if not isinstance(line_series, (QtCharts.QLineSeries, QtCharts.QScatterSeries)):
             return
         if points is None:
             return
         if isinstance(points, QJSValue):
             points = points.toVariant()
-        if isinstance(points, list):
+        if isinstance(points, str):
+            series = self._qtcharts_series.get(points.split('#')[0])
+            if series is None or series[0] != points:
+                return
+            line_series.replace(Plotting1dProxy.arraysToPolygon(series[1], series[2]))
+        elif isinstance(points, list):
             line_series.replace(points)
 
     @Slot(int, str, result='QBrush')
     def verticalLine(self, size, color):
-        width = size
-        height = size
-        textureImage = QImage(width, height, QImage.Format_ARGB32)
-        # Transparent background
-        for row in range(height):
-            for column in range(width):
-                textureImage.setPixelColor(column, row, Qt.transparent)
-        # Vertical line
-        for row in range(height):
-            column = int(width / 2)
-            textureImage.setPixelColor(column, row, color)
-        brush = QBrush()
-        brush.setTextureImage(textureImage)
-        return brush
+        key = (size, color)
+        if key not in self._brushes:
+            self._brushes[key] = Plotting1dProxy.verticalLineBrush(size, QColor(color))
+        return self._brushes[key]
+
+    # Decimation
+    @Slot(int)
+    def setPlotPixelWidth(self, width):
+        """
+        Set the width of the chart in pixels, which sets the number of
+        buckets the plotted series are decimated to.
+        """
+        if width <= 0 or width == self._plot_pixel_width:
+            return
+        self._plot_pixel_width = width
+        self._setDecimatedDataObjs()
+
+    @Slot(float, float)
+    def setPlotViewRange(self, min_x, max_x):
+        """
+        Set the visible x range of the main chart after zooming or
+        panning. Only the points in view are sent to the chart, at the
+        resolution of the chart. A range covering all the data resets
+        the view.
+        """
+        if min_x > max_x:
+            min_x, max_x = max_x, min_x
+        data_min_x, data_max_x = self._dataRangeX()
+        if min_x <= data_min_x and max_x >= data_max_x:
+            min_x, max_x = None, None
+        if (min_x, max_x) == (self._view_min_x, self._view_max_x):
+            return
+        self._view_min_x = min_x
+        self._view_max_x = max_x
+        self._setExperimentPlotRanges()
+        self._setAnalysisPlotRanges()
+        self._setDecimatedDataObjs()
+
+    # Update queue
+    @Property(int, notify=maxUpdateRateChanged)
+    def maxUpdateRate(self):
+        """
+        Maximum number of times per second the charts are sent new data.
+        """
+        return self._max_update_rate
+
+    @maxUpdateRate.setter
+    def maxUpdateRate(self, rate):
+        rate = max(1, min(rate, 1000))
+        if self._max_update_rate == rate:
+            return
+        self._max_update_rate = rate
+        self._update_timer.setInterval(1000 // rate)
+        self.maxUpdateRateChanged.emit()
+
+    @Slot()
+    def flushUpdates(self):
+        """
+        Send the queued updates now rather than at the next frame.
+        """
+        self._update_timer.stop()
+        self._flushUpdates()
 
     # Misc
+    @Property('QVariant', notify=transferStatsChanged)
+    def transferStats(self):
+        """
+        Number of Bokeh data updates prepared, number of updates skipped
+        as the data did not change, number of times queued updates were
+        sent, total and last payload size in bytes, and time in ms spent
+        preparing the last one.
+        """
+        return self._transfer_stats
+
     @Property(bool, notify=sldXDataReversedChanged)
     def sldXDataReversed(self):
         return self._sld_x_data_reversed
@@ -274,6 +381,8 @@ class Plotting1dProxy(QObject):
     # Public: Python backend
 
     def setMeasuredData(self, xarray, yarray, syarray=None):
+        if not self._seriesChanged('measured', xarray, yarray, syarray):
+            return
         self._setMeasuredDataArrays(xarray, yarray, syarray)
         self._setMeasuredDataRanges()
         self._setExperimentPlotRanges()
@@ -283,6 +392,8 @@ class Plotting1dProxy(QObject):
             self._setQtChartsMeasuredDataObj()
 
     def setCalculatedData(self, xarray, yarray):
+        if not self._seriesChanged('calculated', xarray, yarray):
+            return
         self._setCalculatedDataArrays(xarray, yarray)
         self._setCalculatedDataRanges()
         self._setAnalysisPlotRanges()
@@ -292,6 +403,8 @@ class Plotting1dProxy(QObject):
             self._setQtChartsCalculatedDataObj()
 
     def setPureData(self, xarray, yarray):
+        if not self._seriesChanged('pure', xarray, yarray):
+            return
         self._setPureDataArrays(xarray, yarray)
         self._setPureDataRanges()
         self._setAnalysisPlotRanges()
@@ -301,6 +414,8 @@ class Plotting1dProxy(QObject):
         #     self._setQtChartsCalculatedDataObj()
 
     def setBackgroundData(self, xarray, yarray):
+        if not self._seriesChanged('background', xarray, yarray):
+            return
         self._setBackgroundDataArrays(xarray, yarray)
         if self._background_xarray.size:
             self._setBokehBackgroundDataObj()
@@ -308,6 +423,8 @@ class Plotting1dProxy(QObject):
                 self._setQtChartsBackgroundDataObj()
 
     def setSampleSldData(self, xarray, yarray):
+        if not self._seriesChanged('sample_sld', xarray, yarray):
+            return
         self._setSampleSldDataArrays(xarray, yarray)
         self._setSampleSldDataRanges()
         self._setSampleSldPlotRanges()
@@ -316,6 +433,8 @@ class Plotting1dProxy(QObject):
             pass
 
     def setAnalysisSldData(self, xarray, yarray):
+        if not self._seriesChanged('analysis_sld', xarray, yarray):
+            return
         self._setAnalysisSldDataArrays(xarray, yarray)
         self._setAnalysisSldDataRanges()
         self._setAnalysisSldPlotRanges()
@@ -330,6 +449,44 @@ class Plotting1dProxy(QObject):
             if self._measured_xarray.size:
                 self._setQtChartsMeasuredDataObj()
 
+    # Private: update queue
+
+    def _queueUpdate(self, signal_name):
+        """
+        Queue the change signal of a data or range object. All the signals
+        queued within one frame (see `maxUpdateRate`) are emitted together,
+        followed by `updatesFlushed`, so the charts redraw once.
+        """
+        if signal_name not in self._pending_updates:
+            self._pending_updates.append(signal_name)
+        if not self._update_timer.isActive():
+            self._update_timer.start()
+
+    def _flushUpdates(self):
+        if not self._pending_updates:
+            return
+        pending_updates, self._pending_updates = self._pending_updates, []
+        for signal_name in pending_updates:
+            getattr(self, signal_name).emit()
+        self._transfer_stats = dict(self._transfer_stats, flushes=self._transfer_stats['flushes'] + 1)
+        self.transferStatsChanged.emit()
+        self.updatesFlushed.emit()
+
+    # Private: change detection
+
+    def _seriesChanged(self, series, *arrays):
+        """
+        Compare the content hash of the arrays with the one last set for
+        `series`, so unchanged data is not processed and sent again.
+        """
+        content_hash = Plotting1dProxy.contentHash(*arrays)
+        if self._series_hashes.get(series) == content_hash:
+            self._transfer_stats = dict(self._transfer_stats, skipped=self._transfer_stats['skipped'] + 1)
+            self.transferStatsChanged.emit()
+            return False
+        self._series_hashes[series] = content_hash
+        return True
+
     # Private: data array setters
 
     def _setMeasuredDataArrays(self, xarray, yarray, syarray=None):
@@ -364,124 +521,175 @@ class Plotting1dProxy(QObject):
         self._background_xarray = xarray
         self._background_yarray = yarray
 
+    def _bokehDataObj(self, **arrays):
+        """
+        Pack arrays for the Bokeh charts as base64 encoded float64 buffers,
+        which the chart decodes straight into typed arrays.
+        """
+        start_time = time.perf_counter()
+        data_obj = {key: Plotting1dProxy.encodeArray(array) for key, array in arrays.items()}
+        n_bytes = sum(len(value) for value in data_obj.values())
+        self._transfer_stats = dict(
+            self._transfer_stats,
+            updates=self._transfer_stats['updates'] + 1,
+            bytes=self._transfer_stats['bytes'] + n_bytes,
+            last_bytes=n_bytes,
+            last_ms=(time.perf_counter() - start_time) * 1000
+        )
+        self.transferStatsChanged.emit()
+        return data_obj
+
+    def _decimated(self, xarray, yarray, *arrays):
+        """
+        Reduce the arrays to the points drawn in the current view,
+        see `decimationIndices`. The full arrays are kept for fitting
+        and export.
+        """
+        indices = Plotting1dProxy.decimationIndices(xarray, yarray, self._plot_pixel_width,
+                                                    self._view_min_x, self._view_max_x)
+        if indices is None:
+            return (xarray, yarray) + arrays
+        return tuple(array[indices] for array in (xarray, yarray) + arrays)
+
+    def _setDecimatedDataObjs(self):
+        if self._measured_xarray.size:
+            self._setBokehMeasuredDataObj()
+            if self.currentLib == 'qtcharts':
+                self._setQtChartsMeasuredDataObj()
+        if self._calculated_xarray.size:
+            self._setBokehCalculatedDataObj()
+            if self.currentLib == 'qtcharts':
+                self._setQtChartsCalculatedDataObj()
+        if self._pure_xarray.size:
+            self._setBokehPureDataObj()
+
     def _setBokehMeasuredDataObj(self):
-        self._bokeh_measured_data_obj = {
-            'x': Plotting1dProxy.aroundX(self._measured_xarray),
-            'y': Plotting1dProxy.aroundY(self._measured_yarray),
-            'sy': Plotting1dProxy.aroundY(self._measured_syarray),
-            'y_upper': Plotting1dProxy.aroundY(self._measured_yarray_upper),
-            'y_lower': Plotting1dProxy.aroundY(self._measured_yarray_lower)
-        }
-        self.bokehMeasuredDataObjChanged.emit()
+        x, y, sy, y_upper, y_lower = self._decimated(self._measured_xarray,
+                                                     self._measured_yarray,
+                                                     self._measured_syarray,
+                                                     self._measured_yarray_upper,
+                                                     self._measured_yarray_lower)
+        self._bokeh_measured_data_obj = self._bokehDataObj(
+            x=x,
+            y=y,
+            sy=sy,
+            y_upper=y_upper,
+            y_lower=y_lower
+        )
+        self._queueUpdate('bokehMeasuredDataObjChanged')
 
     def _setBokehCalculatedDataObj(self):
-        self._bokeh_calculated_data_obj = {
-            'x': Plotting1dProxy.aroundX(self._calculated_xarray),
-            'y': Plotting1dProxy.aroundY(self._calculated_yarray)
-        }
-        self.bokehCalculatedDataObjChanged.emit()
-
-    def _setBokehPureDataObj(self):
-        self._bokeh_pure_data_obj = {
-            'x': Plotting1dProxy.aroundX(self._pure_xarray),
-            'y': Plotting1dProxy.aroundY(self._pure_yarray)
-        }
-        print(self._pure_yarray)
-        self.bokehPureDataObjChanged.emit()
+        x, y = self._decimated(self._calculated_xarray, self._calculated_yarray)
+        self._bokeh_calculated_data_obj = self._bokehDataObj(
+            x=x,
+            y=y
+        )
+        self._queueUpdate('bokehCalculatedDataObjChanged')
 
     def _setBokehPureDataObj(self):
-        self._bokeh_pure_data_obj = {
-            'x': Plotting1dProxy.aroundX(self._pure_xarray),
-            'y': Plotting1dProxy.aroundY(self._pure_yarray)
-        }
-        self.bokehPureDataObjChanged.emit()
+        x, y = self._decimated(self._pure_xarray, self._pure_yarray)
+        self._bokeh_pure_data_obj = self._bokehDataObj(
+            x=x,
+            y=y
+        )
+        self._queueUpdate('bokehPureDataObjChanged')
 
     def _setBokehSampleSldDataObj(self):
-        self._bokeh_sample_sld_data_obj = {
-            'x': Plotting1dProxy.aroundX(self._sample_sld_xarray),
-            'y': Plotting1dProxy.aroundY(self._sample_sld_yarray)
-        }
-        self.bokehSampleSldDataObjChanged.emit()
+        self._bokeh_sample_sld_data_obj = self._bokehDataObj(
+            x=self._sample_sld_xarray,
+            y=self._sample_sld_yarray
+        )
+        self._queueUpdate('bokehSampleSldDataObjChanged')
     
     def _setBokehAnalysisSldDataObj(self):
-        self._bokeh_analysis_sld_data_obj = {
-            'x': Plotting1dProxy.aroundX(self._analysis_sld_xarray),
-            'y': Plotting1dProxy.aroundY(self._analysis_sld_yarray)
-        }
-        self.bokehAnalysisSldDataObjChanged.emit()
+        self._bokeh_analysis_sld_data_obj = self._bokehDataObj(
+            x=self._analysis_sld_xarray,
+            y=self._analysis_sld_yarray
+        )
+        self._queueUpdate('bokehAnalysisSldDataObjChanged')
 
     def _setBokehBackgroundDataObj(self):
-        self._bokeh_background_data_obj = {
-            'x': Plotting1dProxy.aroundX(self._background_xarray),
-            'y': Plotting1dProxy.aroundY(self._background_yarray)
-        }
-        self.bokehBackgroundDataObjChanged.emit()
+        self._bokeh_background_data_obj = self._bokehDataObj(
+            x=self._background_xarray,
+            y=self._background_yarray
+        )
+        self._queueUpdate('bokehBackgroundDataObjChanged')
+
+    def _qtchartsSeries(self, name, xarray, yarray):
+        """
+        Keep the arrays for a QtCharts series and return the key passed
+        to QML in their place, see `lineSeriesCustomReplace`. The key
+        changes on every update so QML always sees a new value.
+        """
+        self._qtcharts_series_count += 1
+        key = f'{name}#{self._qtcharts_series_count}'
+        self._qtcharts_series[name] = (key, xarray, yarray)
+        return key
 
     def _setQtChartsMeasuredDataObj(self):
+        x, y, y_upper, y_lower = self._decimated(self._measured_xarray,
+                                                 self._measured_yarray,
+                                                 self._measured_yarray_upper,
+                                                 self._measured_yarray_lower)
         self._qtcharts_measured_data_obj = {
-            'xy':
-            Plotting1dProxy.arraysToPoints(self._measured_xarray,
-                                           self._measured_yarray),
-            'xy_upper':
-            Plotting1dProxy.arraysToPoints(self._measured_xarray,
-                                           self._measured_yarray_upper),
-            'xy_lower':
-            Plotting1dProxy.arraysToPoints(self._measured_xarray,
-                                           self._measured_yarray_lower)
+            'xy': self._qtchartsSeries('measured', x, y),
+            'xy_upper': self._qtchartsSeries('measured_upper', x, y_upper),
+            'xy_lower': self._qtchartsSeries('measured_lower', x, y_lower)
         }
-        self.qtchartsMeasuredDataObjChanged.emit()
+        self._queueUpdate('qtchartsMeasuredDataObjChanged')
 
     def _setQtChartsCalculatedDataObj(self):
+        x, y = self._decimated(self._calculated_xarray, self._calculated_yarray)
         self._qtcharts_calculated_data_obj = {
-            'xy':
-            Plotting1dProxy.arraysToPoints(self._calculated_xarray,
-                                           self._calculated_yarray)
+            'xy': self._qtchartsSeries('calculated', x, y)
         }
-        self.qtchartsCalculatedDataObjChanged.emit()
+        self._queueUpdate('qtchartsCalculatedDataObjChanged')
 
     def _setQtChartsBackgroundDataObj(self):
         self._qtcharts_background_data_obj = {
-            'xy':
-            Plotting1dProxy.arraysToPoints(self._background_xarray,
-                                           self._background_yarray)
+            'xy': self._qtchartsSeries('background', self._background_xarray, self._background_yarray)
         }
-        self.qtchartsBackgroundDataObjChanged.emit()
+        self._queueUpdate('qtchartsBackgroundDataObjChanged')
 
     # Private: range setters
 
+    def _seriesBounds(self, series, xarray, lower, upper=None, log_y=False):
+        """
+        Bounds of a series, see `seriesBounds`, reused while the content
+        hash of the series stays the same.
+        """
+        content_hash = self._series_hashes.get(series)
+        cached = self._series_bounds.get(series)
+        if content_hash is not None and cached is not None and cached[0] == content_hash:
+            return cached[1]
+        bounds = Plotting1dProxy.seriesBounds(xarray, lower, upper, log_y)
+        self._series_bounds[series] = (content_hash, bounds)
+        return bounds
+
     def _setMeasuredDataRanges(self):
-        self._measured_min_x = Plotting1dProxy.arrayMin(self._measured_xarray)
-        self._measured_max_x = Plotting1dProxy.arrayMax(self._measured_xarray)
-        self._measured_min_y = Plotting1dProxy.arrayMin(self._measured_yarray_lower)
-        self._measured_max_y = Plotting1dProxy.arrayMax(self._measured_yarray_upper)
+        self._measured_min_x, self._measured_max_x, self._measured_min_y, self._measured_max_y = \
+            self._seriesBounds('measured', self._measured_xarray,
+                               self._measured_yarray_lower, self._measured_yarray_upper, log_y=True)
 
     def _setCalculatedDataRanges(self):
-        self._calculated_min_x = Plotting1dProxy.arrayMin(self._calculated_xarray)
-        self._calculated_max_x = Plotting1dProxy.arrayMax(self._calculated_xarray)
-        self._calculated_min_y = Plotting1dProxy.arrayMin(self._calculated_yarray)
-        self._calculated_max_y = Plotting1dProxy.arrayMax(self._calculated_yarray)
+        self._calculated_min_x, self._calculated_max_x, self._calculated_min_y, self._calculated_max_y = \
+            self._seriesBounds('calculated', self._calculated_xarray, self._calculated_yarray, log_y=True)
 
     def _setPureDataRanges(self):
-        self._pure_min_x = Plotting1dProxy.arrayMin(self._pure_xarray)
-        self._pure_max_x = Plotting1dProxy.arrayMax(self._pure_xarray)
-        self._pure_min_y = Plotting1dProxy.arrayMin(self._pure_yarray)
-        self._pure_max_y = Plotting1dProxy.arrayMax(self._pure_yarray)
+        self._pure_min_x, self._pure_max_x, self._pure_min_y, self._pure_max_y = \
+            self._seriesBounds('pure', self._pure_xarray, self._pure_yarray, log_y=True)
 
     def _setSampleSldDataRanges(self):
-        self._sample_sld_min_x = Plotting1dProxy.arrayMin(self._sample_sld_xarray)
-        self._sample_sld_max_x = Plotting1dProxy.arrayMax(self._sample_sld_xarray)
+        self._sample_sld_min_x, self._sample_sld_max_x, self._sample_sld_min_y, self._sample_sld_max_y = \
+            self._seriesBounds('sample_sld', self._sample_sld_xarray, self._sample_sld_yarray)
         if self.sldXDataReversed:
             self._sample_sld_min_x, self._sample_sld_max_x = self._sample_sld_max_x, self._sample_sld_min_x
-        self._sample_sld_min_y = Plotting1dProxy.arrayMin(self._sample_sld_yarray)
-        self._sample_sld_max_y = Plotting1dProxy.arrayMax(self._sample_sld_yarray)
 
     def _setAnalysisSldDataRanges(self):
-        self._analysis_sld_min_x = Plotting1dProxy.arrayMin(self._analysis_sld_xarray)
-        self._analysis_sld_max_x = Plotting1dProxy.arrayMax(self._analysis_sld_xarray)
+        self._analysis_sld_min_x, self._analysis_sld_max_x, self._analysis_sld_min_y, self._analysis_sld_max_y = \
+            self._seriesBounds('analysis_sld', self._analysis_sld_xarray, self._analysis_sld_yarray)
         if self.sldXDataReversed:
             self._analysis_sld_min_x, self._analysis_sld_max_x = self._analysis_sld_max_x, self._analysis_sld_min_x
-        self._analysis_sld_min_y = Plotting1dProxy.arrayMin(self._analysis_sld_yarray)
-        self._analysis_sld_max_y = Plotting1dProxy.arrayMax(self._analysis_sld_yarray)
 
     def _yAxisMin(self, min_y, max_y):
         return min_y
@@ -489,8 +697,19 @@ class Plotting1dProxy(QObject):
     def _yAxisMax(self, max_y):
         return max_y
 
+    def _dataRangeX(self):
+        if self._measured_xarray.size:
+            return self._measured_min_x, self._measured_max_x
+        return self._calculated_min_x, self._calculated_max_x
+
+    def _addViewRange(self, ranges_obj):
+        if self._view_min_x is not None:
+            ranges_obj['view_min_x'] = Plotting1dProxy.aroundX(self._view_min_x)
+            ranges_obj['view_max_x'] = Plotting1dProxy.aroundX(self._view_max_x)
+        return ranges_obj
+
     def _setExperimentPlotRanges(self):
-        self._experiment_plot_ranges_obj = {
+        ranges_obj = self._addViewRange({
             'min_x':
             Plotting1dProxy.aroundX(self._measured_min_x),
             'max_x':
@@ -500,8 +719,11 @@ class Plotting1dProxy(QObject):
                 self._yAxisMin(self._measured_min_y, self._measured_max_y)),
             'max_y':
             Plotting1dProxy.aroundY(self._yAxisMax(self._measured_max_y))
-        }
-        self.experimentPlotRangesObjChanged.emit()
+        })
+        if ranges_obj == self._experiment_plot_ranges_obj:
+            return
+        self._experiment_plot_ranges_obj = ranges_obj
+        self._queueUpdate('experimentPlotRangesObjChanged')
 
     def _setAnalysisPlotRanges(self):
         min_x = self._calculated_min_x
@@ -513,31 +735,40 @@ class Plotting1dProxy(QObject):
             max_x = self._measured_max_x
             min_y = min(self._measured_min_y, self._calculated_min_y)
             max_y = max(self._measured_max_y, self._calculated_max_y)
-        self._analysis_plot_ranges_obj = {
+        ranges_obj = self._addViewRange({
             'min_x': Plotting1dProxy.aroundX(min_x),
             'max_x': Plotting1dProxy.aroundX(max_x),
             'min_y': Plotting1dProxy.aroundY(self._yAxisMin(min_y, max_y)),
             'max_y': Plotting1dProxy.aroundY(self._yAxisMax(max_y))
-        }
-        self.analysisPlotRangesObjChanged.emit()
+        })
+        if ranges_obj == self._analysis_plot_ranges_obj:
+            return
+        self._analysis_plot_ranges_obj = ranges_obj
+        self._queueUpdate('analysisPlotRangesObjChanged')
 
     def _setSampleSldPlotRanges(self):
-        self._sample_sld_plot_ranges_obj = {
+        ranges_obj = {
             'min_x': Plotting1dProxy.aroundX(self._sample_sld_min_x),
             'max_x': Plotting1dProxy.aroundX(self._sample_sld_max_x),
             'min_y': Plotting1dProxy.aroundY(self._sample_sld_min_y),
             'max_y': Plotting1dProxy.aroundY(self._sample_sld_max_y)
         }
-        self.sampleSldPlotRangesObjChanged.emit()
+        if ranges_obj == self._sample_sld_plot_ranges_obj:
+            return
+        self._sample_sld_plot_ranges_obj = ranges_obj
+        self._queueUpdate('sampleSldPlotRangesObjChanged')
 
     def _setAnalysisSldPlotRanges(self):
-        self._analysis_sld_plot_ranges_obj = {
+        ranges_obj = {
             'min_x': Plotting1dProxy.aroundX(self._analysis_sld_min_x),
             'max_x': Plotting1dProxy.aroundX(self._analysis_sld_max_x),
             'min_y': Plotting1dProxy.aroundY(self._analysis_sld_min_y),
             'max_y': Plotting1dProxy.aroundY(self._analysis_sld_max_y)
         }
-        self.analysisSldPlotRangesObjChanged.emit()
+        if ranges_obj == self._analysis_sld_plot_ranges_obj:
+            return
+        self._analysis_sld_plot_ranges_obj = ranges_obj
+        self._queueUpdate('analysisSldPlotRangesObjChanged')
 
     # Static methods
 
@@ -561,6 +792,80 @@ class Plotting1dProxy(QObject):
     def aroundHkl(a):
         return Plotting1dProxy.around(a, decimals=3)
 
+    @staticmethod
+    def decimationIndices(xarray, yarray, n_buckets, min_x=None, max_x=None):
+        """
+        Indices of the points to draw for a chart `n_buckets` pixels
+        wide showing `min_x` to `max_x`. The points in view are split
+        into one bucket per pixel column and only the smallest and
+        largest y of each bucket are kept, so the drawn curve looks the
+        same as with all the points. The nearest point outside the view
+        on either side is kept so the curve reaches the edges.
+
+        :return: Sorted indices, or None if there is nothing to drop
+        """
+        n_points = xarray.size
+        if n_points <= 2 * n_buckets and min_x is None:
+            return None
+        if min_x is None:
+            min_x = Plotting1dProxy.arrayMin(xarray)
+            max_x = Plotting1dProxy.arrayMax(xarray)
+        in_view = np.flatnonzero((xarray >= min_x) & (xarray <= max_x))
+        if in_view.size > 2 * n_buckets and max_x > min_x:
+            buckets = ((xarray[in_view] - min_x) / (max_x - min_x) * n_buckets).astype(int)
+            buckets = np.clip(buckets, 0, n_buckets - 1)
+            order = np.lexsort((yarray[in_view], buckets))
+            edges = np.flatnonzero(np.diff(buckets[order]))
+            first = np.concatenate(([0], edges + 1))
+            last = np.concatenate((edges, [order.size - 1]))
+            in_view = in_view[np.concatenate((order[first], order[last]))]
+        neighbours = []
+        below = np.flatnonzero(xarray < min_x)
+        if below.size:
+            neighbours.append(below[np.argmax(xarray[below])])
+        above = np.flatnonzero(xarray > max_x)
+        if above.size:
+            neighbours.append(above[np.argmin(xarray[above])])
+        return np.unique(np.concatenate((in_view, np.asarray(neighbours, dtype=int))))
+
+    @staticmethod
+    def contentHash(*arrays):
+        content_hash = hashlib.blake2b(digest_size=16)
+        for array in arrays:
+            if array is None:
+                content_hash.update(b'None')
+                continue
+            array = np.ascontiguousarray(array, dtype='<f8')
+            content_hash.update(str(array.shape).encode())
+            content_hash.update(array.tobytes())
+        return content_hash.digest()
+
+    @staticmethod
+    def encodeArray(array):
+        array = np.ascontiguousarray(array, dtype='<f8')
+        return base64.b64encode(array.tobytes()).decode('ascii')
+
+    @staticmethod
+    def seriesBounds(xarray, lower, upper=None, log_y=False):
+        """
+        x and y bounds of a series, with y between the smallest of `lower`
+        and the largest of `upper` (both `lower` if not given). For a log
+        axis y values which are not positive are left out.
+
+        :return: min_x, max_x, min_y, max_y
+        """
+        if upper is None:
+            upper = lower
+        if log_y:
+            positive_upper = upper[upper > 0]
+            positive_lower = positive_upper if upper is lower else lower[lower > 0]
+            if positive_lower.size == 0:
+                positive_lower = positive_upper
+            if positive_upper.size:
+                lower, upper = positive_lower, positive_upper
+        return (Plotting1dProxy.arrayMin(xarray), Plotting1dProxy.arrayMax(xarray),
+                Plotting1dProxy.arrayMin(lower), Plotting1dProxy.arrayMax(upper))
+
     @staticmethod
     def arrayMin(array):
         if array.size:
@@ -597,7 +902,32 @@ class Plotting1dProxy(QObject):
         return float_list
 
     @staticmethod
-    def arraysToPoints(xarray, yarray):
-        xarray = Plotting1dProxy.aroundX(xarray)
-        yarray = Plotting1dProxy.aroundY(yarray)
-        return [QPointF(x, y) for x, y in zip(xarray, yarray)]
+    def verticalLineBrush(size, color):
+        """
+        Texture brush of a `size` x `size` transparent square with a one
+        pixel vertical line of `color` through the middle.
+        """
+        pixels = np.zeros((size, size), dtype=np.uint32)
+        if size:
+            pixels[:, size // 2] = color.rgba()
+        texture_image = QImage(pixels.tobytes(), size, size, 4 * size, QImage.Format_ARGB32).copy()
+        brush = QBrush()
+        brush.setTextureImage(texture_image)
+        return brush
+
+    @staticmethod
+    def arraysToPolygon(xarray, yarray):
+        """
+        Points from x and y arrays, written straight into the memory of
+        a QPolygonF (a QVector<QPointF>) without any Python objects per
+        point. The series takes a shared copy of the vector on replace.
+        """
+        size = min(xarray.size, yarray.size)
+        polygon = QPolygonF(size)
+        if size:
+            address = shiboken2.getCppPointer(polygon.data())[0]
+            buffer = (ctypes.c_double * (2 * size)).from_address(address)
+            points = np.frombuffer(buffer, dtype=np.float64).reshape(size, 2)
+            points[:, 0] = xarray[:size]
+            points[:, 1] = yarray[:size]
+        return polygon
@@ -1,23 +1,33 @@
 __author__ = 'github.com/arm61'
 
 import os
+import time
+import shutil
 import datetime
 import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 
-from PySide2.QtCore import QObject, Signal, Property, Slot
+from PySide2.QtCore import QObject, Signal, Property, Slot, QTimer
 
 import matplotlib.pyplot as plt
-import matplotlib.gridspec as gridspec
 import matplotlib.backends.backend_pdf
 
 from easyCore import np
 from easyApp.Logic.Utils.Utils import generalizePath
 
-from EasyReflectometryApp.Logic.DataStore import DataSet1D
+from EasyReflectometryApp.Logic.DataStore import DataSet1D, EncodedColumns, encode_array
+from EasyReflectometryApp.Logic.FigureRender import FigureCache, draw_figure, figure_key, figure_spec, render_figure
+from EasyReflectometryApp.Logic.ProjectJournal import ProjectJournal, atomic_write
+from EasyReflectometryApp.Logic.ResultsExport import export_results, results_record
 from EasyReflectometry.sample.materials import Materials
 from EasyReflectometry.experiment.model import Model
 from EasyReflectometry.experiment.models import Models
 
+AUTOSAVE_PATH = os.path.join(os.path.expanduser('~'), '.EasyReflectometry', 'autosave')
+AUTOSAVE_DELAY = 2000  # ms of inactivity before an autosave
+PLOT_DPI = 600
+
 
 class ProjectProxy(QObject):
 
@@ -25,6 +35,8 @@ class ProjectProxy(QObject):
     projectCreatedChanged = Signal()
     projectInfoChanged = Signal()
     htmlExportingFinished = Signal(bool, str)
+    autosaveAvailableChanged = Signal()
+    plotRendered = Signal(str, object)
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -37,6 +49,20 @@ class ProjectProxy(QObject):
 
         self._report = ""
 
+        # This session journals to a directory of its own; the journals
+        # left behind by earlier sessions stay until recovered or discarded.
+        self._journal = ProjectJournal.new_session(AUTOSAVE_PATH)
+        self._recoverable = ProjectJournal.sessions(AUTOSAVE_PATH)
+        self._autosave_available = bool(self._recoverable)
+        self._autosave_timer = QTimer(self)
+        self._autosave_timer.setSingleShot(True)
+        self._autosave_timer.setInterval(AUTOSAVE_DELAY)
+        self._autosave_timer.timeout.connect(self._autosave)
+
+        self._figure_cache = FigureCache()
+        self._render_executor = None
+        self.plotRendered.connect(self._onPlotRendered)
+
     # # #
     # Defaults
     # # #
@@ -146,11 +172,11 @@ class ProjectProxy(QObject):
     def projectFilePath(self):
         return self.project_save_filepath
 
-    def _saveProject(self):
+    def _projectDescription(self) -> dict:
         """
+        Describe everything in the project apart from the experiment arrays.
+        This is cheap whatever the size of the loaded data.
         """
-        projectPath = self.currentProjectPath
-        project_save_filepath = os.path.join(projectPath, 'project.json')
         materials_in_model = []
         for i in self.parent._model_proxy._model:
             for j in i.structure:
@@ -168,16 +194,9 @@ class ProjectProxy(QObject):
         }
 
         if self.parent._data_proxy._data.experiments:
-            descr['experiments'] = [] 
             descr['experiments_models'] = []
             descr['experiments_names'] = []
             for i in self.parent._data_proxy._data.experiments:
-                if self.parent._data_proxy._data.experiments[0].xe is not None:
-                    descr['experiments'].append([
-                        i.x, i.y, i.ye, i.xe
-                    ])
-                else:
-                    descr['experiments'].append([i.x, i.y, i.ye])
                 descr['experiments_models'].append(i.model.name)
                 descr['experiments_names'].append(i.name)
 
@@ -190,19 +209,113 @@ class ProjectProxy(QObject):
             'engine': self.parent._fitter_proxy.eFitter.easy_f.current_engine.name,
             'method': self.parent._minimizer_proxy._current_minimizer_method_name
         }
+        return descr
+
+    def _experimentsDescription(self) -> dict:
+        """
+        Describe the experiment arrays, stored as base64 encoded binary
+        buffers, see `encode_array`. Datasets which were never used are
+        written out without being decoded.
+        """
+        descr = {}
+        if self.parent._data_proxy._data.experiments:
+            descr['experiments'] = [i.encode() for i in self.parent._data_proxy._data.experiments]
+        return descr
+
+    def _saveProject(self):
+        """
+        Write the project to `project.json`. Once written, the autosave
+        journal is no longer needed and is removed.
+        """
+        start_time = time.perf_counter()
+        projectPath = self.currentProjectPath
+        project_save_filepath = os.path.join(projectPath, 'project.json')
+        descr = self._projectDescription()
+        descr.update(self._experimentsDescription())
 
-        content_json = json.dumps(descr, indent=4, default=self.default)
+        content_json = json.dumps(descr, separators=(',', ':'), default=self.default)
         path = generalizePath(project_save_filepath)
         self.createFile(path, content_json)
+        self._journal.clear()
+        print(f'Saved project {path}: {len(content_json)} bytes in {time.perf_counter() - start_time:.3f} s')
 
     def default(self, obj):
         if type(obj).__module__ == np.__name__:
             if isinstance(obj, np.ndarray):
-                return obj.tolist()
+                return encode_array(obj)
             else:
                 return obj.item()
         raise TypeError('Unknown type:', type(obj))
 
+    # # #
+    # Autosave
+    # # #
+
+    @Property(bool, notify=autosaveAvailableChanged)
+    def autosaveAvailable(self):
+        return self._autosave_available
+
+    @Slot()
+    def recoverAutosave(self):
+        """
+        Restore the project left behind by the last session which ended
+        without saving, from its snapshot and journal. The recovered project
+        is recorded in the journal of this session before the journals of
+        earlier sessions are removed.
+        """
+        if not self._recoverable:
+            return
+        start_time = time.perf_counter()
+        descr = self._recoverable[0].recover()
+        if descr is None:
+            return
+        self._setProjectDescription(descr)
+        self.parent._state_proxy.stateChanged.emit(True)
+        self._autosave_timer.stop()
+        self._autosave()
+        self.discardAutosave()
+        print(f'Recovered autosaved project in {time.perf_counter() - start_time:.3f} s')
+
+    @Slot()
+    def discardAutosave(self):
+        """
+        Remove the journals left behind by earlier sessions.
+        """
+        for journal in self._recoverable:
+            journal.clear()
+        self._recoverable = []
+        self._setAutosaveAvailable(False)
+
+    def _setAutosaveAvailable(self, available: bool):
+        if self._autosave_available == available:
+            return
+        self._autosave_available = available
+        self.autosaveAvailableChanged.emit()
+
+    def _onStateChanged(self, changed=True):
+        """
+        Schedule an autosave. Bursts of changes are coalesced by restarting
+        the timer, so only the state after the last one is recorded.
+        """
+        if changed:
+            self._autosave_timer.start()
+
+    def _autosave(self):
+        """
+        Append the changes since the last autosave to the journal. The
+        experiment arrays are only rewritten when the data store changed.
+        """
+        start_time = time.perf_counter()
+        try:
+            self._journal.record(json.loads(json.dumps(self._projectDescription(), default=self.default)))
+            data_version = self.parent._data_proxy._data.version
+            if data_version != self._journal.data_version:
+                self._journal.record_data(self._experimentsDescription(), data_version)
+        except Exception as exception:
+            print(f'Autosave failed: {exception}')
+            return
+        print(f'Autosaved project in {time.perf_counter() - start_time:.3f} s')
+
     def _loadProjectAs(self, filepath):
         """
         """
@@ -213,6 +326,7 @@ class ProjectProxy(QObject):
     def _loadProject(self):
         """
         """
+        start_time = time.perf_counter()
         path = generalizePath(self.project_load_filepath)
         if not os.path.isfile(path):
             print("Failed to find project: '{0}'".format(path))
@@ -220,7 +334,15 @@ class ProjectProxy(QObject):
         self.currentProjectPath = os.path.split(path)[0]
         with open(path, 'r') as xml_file:
             descr: dict = json.load(xml_file)
+        self._journal.clear()
+        self._setProjectDescription(descr)
+        print(f'Loaded project {path}: {os.path.getsize(path)} bytes in {time.perf_counter() - start_time:.3f} s')
 
+    def _setProjectDescription(self, descr: dict):
+        """
+        Replace the current project with the one in `descr`, as produced by
+        `_projectDescription` and `_experimentsDescription`.
+        """
         interface_name = descr.get('interface', None)
         for i, inter in enumerate(interface_name):
             if inter is not None:
@@ -240,17 +362,24 @@ class ProjectProxy(QObject):
         for i in Materials.from_dict(descr['materials_not_in_model']):
             self.parent._material_proxy._materials.append(i)
 
+        new_minimizer_settings = descr.get('minimizer', None)
+        if new_minimizer_settings is not None:
+            new_engine = new_minimizer_settings['engine']
+            new_method = new_minimizer_settings['method']
+            new_engine_index = self.parent._minimizer_proxy.minimizerNames.index(new_engine)
+            self.parent._minimizer_proxy.currentMinimizerIndex = new_engine_index
+            try:
+                new_method_index = self.parent._minimizer_proxy.minimizerMethodNames.index(new_method)
+            except ValueError:
+                new_method_index = 0
+            self.parent._minimizer_proxy.currentMinimizerMethodIndex = new_method_index
+
         # experiment
+        # The arrays are only decoded once a dataset is first used, see
+        # `EncodedColumns`, so this does not depend on the size of the data.
+        self.parent._data_proxy.resetData()
         if 'experiments' in descr:
-            self.parent._data_proxy.experimentLoaded = True
             for i, e in enumerate(descr['experiments']):
-                x = np.array(e[0])
-                y = np.array(e[1])
-                ye = np.array(e[2])
-                if len(e) == 4:
-                    xe = np.array(e[3])
-                else:
-                    xe = np.zeros_like(ye)
                 name = descr['experiments_names'][i]
                 model_name = descr['experiments_models'][i]
                 model = None
@@ -258,21 +387,15 @@ class ProjectProxy(QObject):
                     if i.name == model_name:
                         model = i
                         break
-                ds = DataSet1D(name=name, x=x, y=y, ye=ye, xe=xe, 
-                           model=model, 
-                           x_label='q (1/angstrom)', 
-                           y_label='Reflectivity')
+                ds = DataSet1D(name=name, model=model,
+                               x_label='q (1/angstrom)',
+                               y_label='Reflectivity',
+                               loader=EncodedColumns(e))
                 self.parent._data_proxy._data.append(ds)
-            
+
             self.parent._data_proxy.experimentLoaded = True
             self.parent._data_proxy.experimentSkipped = False
-            self.parent._data_proxy.experimentChanged.emit()
-            self.parent._parameter_proxy._onParametersChanged()
-
         else:
-            # delete existing experiment
-            self.parent.removeExperiment()
-            self.parent._data_proxy.experimentLoaded = False
             if descr['experiment_skipped']:
                 self.parent._data_proxy.experimentSkipped = True
                 self.parent._data_proxy.experimentSkippedChanged.emit()
@@ -282,18 +405,10 @@ class ProjectProxy(QObject):
         # project info
         self.projectInfoAsJson = json.dumps(descr['project_info'])
         self.parent.sampleChanged.emit()
-
-        new_minimizer_settings = descr.get('minimizer', None)
-        if new_minimizer_settings is not None:
-            new_engine = new_minimizer_settings['engine']
-            new_method = new_minimizer_settings['method']
-            new_engine_index = self.parent._minimizer_proxy.minimizerNames.index(new_engine)
-            self.currentMinimizerIndex = new_engine_index
-            try:
-                new_method_index = self.parent._minimizer_proxy.minimizerMethodNames.index(new_method)
-            except ValueError:
-                new_method_index = self.parent._minimizer_proxy.minimizerMethodNames[0]
-            self.currentMinimizerMethodIndex = new_method_index
+        if 'experiments' in descr:
+            # Let the restored sample show before the current dataset is
+            # decoded and plotted.
+            QTimer.singleShot(0, self.parent._data_proxy.experimentChanged.emit)
 
         self.parent._undoredo_proxy.resetUndoRedoStack()
 
@@ -301,13 +416,15 @@ class ProjectProxy(QObject):
 
     @staticmethod
     def createFile(path, content):
+        """
+        Write `content` to `path`. An existing file is only replaced once the
+        new content is completely on disk.
+        """
         if os.path.exists(path):
             print(f'File already exists {path}. Overwriting...')
-            os.unlink(path)
         try:
             message = f'create file {path}'
-            with open(path, "w") as file:
-                file.write(content)
+            atomic_write(path, content)
         except Exception as exception:
             print(message, exception)
 
@@ -332,65 +449,118 @@ class ProjectProxy(QObject):
             success = False
         self.htmlExportingFinished.emit(success, filepath)
 
+    @Slot(str)
+    def exportResults(self, filepath: str):
+        """
+        Export the calculated curve on the data grid, the residuals and the
+        SLD profile of every dataset, or of every model when there is no
+        data. The format follows the extension: .ort, .dat or .npz.
+        """
+        start_time = time.perf_counter()
+        try:
+            count = export_results(self._resultsRecords(), generalizePath(filepath))
+            success = True
+            print(f'Exported {count} result(s) to {filepath} in {time.perf_counter() - start_time:.3f} s')
+        except (IOError, ValueError) as exception:
+            print(f'Failed to export results: {exception}')
+            success = False
+        self.htmlExportingFinished.emit(success, filepath)
+
+    def _resultsRecords(self):
+        """
+        Generate the export records one at a time, so the curves of a
+        dataset are only calculated when they are about to be written.
+        """
+        interface = self.parent._interface
+        data = self.parent._data_proxy._data
+        if data.experiments:
+            for d in data.experiments:
+                r_calc, (z, sld) = self.parent._simulation_proxy.calculatedCurve(d.model, d.x)
+                yield results_record(d.name, d.model.name, d.x, r_calc, z, sld, r=d.y, dr=d.ye, dq=d.xe)
+        else:
+            x_min = float(self.parent._simulation_proxy._q_range_as_obj['x_min'])
+            x_max = float(self.parent._simulation_proxy._q_range_as_obj['x_max'])
+            x_step = float(self.parent._simulation_proxy._q_range_as_obj['x_step'])
+            x = np.arange(x_min, x_max + x_step, x_step)
+            for m in self.parent._model_proxy._model:
+                r_calc = interface.fit_func(x, m.uid)
+                z, sld = interface.sld_profile(m.uid)
+                yield results_record(m.name, m.name, x, r_calc, z, sld)
+
     def resetProject(self):
+        self._autosave_timer.stop()
+        self._journal.clear()
         self._project_created = False 
         self._project_info = self._defaultProjectInfo()
         self.projectInfoChanged.emit()
 
     @Slot(str, float, float)
     def savePlot(self, filename: str, figsize_x: float, figsize_y: float):
-        fig = self.make_plot(filename, figsize_x, figsize_y)
-        fig.savefig(filename, dpi=600)
-        plt.close()
-        self.htmlExportingFinished.emit(True, filename)
+        """
+        Save the quick plot. The figure is rendered in a worker process and
+        `htmlExportingFinished` is emitted when it is written. A figure
+        with the same content is copied from the cache instead.
+        """
+        spec = self._figureSpec(figsize_x, figsize_y)
+        fmt = os.path.splitext(filename)[1][1:].lower() or 'png'
+        key = figure_key(spec, fmt, PLOT_DPI)
+        cached = self._figure_cache.get(key)
+        if cached is not None:
+            self._copyPlot(cached, filename)
+            return
+        if self._render_executor is None:
+            self._render_executor = ProcessPoolExecutor(max_workers=1,
+                                                        mp_context=multiprocessing.get_context('spawn'))
+        future = self._render_executor.submit(render_figure, spec, self._figure_cache.path(key), fmt, PLOT_DPI)
+        future.add_done_callback(lambda f, p=filename: self.plotRendered.emit(p, f))
 
     @Slot(str, float, float)
     def showPlot(self, filename: str, figsize_x: float, figsize_y: float):
-        fig = self.make_plot(filename, figsize_x, figsize_y)
+        fig = plt.figure(figsize=(figsize_x / 2.54, figsize_y / 2.54), constrained_layout=True)
+        draw_figure(fig, self._figureSpec(figsize_x, figsize_y))
         plt.show()
 
-    def make_plot(self, filename: str, figsize_x: float, figsize_y: float):
-        fig = plt.figure(figsize=(figsize_x / 2.54, figsize_y / 2.54), constrained_layout=True)
-        gs = gridspec.GridSpec(1, 2, figure=fig)
-        ax1 = fig.add_subplot(gs[0, 0])
-        ax2 = fig.add_subplot(gs[0, 1])
-        ax1.set_xlabel('$q$/Å$^{-1}$')
-        if self.parent._simulation_proxy._plot_rq4:
-            ax1.set_ylabel('$R(q)q^4$/Å$^{-4}$')
-        else:
-            ax1.set_ylabel('$R(q)$')
-        ax2.set_xlabel('$z$/Å')
-        ax2.set_ylabel('SLD($z$)/$10^{-6}$Å$^{-2}$')
+    def _onPlotRendered(self, filename: str, future):
+        try:
+            rendered = future.result()
+        except Exception as exception:
+            print(f'Failed to render plot: {exception}')
+            self.htmlExportingFinished.emit(False, filename)
+            return
+        self._figure_cache.prune()
+        self._copyPlot(rendered, filename)
+
+    def _copyPlot(self, rendered: str, filename: str):
+        try:
+            shutil.copyfile(rendered, filename)
+            success = True
+        except OSError as exception:
+            print(f'Failed to save plot: {exception}')
+            success = False
+        self.htmlExportingFinished.emit(success, filename)
+
+    def _figureSpec(self, figsize_x: float, figsize_y: float) -> dict:
+        """
+        Curves of every dataset, or of every model when there is no data,
+        for `draw_figure`. The curve shown in the charts is reused.
+        """
+        simulation = self.parent._simulation_proxy
+        models = self.parent._model_proxy._model
+        colors = self.parent._model_proxy._colors
         data = self.parent._data_proxy._data
+        curves = []
         if len(data) != 0:
-            for i, d in enumerate(data):
-                model_index = self.parent._model_proxy._model.index(d.model)
-                color = self.parent._model_proxy._colors[model_index]
-                y = self.parent._interface.fit_func(d.x, d.model.uid)
-                if self.parent._simulation_proxy._plot_rq4:
-                    ax1.errorbar(d.x, (d.y * d.x ** 4) * 10 ** i, (d.ye * d.x ** 4) * 10 ** i, marker='', ls='', color=color, alpha=0.5)
-                    ax1.plot(d.x, (y * d.x ** 4) * 10 ** i, ls='-', color=color, zorder=10, label=d.name)
-                else:
-                    ax1.errorbar(d.x, d.y * 10 ** i, d.ye * 10 ** i, marker='', ls='', color=color, alpha=0.5)
-                    ax1.plot(d.x, y * 10 ** i, ls='-', color=color, zorder=10, label=d.name)
-                sld_profile = self.parent._interface.sld_profile(d.model.uid)
-                ax2.plot(sld_profile[0], sld_profile[1] + 10 * i, color=color, ls='-')
-            ax1.set_yscale('log')
+            for d in data:
+                r_calc, (z, sld) = simulation.calculatedCurve(d.model, d.x)
+                curves.append({'name': d.name, 'color': colors[models.index(d.model)],
+                               'q': d.x, 'r': d.y, 'dr': d.ye, 'r_calc': r_calc, 'z': z, 'sld': sld})
         else:
-            x_min = float(self.parent._simulation_proxy._q_range_as_obj['x_min'])
-            x_max = float(self.parent._simulation_proxy._q_range_as_obj['x_max'])
-            x_step = float(self.parent._simulation_proxy._q_range_as_obj['x_step'])
+            x_min = float(simulation._q_range_as_obj['x_min'])
+            x_max = float(simulation._q_range_as_obj['x_max'])
+            x_step = float(simulation._q_range_as_obj['x_step'])
             x = np.arange(x_min, x_max + x_step, x_step)
-            model = self.parent._model_proxy._model
-            for i, m in enumerate(model):
-                color = self.parent._model_proxy._colors[i]
-                y = self.parent._interface.fit_func(x, m.uid)
-                if self.parent._simulation_proxy._plot_rq4:
-                    ax1.plot(x, (y * d.x ** 4) * 10 ** i, ls='-', color=color, zorder=10, label=m.name)
-                else:
-                    ax1.plot(x, y * 10 ** i, ls='-', color=color, zorder=10, label=m.name)
-                sld_profile = self.parent._interface.sld_profile(m.uid)
-                ax2.plot(sld_profile[0], sld_profile[1] + 10 * i, color=color, ls='-')
-            ax1.set_yscale('log')
-        ax1.legend()
-        return fig
\ No newline at end of file
+            for i, m in enumerate(models):
+                r_calc, (z, sld) = simulation.calculatedCurve(m, x)
+                curves.append({'name': m.name, 'color': colors[i],
+                               'q': x, 'r_calc': r_calc, 'z': z, 'sld': sld})
+        return figure_spec(curves, simulation._plot_rq4, len(data) != 0, figsize_x, figsize_y)
@@ -32,6 +32,8 @@ class SimulationProxy(QObject):
         self._experiment_parameters = None
         self._plot_rq4 = False
         self._y_main_axis_title = 'R(q)'
+        self._measured_data_cache = None
+        self._calculated_curve = None
 
         # # #
         # Connections
@@ -128,24 +130,35 @@ class SimulationProxy(QObject):
 
     def _setExperimentalData(self):
         if len(self.parent._data_proxy._data) > 0:
-            x = self.parent._data_proxy._data[self.parent._data_proxy.currentDataIndex].x
-            if self._plot_rq4:
-                y = self.parent._data_proxy._data[self.parent._data_proxy.currentDataIndex].y * x ** 4
-                ye = self.parent._data_proxy._data[self.parent._data_proxy.currentDataIndex].ye * x ** 4
-            else: 
-                y = self.parent._data_proxy._data[self.parent._data_proxy.currentDataIndex].y
-                ye = self.parent._data_proxy._data[self.parent._data_proxy.currentDataIndex].ye
-            self.parent._plotting_1d_proxy.setMeasuredData(x, y, ye)
-            self._experiment_parameters = self._experimentDataParameters(
-                self.parent._data_proxy._data[self.parent._data_proxy.currentDataIndex])
+            data = self.parent._data_proxy._data[self.parent._data_proxy.currentDataIndex]
+            self.parent._plotting_1d_proxy.setMeasuredData(*self._measuredPlotArrays(data))
+            self._experiment_parameters = self._experimentDataParameters(data)
             self.qRangeAsObj = json.dumps(self._experiment_parameters[0])
             self.backgroundAsObj = json.dumps(self._experiment_parameters[1])
 
-            self.parent._data_proxy.experimentDataAsXmlChanged.emit()
+            self.parent._data_proxy.experimentNamesChanged.emit()
             # self.parent._project_proxy.projectInfoAsJson[
             #     'experiments'] = self.parent._data_proxy.experiments[0]['name']
             # self.parent._project_proxy.projectInfoChanged.emit()
 
+    def _measuredPlotArrays(self, data):
+        """
+        x, y and ye of `data` as plotted, reused until the data or the
+        R(q)q⁴ setting change.
+        """
+        cache = self._measured_data_cache
+        if cache is not None and cache[0] is data and cache[1:3] == (data.version, self._plot_rq4):
+            return cache[3]
+        x = data.x
+        if self._plot_rq4:
+            y = data.y * x ** 4
+            ye = data.ye * x ** 4
+        else:
+            y = data.y
+            ye = data.ye
+        self._measured_data_cache = (data, data.version, self._plot_rq4, (x, y, ye))
+        return x, y, ye
+
     def _onCalculatedDataChanged(self):
         self._updateCalculatedData()
 
@@ -181,21 +194,35 @@ class SimulationProxy(QObject):
         if self.parent._data_proxy.experimentLoaded:
             exp = self.parent._data_proxy._data.experiments[self.parent._data_proxy.currentDataIndex]
             x = exp.x
-            to_use = self.parent._data_proxy._data[self.parent._data_proxy.currentDataIndex].model
+            to_use = exp.model
 
         y = self.parent._interface.fit_func(x, to_use.uid)
-        if self._plot_rq4:
-            y *= (x ** 4)
         sld_profile = self.parent._interface.sld_profile(to_use.uid)
+        self._calculated_curve = (to_use.uid, x, y, sld_profile)
+        if self._plot_rq4:
+            y = y * (x ** 4)
 
         self.parent._plotting_1d_proxy.setCalculatedData(x, y)
         self.parent._plotting_1d_proxy.setAnalysisSldData(*sld_profile)
 
+    def calculatedCurve(self, model, x):
+        """
+        R(q) of `model` at `x` and its SLD profile. The curve last
+        calculated for the charts is reused when it matches.
+        """
+        if self._calculated_curve is not None:
+            uid, curve_x, y, sld_profile = self._calculated_curve
+            if uid == model.uid and np.array_equal(curve_x, x):
+                return y, sld_profile
+        return self.parent._interface.fit_func(x, model.uid), self.parent._interface.sld_profile(model.uid)
+
     def resetSimulation(self):
         self._background_as_obj = self._defaultBackground()
         self._resolution_as_obj = self._defaultResolution()
         self._q_range_as_obj = self._defaultQRange()
         self._experiment_parameters = None
+        self._measured_data_cache = None
+        self._calculated_curve = None
 
     # # #
     # Static methods
@@ -206,7 +233,7 @@ class SimulationProxy(QObject):
         x_min = data.x[0]
         x_max = data.x[-1]
         x_step = (x_max - x_min) / (len(data.x) - 1)
-        bkg = np.min(data.y)
+        bkg = data.estimated_background
         q_range_parameters = {
             "x_min": x_min,
             "x_max": x_max,
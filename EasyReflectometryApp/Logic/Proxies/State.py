@@ -6,6 +6,8 @@ from PySide2.QtCore import QObject, Signal, Property, Slot
 
 from easyCore import np
 
+from EasyReflectometryApp.Logic.PropertyCache import PropertyCache, memoized
+
 
 
 class StateProxy(QObject):
@@ -16,6 +18,7 @@ class StateProxy(QObject):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.parent = parent
+        self._property_cache = PropertyCache(self)
 
         self._status_model = None
         self._state_changed = False
@@ -43,6 +46,7 @@ class StateProxy(QObject):
         self.stateChanged.emit(changed)
 
     @Property('QVariant', notify=statusInfoChanged)
+    @memoized('statusInfoChanged')
     def statusModelAsObj(self):
         obj = {
             "calculation":
@@ -54,6 +58,7 @@ class StateProxy(QObject):
         return obj
 
     @Property(str, notify=statusInfoChanged)
+    @memoized('statusInfoChanged')
     def statusModelAsXml(self):
         model = [{
             "label": "Calculation",
@@ -42,7 +42,7 @@ class UndoRedoProxy(QObject):
     def undo(self):
         if self.canUndo:
             callback = [self.parent.sampleChanged]
-            if len(borg.stack.history[0]) > 1:
+            if len(borg.stack.history[0]) != 1:
                 callback = [self.parent.sampleChanged]
             else:
                 old = borg.stack.history[0].current._parent
@@ -62,7 +62,7 @@ class UndoRedoProxy(QObject):
     def redo(self):
         if self.canRedo:
             callback = [self.parent.sampleChanged]
-            if len(borg.stack.future[0]) > 1:
+            if len(borg.stack.future[0]) != 1:
                 callback = [self.parent.sampleChanged]
             else:
                 new = borg.stack.future[0].current._parent
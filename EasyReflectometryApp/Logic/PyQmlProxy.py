@@ -1,7 +1,11 @@
 __author__ = 'github.com/arm61'
 
+from contextlib import contextmanager
+
 from PySide2.QtCore import QObject, Signal, Property
 
+from easyCore import borg
+
 from EasyReflectometry.interface import InterfaceFactory
 
 from .Proxies.Calculator import CalculatorProxy
@@ -26,12 +30,17 @@ class PyQmlProxy(QObject):
     layersChanged = Signal()
     itemsChanged = Signal()
     layersMaterialsChanged = Signal()
+    parameterValuesChanged = Signal()
 
     def __init__(self, parent=None):
         super().__init__(parent)
 
         self._interface = InterfaceFactory()
 
+        # Transactions
+        self._transaction_depth = 0
+        self._pending_signals = []
+
         # Proxies
         self._project_proxy = ProjectProxy(self)
         self._material_proxy = MaterialProxy(self)
@@ -56,12 +65,12 @@ class PyQmlProxy(QObject):
         self._model_proxy.itemsNameChanged.connect(self._parameter_proxy._onParametersChanged)
         self.itemsChanged.connect(self._model_proxy._onItemsChanged)
 
-        self._material_proxy._setMaterialsAsXml()
+        self._material_proxy._setMaterialsModel()
         self._model_proxy._onLayersChanged()
         self._model_proxy._onItemsChanged()
         self._simulation_proxy._onSimulationParametersChanged()
 
-        self.sampleChanged.connect(self._material_proxy._setMaterialsAsXml)
+        self.sampleChanged.connect(self._material_proxy._setMaterialsModel)
         self.sampleChanged.connect(self._model_proxy._onLayersChanged)
         self.sampleChanged.connect(self._model_proxy._onItemsChanged)
         self.sampleChanged.connect(
@@ -71,6 +80,17 @@ class PyQmlProxy(QObject):
         self.sampleChanged.connect(self._simulation_proxy._onCalculatedDataChanged)
         self.sampleChanged.connect(self._undoredo_proxy.undoRedoChanged)
 
+        # Edits of parameter values, which leave the structure of the sample
+        # and the parameter table (updated row by row) alone
+        self.parameterValuesChanged.connect(self._material_proxy._setMaterialsModel)
+        self.parameterValuesChanged.connect(self._model_proxy._onLayersChanged)
+        self.parameterValuesChanged.connect(self._simulation_proxy._onSimulationParametersChanged)
+        self.parameterValuesChanged.connect(self._simulation_proxy._onCalculatedDataChanged)
+        self.parameterValuesChanged.connect(self._undoredo_proxy.undoRedoChanged)
+
+        # Autosave
+        self._state_proxy.stateChanged.connect(self._project_proxy._onStateChanged)
+
         # Screen recorder
         recorder = None
         try:
@@ -80,6 +100,55 @@ class PyQmlProxy(QObject):
             print('Screen recording disabled')
         self._screen_recorder = recorder
 
+    # # #
+    # Transactions
+    # # #
+
+    @contextmanager
+    def transaction(self, text: str = None):
+        """
+        Group several changes to the sample. Signals passed to `notify`
+        inside the block are held back and each is emitted once when the
+        outermost transaction ends, and the undoable changes are recorded
+        as a single undo step. Transactions can be nested. If the block
+        raises, the held back signals are dropped with the exception.
+
+        :param text: Undo text of the transaction
+        """
+        macro = not self._transaction_depth and borg.stack.enabled
+        if macro:
+            borg.stack.beginMacro(text or 'Edit sample')
+        self._transaction_depth += 1
+        try:
+            yield self
+        except BaseException:
+            if self._transaction_depth == 1:
+                self._pending_signals = []
+            raise
+        finally:
+            self._transaction_depth -= 1
+            if macro:
+                borg.stack.endMacro()
+        if not self._transaction_depth:
+            pending, self._pending_signals = self._pending_signals, []
+            for sender, name in pending:
+                getattr(sender, name).emit()
+
+    def notify(self, *signals: str, sender: QObject = None):
+        """
+        Emit the signals named in `signals`, or queue them until the end
+        of the current transaction.
+
+        :param signals: Names of the signals
+        :param sender: Object the signals belong to, this object by default
+        """
+        sender = self if sender is None else sender
+        for name in signals:
+            if not self._transaction_depth:
+                getattr(sender, name).emit()
+            elif (sender, name) not in self._pending_signals:
+                self._pending_signals.append((sender, name))
+
     @Property('QVariant', notify=dummySignal)
     def state(self):
         return self._state_proxy
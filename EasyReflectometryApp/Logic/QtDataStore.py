@@ -1,7 +1,9 @@
 __author__ = 'github.com/wardsimon'
 
-from typing import List
-from PySide2.QtCore import QPointF
+import numpy as np
+from PySide2.QtGui import QPolygonF
+
+from EasyReflectometryApp.Logic.Proxies.Plotting1d import Plotting1dProxy
 
 
 class QtDataStore():
@@ -11,14 +13,18 @@ class QtDataStore():
         self.sy = sy
         self.y_opt = y_opt
 
-    def get_XY(self) -> List[QPointF]:
-        return [QPointF(x, y) for x, y in zip(self.x, self.y)]
+    def get_XY(self) -> QPolygonF:
+        return Plotting1dProxy.arraysToPolygon(self._array(self.x), self._array(self.y))
+
+    def get_lowerXY(self) -> QPolygonF:
+        return Plotting1dProxy.arraysToPolygon(self._array(self.x), self._array(self.y) - self._array(self.sy))
 
-    def get_lowerXY(self) -> List[QPointF]:
-        return [QPointF(x, y - sy) for x, y, sy in zip(self.x, self.y, self.sy)]
+    def get_upperXY(self) -> QPolygonF:
+        return Plotting1dProxy.arraysToPolygon(self._array(self.x), self._array(self.y) + self._array(self.sy))
 
-    def get_upperXY(self) -> List[QPointF]:
-        return [QPointF(x, y + sy) for x, y, sy in zip(self.x, self.y, self.sy)]
+    def get_fit_XY(self) -> QPolygonF:
+        return Plotting1dProxy.arraysToPolygon(self._array(self.x), self._array(self.y_opt))
 
-    def get_fit_XY(self):
-        return [QPointF(x, y) for x, y in zip(self.x, self.y_opt)]
+    @staticmethod
+    def _array(values) -> np.ndarray:
+        return np.asarray(values, dtype=np.float64)
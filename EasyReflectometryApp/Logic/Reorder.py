@@ -0,0 +1,71 @@
+__author__ = 'github.com/arm61'
+
+from contextlib import nullcontext
+from typing import Callable, ContextManager
+
+from easyCore import borg
+from easyCore.Objects.Groups import BaseCollection
+from easyCore.Utils.UndoRedo import UndoCommand
+
+from EasyReflectometry.experiment.model import Model
+from EasyReflectometry.sample.item import MultiLayer
+
+
+class MoveCommand(UndoCommand):
+    """
+    Move one entry of an easyCore collection to another index, as a single
+    undoable command. Only the moved entry is taken out and put back in,
+    and the calculator is told about the new order once, by binding the
+    item (for layers) and the model again.
+    """
+
+    def __init__(self, collection: BaseCollection, old_index: int, new_index: int, model: Model,
+                 item: MultiLayer = None, guard: Callable[[], ContextManager] = None):
+        """
+        :param collection: Items of the structure of `model`, or layers of `item`
+        :param old_index: Index of the entry to move
+        :param new_index: Index of the entry once moved
+        :param model: Model the collection belongs to
+        :param item: Item the collection belongs to, if it holds layers
+        :param guard: Context manager entered around each move, e.g. to
+            enable the edge layers while they can change
+        """
+        super().__init__(self)
+        self._parent = collection
+        self._old_index = old_index
+        self._new_index = new_index
+        self._model = model
+        self._item = item
+        self._guard = guard if guard is not None else nullcontext
+        self.text = f'Moving {collection[old_index].name} to position {new_index + 1}'
+
+    def undo(self):
+        self._move(self._new_index, self._old_index)
+
+    def redo(self):
+        self._move(self._old_index, self._new_index)
+
+    def _move(self, old_index: int, new_index: int):
+        # The command is the undo step, so the changes it is made of are not recorded
+        enabled = borg.stack.enabled
+        borg.stack.force_state(False)
+        try:
+            with self._guard():
+                entry = self._parent[old_index]
+                del self._parent[old_index]
+                self._parent.insert(new_index, entry)
+                interface = self._model.interface
+                if interface is not None:
+                    if self._item is not None:
+                        interface.generate_bindings(self._item)
+                    interface.generate_bindings(self._model)
+        finally:
+            borg.stack.force_state(enabled)
+
+
+def move(collection: BaseCollection, old_index: int, new_index: int, model: Model,
+         item: MultiLayer = None, guard: Callable[[], ContextManager] = None):
+    """
+    Move the entry `old_index` of `collection` to `new_index`, see `MoveCommand`.
+    """
+    borg.stack.push(MoveCommand(collection, old_index, new_index, model, item, guard))
@@ -0,0 +1,100 @@
+__author__ = 'github.com/arm61'
+
+import os
+import zipfile
+from typing import Iterable
+
+from easyCore import np
+
+ORSO_HEADER = '# ORSO reflectivity data file | 1.0 standard | YAML encoding | https://www.reflectometry.org/'
+
+REFLECTIVITY_COLUMNS = (
+    ('q', 'Qz', '1/angstrom', 'wavevector transfer'),
+    ('r', 'R', None, 'reflectivity'),
+    ('dr', 'sR', None, 'standard deviation of reflectivity'),
+    ('dq', 'sQz', '1/angstrom', 'standard deviation of wavevector transfer resolution'),
+    ('r_calc', 'R_calc', None, 'calculated reflectivity'),
+    ('residuals', 'residual', None, 'normalised residual (R - R_calc) / sR'),
+)
+SLD_COLUMNS = (
+    ('z', 'z', 'angstrom', 'distance from the surface'),
+    ('sld', 'SLD', '1e-6/angstrom^2', 'scattering length density'),
+)
+
+FORMATS = ('ort', 'dat', 'npz')
+
+
+def results_record(name: str, model: str, q: np.ndarray, r_calc: np.ndarray,
+                   z: np.ndarray, sld: np.ndarray, r: np.ndarray = None,
+                   dr: np.ndarray = None, dq: np.ndarray = None) -> dict:
+    """
+    Collect the results for a single dataset or model. Measured columns
+    which are not given are filled with NaN.
+
+    :return: Record as expected by `export_results`
+    """
+    missing = np.full_like(q, np.nan, dtype=float)
+    r = missing if r is None else r
+    dr = missing if dr is None else dr
+    dq = missing if dq is None else dq
+    residuals = np.divide(r - r_calc, dr, out=np.full_like(missing, np.nan), where=dr > 0)
+    return {'name': name, 'model': model,
+            'q': q, 'r': r, 'dr': dr, 'dq': dq, 'r_calc': r_calc, 'residuals': residuals,
+            'z': z, 'sld': sld}
+
+
+def export_results(records: Iterable[dict], path: str, fmt: str = None) -> int:
+    """
+    Write calculated curves, residuals and SLD profiles. Records are
+    written as they are produced, so only one of them needs to be in
+    memory at a time.
+
+    For the text formats the reflectivity goes to `path` and the SLD
+    profiles to a `_sld` file next to it, each dataset in its own block.
+    For 'npz' all the arrays go to a single archive.
+
+    :param records: Iterable of records, see `results_record`
+    :param path: File to write
+    :param fmt: One of `FORMATS`, taken from the extension of `path` if not given
+    :return: Number of records written
+    """
+    if fmt is None:
+        fmt = os.path.splitext(path)[1][1:].lower()
+    if fmt not in FORMATS:
+        raise ValueError(f'Unknown export format: {fmt}')
+    if fmt == 'npz':
+        return _export_npz(records, path)
+    root, ext = os.path.splitext(path)
+    with open(path, 'w') as file, open(f'{root}_sld{ext}', 'w') as sld_file:
+        if fmt == 'ort':
+            file.write(ORSO_HEADER + '\n')
+        count = 0
+        for count, record in enumerate(records, 1):
+            _write_block(file, record, REFLECTIVITY_COLUMNS, fmt)
+            _write_block(sld_file, record, SLD_COLUMNS, fmt)
+    return count
+
+
+def _write_block(file, record: dict, columns: tuple, fmt: str):
+    if fmt == 'ort':
+        lines = [f"data_set: {record['name']}", f"model: {record['model']}", 'columns:']
+        for _, name, unit, quantity in columns:
+            unit = '' if unit is None else f', unit: {unit}'
+            lines.append(f'- {{name: {name}{unit}, physical_quantity: {quantity}}}')
+    else:
+        lines = [f"{record['name']} ({record['model']})",
+                 ' '.join(name for _, name, _, _ in columns)]
+    np.savetxt(file, np.column_stack([record[key] for key, _, _, _ in columns]),
+               header='\n'.join(lines), comments='# ')
+    file.write('\n')
+
+
+def _export_npz(records: Iterable[dict], path: str) -> int:
+    count = 0
+    with zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for count, record in enumerate(records, 1):
+            prefix = f"{count - 1}_{record['name']}"
+            for key, _, _, _ in REFLECTIVITY_COLUMNS + SLD_COLUMNS:
+                with archive.open(f'{prefix}/{key}.npy', 'w') as file:
+                    np.lib.format.write_array(file, np.asarray(record[key]))
+    return count
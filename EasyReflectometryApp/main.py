@@ -3,6 +3,7 @@ import sys
 import pathlib
 import platform
 import argparse
+import multiprocessing
 
 # PySide
 from PySide2.QtCore import QUrl
@@ -116,4 +117,5 @@ def main():
 
 
 if __name__ == '__main__':
+    multiprocessing.freeze_support()  # plots are rendered in a worker process
     main()